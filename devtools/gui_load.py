@@ -0,0 +1,220 @@
+"""Нагрузочный тест отображения: синтетические точки с заданной частотой
+(от 100 Гц до десятков кГц) проходят через HeaterController, Measurement,
+графики DataCon и MainWindow.update_display_cal.
+
+    python devtools/gui_load.py --rate 100 1000 10000 --duration 10
+
+Нужен сгенерированный интерфейс (uic.cmd). Для каждой частоты выводится:
+частота генерации и доставки в GUI, потерянные точки и наибольшая очередь
+в буфере, длительность обработки пакета в GUI, задержка цикла событий Qt
+(отрисовка графиков) и рост пикового объема памяти процесса.
+"""
+
+import argparse
+import math
+import statistics
+import sys
+import time
+from typing import NamedTuple, Optional
+
+from loguru import logger as log
+from PySide6 import QtCore, QtWidgets
+
+from vta_collection.calibration import ZeroCalibration
+from vta_collection.config import config
+from vta_collection.data_block import DataBlock
+from vta_collection.heater.controller import get_heater
+from vta_collection.heater.loop import AbstractLoop
+from vta_collection.heater.sampler import AbstractSampler
+from vta_collection.main_window import MainWindow
+from vta_collection.measurement import Measurement
+from vta_collection.vtaz import Metadata
+
+# Наибольшая частота циклов генератора, Гц: при большей частоте точек они
+# пишутся в буфер пакетами
+MAX_TICK_RATE = 1000
+# Период таймера, по запаздыванию которого оценивается загрузка цикла событий, мс
+HEARTBEAT_INTERVAL = 10
+
+
+class SyntheticSampler(AbstractSampler):
+    """Синусоида с частотой rate точек в секунду вместо опроса оборудования"""
+
+    def __init__(self, rate: float):
+        self.batch = max(1, math.ceil(rate / MAX_TICK_RATE))
+        super().__init__(sampling_rate=rate / self.batch)
+        self.rate = rate
+        self.count = 0
+        self.start: Optional[float] = None
+
+    def loop_body(self):
+        if self.start is None:
+            self.start = time.monotonic()
+        for _ in range(self.batch):
+            t = self.start + self.count / self.rate
+            self.record(t1=t, emf=math.sin(t), t2=t, output=self.heater.output)
+            self.count += 1
+
+    def get_data(self):
+        return math.sin(time.monotonic())
+
+    def set_output(self, value: float):
+        pass
+
+
+class LoadResult(NamedTuple):
+    rate: float  # заданная частота, Гц
+    generated: float  # достигнутая частота генерации, Гц
+    delivered: float  # частота доставки в GUI, Гц
+    dropped: int  # точки, перезаписанные до чтения GUI
+    max_queued: int  # наибольшее число непрочитанных точек в буфере
+    handler_p50: float  # обработка пакета в GUI, мс
+    handler_max: float
+    lag_p95: float  # запаздывание таймера цикла событий, мс
+    lag_max: float
+    memory: Optional[float]  # рост пикового объема памяти, МБ
+
+    def row(self) -> str:
+        memory = "n/a" if self.memory is None else f"{self.memory:.1f}"
+        return (
+            f"{self.rate:>8.0f} {self.generated:>10.0f} {self.delivered:>10.0f} "
+            f"{self.dropped:>8d} {self.max_queued:>8d} "
+            f"{self.handler_p50:>7.2f} {self.handler_max:>8.2f} "
+            f"{self.lag_p95:>7.2f} {self.lag_max:>8.2f} {memory:>7}"
+        )
+
+
+HEADER = (
+    f"{'rate':>8} {'generated':>10} {'delivered':>10} {'dropped':>8} "
+    f"{'queued':>8} {'hnd p50':>7} {'hnd max':>8} {'lag p95':>7} "
+    f"{'lag max':>8} {'mem MB':>7}"
+)
+
+
+def peak_memory() -> Optional[float]:
+    """Пиковый объем памяти процесса, МБ (None - недоступен, Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def percentile(values: list[float], q: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+def run_load(window: MainWindow, rate: float, duration: float) -> LoadResult:
+    controller = get_heater()
+    controller.loop = AbstractLoop(sampler=SyntheticSampler(rate=rate))
+    controller.loop.error_occurred.connect(log.error)
+
+    meas = Measurement(
+        metadata=Metadata(sample="load", operator=config.operator, extra_inputs=[]),
+        cal=ZeroCalibration(),
+    )
+    window.set_meas(meas=meas)
+    controller.set_meas(meas)
+
+    delivered = 0
+    max_queued = 0
+    handler: list[float] = []
+    lag: list[float] = []
+
+    def count(block: DataBlock):
+        nonlocal delivered
+        delivered += len(block.t1)
+
+    def timed_read():
+        nonlocal max_queued
+        max_queued = max(max_queued, controller.loop.ring.seq - controller.read_seq)
+        start = time.perf_counter()
+        controller.read_ring()
+        handler.append((time.perf_counter() - start) * 1000)
+
+    last_beat = time.perf_counter()
+
+    def heartbeat():
+        nonlocal last_beat
+        now = time.perf_counter()
+        lag.append(max(0.0, (now - last_beat) * 1000 - HEARTBEAT_INTERVAL))
+        last_beat = now
+
+    controller.data_ready.connect(count)
+    controller.reader.timeout.disconnect()
+    controller.reader.timeout.connect(timed_read)
+    beat = QtCore.QTimer()
+    beat.setTimerType(QtCore.Qt.TimerType.PreciseTimer)
+    beat.setInterval(HEARTBEAT_INTERVAL)
+    beat.timeout.connect(heartbeat)
+
+    memory_before = peak_memory()
+    events = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(round(duration * 1000), events.quit)
+    start = time.monotonic()
+    controller.start_loop()
+    beat.start()
+    events.exec()
+    beat.stop()
+    controller.reader.timeout.disconnect()
+    controller.reader.timeout.connect(controller.read_ring)
+    controller.stop_loop()
+    elapsed = time.monotonic() - start
+    # Точки, записанные после последнего чтения в stop_loop
+    controller.read_ring()
+    controller.data_ready.disconnect(count)
+    memory_after = peak_memory()
+
+    generated = controller.loop.ring.seq
+    return LoadResult(
+        rate=rate,
+        generated=generated / elapsed,
+        delivered=delivered / elapsed,
+        dropped=generated - delivered,
+        max_queued=max_queued,
+        handler_p50=percentile(handler, 50),
+        handler_max=max(handler, default=0.0),
+        lag_p95=percentile(lag, 95),
+        lag_max=max(lag, default=0.0),
+        memory=(
+            None
+            if memory_before is None or memory_after is None
+            else memory_after - memory_before
+        ),
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Synthetic GUI load benchmark")
+    parser.add_argument(
+        "--rate", type=float, nargs="+", default=[100, 1000, 10000], help="Hz"
+    )
+    parser.add_argument("--duration", type=float, default=10.0, help="s per rate")
+    parser.add_argument(
+        "--refresh", type=float, help="GUI refresh interval, s (config by default)"
+    )
+    args = parser.parse_args()
+
+    log.remove()
+    log.add(sys.stderr, level="WARNING")
+    # Холодный спай без обращения к оборудованию, настройки не сохраняются
+    config.is_test_mode = True
+    if args.refresh is not None:
+        config.refresh_interval = args.refresh
+
+    app = QtWidgets.QApplication(sys.argv)
+    window = MainWindow()
+    window.show()
+    print(HEADER)
+    for rate in args.rate:
+        print(run_load(window=window, rate=rate, duration=args.duration).row())
+    window.close()
+    app.processEvents()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
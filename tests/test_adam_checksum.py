@@ -0,0 +1,30 @@
+from vta_collection.adam_checksum import add_checksum, checksum, resync, strip_checksum
+
+
+def test_add_checksum():
+    assert add_checksum(b"$012") == b"$012B7"
+
+
+def test_checksum_round_trip():
+    for data in (b"$012", b"!01010600", b">+01.234", b"#03+05.000"):
+        assert strip_checksum(add_checksum(data)) == data
+
+
+def test_strip_checksum_accepts_lowercase():
+    assert strip_checksum(b"$012b7") == b"$012"
+
+
+def test_strip_checksum_rejects_mismatch():
+    assert strip_checksum(b"!01010601" + checksum(b"!01010600")) is None
+    assert strip_checksum(b"B7") is None
+
+
+def test_resync_drops_noise_before_answer():
+    assert resync(b"\x00\xff>+01.234\r") == b">+01.234\r"
+    assert resync(b"!01010600") == b"!01010600"
+    assert resync(b"\x7f?01\r") == b"?01\r"
+
+
+def test_resync_without_answer():
+    assert resync(b"\x00\xff\r") == b""
+    assert resync(b"") == b""
@@ -0,0 +1,25 @@
+from vta_collection.discovery import discover
+
+PORT = "sim://?adam4011=1&adam4021=3&baudrate=9600&delay=0&latency=0"
+
+
+def found(port: str, checksum: bool) -> list[tuple[int, str]]:
+    result = discover(
+        ports=[port],
+        baudrates=[9600],
+        addresses=range(5),
+        checksum=checksum,
+        save=False,
+    )
+    return [(mod.address, mod.name) for mod in result.modules]
+
+
+def test_discover_modules():
+    assert found(PORT, checksum=False) == [(1, "4011"), (3, "4021")]
+
+
+def test_discover_modules_with_checksum():
+    port = PORT + "&checksum=1"
+    # Модули с контрольной суммой молчат на пробы без нее
+    assert found(port, checksum=False) == []
+    assert found(port, checksum=True) == [(1, "4011"), (3, "4021")]
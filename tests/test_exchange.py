@@ -0,0 +1,33 @@
+import pytest
+
+from vta_collection.adam_4520 import Adam4520API
+from vta_collection.config import config
+
+# Ответ модуля приходит через LATENCY после команды: таймаут TIMEOUT
+# истекает раньше, а выдержка шины после таймаута захватывает ответ
+LATENCY = 0.1
+TIMEOUT = 0.07
+
+
+@pytest.fixture
+def converter():
+    converter = Adam4520API(timeout=1.0)
+    converter.open_serial(
+        port=f"sim://?adam4021=3&baudrate={config.adam_baudrate}"
+        f"&delay=0&latency={LATENCY}"
+    )
+    yield converter
+    converter.close_serial()
+
+
+def test_late_answer_is_not_taken_for_next_command(converter: Adam4520API):
+    replies = converter.exchange(
+        cmds=[b"#03+01.000", b"#03+02.000"], timeouts=[TIMEOUT, 1.0]
+    )
+    # Остаток пакета после потерянного ответа не передается
+    assert [reply.answer for reply in replies] == [b""]
+
+    # Опоздавший ">" отброшен: следующая команда ждет собственного ответа
+    (reply,) = converter.exchange(cmds=[b"#03+02.000"], timeouts=[1.0])
+    assert reply.answer == b">\r"
+    assert reply.elapsed >= LATENCY
@@ -0,0 +1,86 @@
+import os
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtWidgets
+
+from vta_collection import hardware
+from vta_collection.calibration import ZeroCalibration
+from vta_collection.config import config
+from vta_collection.heater import controller
+from vta_collection.measurement import Measurement
+from vta_collection.vtaz import Metadata
+
+# QApplication живет до конца процесса: виджеты графиков измерений
+# удаляются позже фикстуры
+app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+
+@pytest.fixture
+def heater(monkeypatch):
+    """Контроллер основной печи на симуляторе шины.
+
+    Поток опроса не запускается: итерации выполняет тест (run_iterations),
+    поэтому результат не зависит от времени.
+    """
+    monkeypatch.setattr(config, "comport", "sim://?furnace=1&delay=0&latency=0")
+    monkeypatch.setattr(config, "is_test_mode", False)
+    monkeypatch.setattr(config, "acquisition_process", False)
+    monkeypatch.setattr(config, "replay_file", "")
+    monkeypatch.setattr(config, "extra_inputs", [])
+    monkeypatch.setattr(config, "cjc_interval", 10.0)
+    monkeypatch.setattr(hardware, "_hardware", {})
+    monkeypatch.setattr(controller, "_heater", {})
+    heater = controller.get_heater()
+    monkeypatch.setattr(heater.loop, "start_thread", heater.loop.sampler.prepare)
+    yield heater
+    heater.stop_loop()
+
+
+def run_iterations(heater: controller.HeaterController, count: int):
+    """count итераций опроса и чтение буферов, как по таймеру контроллера"""
+    for _ in range(count):
+        heater.loop.sampler.loop_body()
+    heater.read_ring()
+
+
+def new_meas() -> Measurement:
+    return Measurement(
+        metadata=Metadata(sample="s", operator="o", extra_inputs=[]),
+        cal=ZeroCalibration(),
+    )
+
+
+def points(meas: Measurement) -> int:
+    return len(meas.dc_emf.dc.x)
+
+
+def test_switch_measurement_while_running(heater: controller.HeaterController):
+    first = new_meas()
+    heater.set_meas(first)
+    heater.start_loop()
+    run_iterations(heater, 5)
+    assert heater.latest_cjc() is not None
+    assert points(first) == 5
+
+    # Холодный спай берется из работающего опроса, опрос не останавливается
+    second = new_meas()
+    assert heater.loop.thread_is_running
+    assert second.compensator.cjc_data == heater.latest_cjc()
+    # Точки, еще не прочитанные из буфера, достаются прежнему измерению
+    heater.loop.sampler.loop_body()
+    heater.set_meas(second)
+    assert not first.recording_enabled
+    assert points(first) == 6
+
+    heater.start_loop()
+    run_iterations(heater, 3)
+    heater.stop_loop()
+
+    assert points(first) == 6
+    assert points(second) == 3
+    assert not first.recording_enabled
+    assert not second.recording_enabled
+    assert heater.meas_slot is None
@@ -0,0 +1,22 @@
+import numpy as np
+
+from vta_collection.record import stop_index
+
+
+def make_data(t: list[float], temperature: list[float]) -> np.ndarray:
+    """Столбцы DATA_COLUMNS: t1, emf, t2, output, temperature"""
+    zeros = np.zeros(len(t))
+    return np.vstack((t, zeros, t, zeros, temperature))
+
+
+def test_stop_index_by_duration():
+    data = make_data([100.0, 100.5, 101.0, 101.5], [20, 21, 22, 23])
+    assert stop_index(data, 100.0, duration=1.0, until=None) == 3
+    assert stop_index(data, 100.0, duration=None, until=None) == 4
+
+
+def test_stop_index_by_temperature_includes_first_reached():
+    data = make_data([0.0, 1.0, 2.0, 3.0], [20, 30, 40, 50])
+    assert stop_index(data, 0.0, duration=None, until=35) == 3
+    assert stop_index(data, 0.0, duration=1.0, until=35) == 2
+    assert stop_index(data, 0.0, duration=None, until=100) == 4
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from vta_collection.ring_buffer import RingBuffer
+
+
+@pytest.fixture
+def ring() -> RingBuffer:
+    return RingBuffer(columns=("t", "y"), capacity=4)
+
+
+def test_read_is_view_without_copy(ring: RingBuffer):
+    for i in range(3):
+        ring.append(i, i * 10)
+    view = ring.read(since=0)
+    assert view.columns.base is ring.data
+    assert view.lost == 0
+    assert ring.column(view, "y").tolist() == [0, 10, 20]
+
+
+def test_empty_read(ring: RingBuffer):
+    view = ring.read(since=0)
+    assert view.start == view.stop == 0
+    assert view.columns.shape == (2, 0)
+
+
+def test_wraparound_read_is_copy_in_order(ring: RingBuffer):
+    for i in range(3):
+        ring.append(i, i * 10)
+    since = ring.read(since=0).stop
+    for i in range(3, 6):
+        ring.append(i, i * 10)
+    view = ring.read(since=since)
+    assert (view.start, view.stop, view.lost) == (3, 6, 0)
+    assert ring.column(view, "t").tolist() == [3, 4, 5]
+    assert not np.shares_memory(view.columns, ring.data)
+
+
+def test_overwritten_rows_are_reported(ring: RingBuffer):
+    for i in range(3):
+        ring.append(i, i * 10)
+    view = ring.read(since=0)
+    assert not ring.overwritten(view)
+    for i in range(3, 7):
+        ring.append(i, i * 10)
+    assert ring.overwritten(view)
+    view = ring.read(since=0)
+    assert view.lost == 3
+    assert (view.start, view.stop) == (3, 7)
+    assert ring.column(view, "t").tolist() == [3, 4, 5, 6]
+
+
+def test_shared_ring_is_visible_from_attached():
+    shared = RingBuffer.create_shared(columns=("t", "y"), capacity=4)
+    other = RingBuffer.attach(name=shared.name, columns=("t", "y"), capacity=4)
+    try:
+        shared.append(1, 2)
+        assert other.seq == 1
+        assert other.read(since=0).columns.tolist() == [[1], [2]]
+    finally:
+        other.close()
+        shared.unlink()
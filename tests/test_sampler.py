@@ -0,0 +1,57 @@
+from typing import Optional
+
+import pytest
+
+from vta_collection.config import config
+from vta_collection.hardware import Hardware
+from vta_collection.heater.sampler import OutputException, RealSampler
+
+
+@pytest.fixture
+def open_sampler():
+    """RealSampler на симуляторе шины, ошибки итераций собираются в errors"""
+    opened: list[RealSampler] = []
+
+    def open_sampler(port: str) -> tuple[RealSampler, list[Exception]]:
+        hardware = Hardware()
+        hardware.adam4520.open_serial(port=port)
+        sampler = RealSampler(hardware=hardware)
+        errors: list[Exception] = []
+        sampler.on_error = errors.append
+        opened.append(sampler)
+        return sampler, errors
+
+    yield open_sampler
+    for sampler in opened:
+        sampler.adam4520.close_serial()
+
+
+def write_heater_output(sampler: RealSampler, value: float) -> Optional[float]:
+    sampler.heater.output = value
+    output = sampler.next_output()
+    if output is not None:
+        sampler.set_output(output)
+    return output
+
+
+def test_output_written_once(open_sampler):
+    sampler, errors = open_sampler("sim://?delay=0&latency=0")
+    output = write_heater_output(sampler, 2.5)
+    assert output is not None
+    assert errors == []
+    assert sampler.output == output
+    # Код ЦАП не изменился: выход повторно не пишется
+    assert sampler.next_output() is None
+
+
+def test_unacknowledged_output_is_retried(open_sampler):
+    # 4021 по другому адресу: запись выхода остается без ответа
+    sampler, errors = open_sampler(
+        f"sim://?adam4021={config.adam4021_address + 1}&delay=0&latency=0"
+    )
+    output = write_heater_output(sampler, 2.5)
+    assert output is not None
+    assert len(errors) == 1
+    assert isinstance(errors[0], OutputException)
+    assert sampler.output == 0.0
+    assert sampler.next_output() == output
@@ -0,0 +1,79 @@
+import pytest
+
+from vta_collection.heater import scheduler
+from vta_collection.heater.scheduler import ChannelScheduler, DeadlineScheduler
+
+
+class FakeClock:
+    """time.monotonic_ns и time.sleep модуля scheduler без реального ожидания"""
+
+    def __init__(self):
+        self.now = 0
+
+    def monotonic_ns(self) -> int:
+        return self.now
+
+    def sleep(self, seconds: float) -> bool:
+        self.now += round(seconds * 1e9)
+        return True
+
+    def advance(self, seconds: float):
+        self.now += round(seconds * 1e9)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler.time, "monotonic_ns", fake.monotonic_ns)
+    monkeypatch.setattr(scheduler.time, "sleep", fake.sleep)
+    return fake
+
+
+def test_channel_scheduler_round_robin():
+    channels = ChannelScheduler(periods=[1, 2, 2, 3])
+    cycles = [channels.next_cycle() for _ in range(6)]
+    assert cycles == [[0, 1, 3], [0, 2], [0, 1], [0, 2, 3], [0, 1], [0, 2]]
+
+
+def test_deadline_scheduler_keeps_rate(clock: FakeClock):
+    ticker = DeadlineScheduler(rate=50)
+    for _ in range(100):
+        assert ticker.wait(sleep=clock.sleep)
+        clock.advance(0.005)
+    stats = ticker.stats()
+    assert stats.ticks == 100
+    assert stats.missed == 0
+    assert stats.rate == pytest.approx(50)
+    assert stats.jitter_p99 == 0
+
+
+def test_deadline_scheduler_counts_missed_ticks(clock: FakeClock):
+    ticker = DeadlineScheduler(rate=50)
+    for i in range(100):
+        ticker.wait(sleep=clock.sleep)
+        # Каждый десятый цикл длится 70 мс: сроки +20 и +40 мс пропускаются,
+        # цикл со сроком +60 мс начинается с опозданием 10 мс
+        clock.advance(0.07 if i % 10 == 9 else 0.005)
+    stats = ticker.stats()
+    assert stats.ticks == 100
+    # Последний долгий цикл не учтен: следующего wait не было
+    assert stats.missed == 2 * 9
+    assert stats.jitter_p99 == pytest.approx(0.01)
+    # Пропущенные сроки не догоняются: после долгого цикла срок - следующий
+    assert ticker.tick == stats.ticks + stats.missed
+
+
+def test_deadline_scheduler_interrupted(clock: FakeClock):
+    ticker = DeadlineScheduler(rate=1)
+    ticker.wait(sleep=clock.sleep)
+    assert not ticker.wait(sleep=lambda seconds: False)
+    assert ticker.ticks == 1
+
+
+def test_deadline_scheduler_unlimited(clock: FakeClock):
+    ticker = DeadlineScheduler(rate=0)
+    for _ in range(3):
+        assert ticker.wait(sleep=clock.sleep)
+        clock.advance(0.001)
+    assert ticker.stats().missed == 0
+    assert ticker.ticks == 3
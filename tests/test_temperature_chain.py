@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from vta_collection import temperature_chain
+from vta_collection.calibration import Calibration, ZeroCalibration
+from vta_collection.cold_junction_compensator import CjcData, ColdJunctionCompensator
+from vta_collection.config import config
+from vta_collection.math_utils import horner_function, taylor_shift
+from vta_collection.temperature_chain import TemperatureChain
+from vta_collection.thermocouple import Thermocouple
+from vta_collection.thermocouple_approximation import build_approximation
+
+CALIBRATIONS = [
+    ZeroCalibration(),
+    Calibration(calibration_type="linear", coefficients=[0.01, -2.0]),
+    Calibration(calibration_type="quadratic", coefficients=[1e-5, 0.01, -2.0]),
+]
+EMF = np.linspace(-0.5, 30.0, 2001)
+
+
+def make_compensator(cal: Calibration) -> ColdJunctionCompensator:
+    return ColdJunctionCompensator.from_cjc_data(
+        calibration=cal, cjc_data=CjcData(temperature=25.0, e_cold=0.308)
+    )
+
+
+def make_chain(cal: Calibration) -> TemperatureChain:
+    return TemperatureChain(cal=cal, compensator=make_compensator(cal))
+
+
+def reference_chain(cal: Calibration, thermocouple: Thermocouple):
+    """Исходная цепочка звеньев без объединения полиномов"""
+    compensator = make_compensator(cal)
+    return lambda x: cal.get_value(
+        thermocouple.emf_to_temperature(compensator.compensate(x))
+    )
+
+
+def use_thermocouple(monkeypatch, approximation: bool) -> Thermocouple:
+    instance = Thermocouple(config.thermocouple_coefficients)
+    if approximation:
+        instance.approximation = build_approximation(
+            instance.coefficients, instance.emf_range
+        )
+    monkeypatch.setattr(temperature_chain, "get_thermocouple", lambda: instance)
+    return instance
+
+
+def test_horner_function_matches_polyval():
+    coefficients = [0.5, -1.0, 2.0, 0.25]
+    polynomial = horner_function(coefficients)
+    x = np.linspace(-3, 3, 13)
+    expected = np.polyval(coefficients[::-1], x)
+    assert [polynomial(float(v)) for v in x] == pytest.approx(expected, rel=1e-14)
+
+
+def test_taylor_shift():
+    coefficients = [1.0, 2.0, 3.0]
+    shifted = horner_function(taylor_shift(coefficients, 0.5))
+    polynomial = horner_function(coefficients)
+    for x in (-2.0, 0.0, 1.5):
+        assert shifted(x) == pytest.approx(polynomial(x + 0.5), rel=1e-14)
+
+
+@pytest.mark.parametrize("approximation", [False, True])
+@pytest.mark.parametrize("cal", CALIBRATIONS, ids=lambda cal: cal.calibration_type)
+def test_fused_and_vector_match_reference(cal: Calibration, approximation, monkeypatch):
+    thermocouple = use_thermocouple(monkeypatch, approximation)
+    chain = make_chain(cal)
+    reference = np.array([reference_chain(cal, thermocouple)(x) for x in EMF])
+    fused = np.array([chain.get_value(x) for x in EMF])
+    # Различие - только округление float (порядок операций другой)
+    np.testing.assert_allclose(fused, reference, rtol=1e-12, atol=1e-9)
+    np.testing.assert_allclose(chain.get_values(EMF), reference, rtol=1e-12, atol=1e-9)
+
+
+def test_single_points_use_approximation(monkeypatch):
+    """get_value и get_values вычисляются по таблицам, если они включены"""
+    thermocouple = use_thermocouple(monkeypatch, approximation=True)
+    assert thermocouple.approximation is not None
+    chain = make_chain(ZeroCalibration())
+    expected = thermocouple.approximation.temperature.value(10.0 + 0.308)
+    assert chain.get_value(10.0) == expected
+    assert chain.get_values(np.array([10.0]))[0] == pytest.approx(expected, abs=1e-12)
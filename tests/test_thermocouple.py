@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+from loguru import logger
+
+from vta_collection.config import config
+from vta_collection.math_utils import (
+    bisection_method,
+    monotonic_range,
+    safeguarded_newton,
+    safeguarded_newton_array,
+)
+from vta_collection.thermocouple import EMF_RANGE, Thermocouple
+
+
+@pytest.fixture(scope="module")
+def thermocouple() -> Thermocouple:
+    return Thermocouple(config.thermocouple_coefficients)
+
+
+def test_range_is_fitted_range(thermocouple: Thermocouple):
+    # Полином монотонен на всем диапазоне ЭДС таблицы
+    assert thermocouple.emf_range == EMF_RANGE
+
+
+def test_monotonic_range_stops_at_extremum():
+    # x³ - 3x: экстремумы в ±1
+    assert monotonic_range([1, 0, -3, 0], -5, 5, around=3) == (1.0, 5.0)
+    assert monotonic_range([1, 0, -3, 0], -5, 5) == (-1.0, 1.0)
+
+
+def test_newton_matches_bisection(thermocouple: Thermocouple):
+    for temperature in (-50.0, 0.0, 25.0, 500.0, 1500.0, 2500.0):
+        newton = thermocouple.temperature_to_emf(temperature)
+        bisection = bisection_method(
+            thermocouple.emf_to_temperature,
+            temperature,
+            *EMF_RANGE,
+            tolerance=1e-9,
+        )
+        assert newton == pytest.approx(bisection, abs=1e-9)
+        assert thermocouple.emf_to_temperature(newton) == pytest.approx(
+            temperature, abs=1e-9
+        )
+
+
+def test_array_matches_scalar(thermocouple: Thermocouple):
+    temperatures = np.linspace(-50.0, 2500.0, 1001)
+    emf = thermocouple.temperatures_to_emf(temperatures)
+    np.testing.assert_allclose(
+        thermocouple.emf_to_temperatures(emf), temperatures, atol=1e-9
+    )
+    scalar = [thermocouple.temperature_to_emf(t) for t in temperatures[::100]]
+    np.testing.assert_allclose(scalar, emf[::100], atol=1e-12)
+
+
+def test_outside_range_raises(thermocouple: Thermocouple):
+    with pytest.raises(ValueError):
+        thermocouple.temperature_to_emf(5000.0)
+
+
+def test_outside_range_is_nan_and_logged(thermocouple: Thermocouple):
+    messages: list[str] = []
+    handler = logger.add(messages.append, level="WARNING")
+    try:
+        emf = thermocouple.temperatures_to_emf(np.array([25.0, 5000.0]))
+    finally:
+        logger.remove(handler)
+    assert not np.isnan(emf[0])
+    assert np.isnan(emf[1])
+    assert any("outside the thermocouple range" in m for m in messages)
+
+
+def test_safeguarded_newton_converges_with_bad_derivative():
+    # Производная занижена в 10 раз: шаги Ньютона выходят из вилки, и
+    # бисекция все равно приводит к корню
+    root = safeguarded_newton(
+        func=lambda x: x**3,
+        derivative=lambda x: 0.3 * x**2,
+        target_value=8.0,
+        left=0.0,
+        right=10.0,
+        tolerance=1e-12,
+        max_iterations=200,
+    )
+    assert root == pytest.approx(2.0, abs=1e-9)
+
+
+def test_safeguarded_newton_array_few_iterations():
+    calls = 0
+
+    def func(x: np.ndarray) -> np.ndarray:
+        nonlocal calls
+        calls += 1
+        return x**3 + x
+
+    targets = np.linspace(-10.0, 10.0, 1001)
+    roots = safeguarded_newton_array(
+        func=func,
+        derivative=lambda x: 3 * x**2 + 1,
+        target_values=targets,
+        left=-5.0,
+        right=5.0,
+        initial=targets / 10,
+    )
+    np.testing.assert_allclose(roots**3 + roots, targets, atol=1e-9)
+    assert calls < 20
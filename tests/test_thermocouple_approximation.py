@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from vta_collection import thermocouple, thermocouple_approximation
+from vta_collection.config import config
+from vta_collection.thermocouple import EMF_RANGE, Thermocouple, get_thermocouple
+from vta_collection.thermocouple_approximation import (
+    ChebyshevTable,
+    ThermocoupleApproximation,
+    build_approximation,
+    cache_path,
+)
+
+
+@pytest.fixture(scope="module")
+def approximation() -> ThermocoupleApproximation:
+    return build_approximation(config.thermocouple_coefficients, EMF_RANGE)
+
+
+def test_error_bound(approximation: ThermocoupleApproximation):
+    assert approximation.temperature_error < 1e-6
+    assert approximation.emf_error < 1e-8
+
+
+def test_error_against_exact_polynomial(approximation: ThermocoupleApproximation):
+    exact = Thermocouple(config.thermocouple_coefficients)
+    emf = np.random.default_rng(1).uniform(*EMF_RANGE, 5000)
+    temperature = exact.emf_to_temperatures(emf)
+    np.testing.assert_allclose(
+        approximation.temperature(emf), temperature, rtol=0, atol=1e-6
+    )
+    np.testing.assert_allclose(approximation.emf(temperature), emf, rtol=0, atol=1e-8)
+
+
+def test_nan_outside_range(approximation: ThermocoupleApproximation):
+    outside = np.array([EMF_RANGE[0] - 1, EMF_RANGE[1] + 1])
+    assert np.isnan(approximation.temperature(outside)).all()
+    assert np.isnan(approximation.temperature.value(EMF_RANGE[1] + 1))
+
+
+def test_scalar_matches_vector(approximation: ThermocoupleApproximation):
+    t = np.linspace(0, 2000, 9)
+    assert [approximation.emf.value(x) for x in t] == approximation.emf(t).tolist()
+
+
+def test_fit_polynomial_is_exact_to_rounding():
+    table = ChebyshevTable.fit(lambda x: x**3 - x, -2.0, 2.0, segments=4, degree=3)
+    x = np.linspace(-2.0, 2.0, 41)
+    np.testing.assert_allclose(table(x), x**3 - x, atol=1e-12)
+
+
+def test_save_and_load(approximation: ThermocoupleApproximation, tmp_path):
+    path = tmp_path / "thermocouple.npz"
+    approximation.save(path)
+    loaded = ThermocoupleApproximation.load(path)
+    t = np.linspace(0, 2000, 5)
+    assert np.array_equal(loaded.emf(t), approximation.emf(t))
+    assert loaded.temperature_error == approximation.temperature_error
+
+
+def test_cache_path_depends_on_coefficients():
+    coefficients = config.thermocouple_coefficients
+    changed = [coefficients[0] + 1e-6, *coefficients[1:]]
+    assert cache_path(coefficients, EMF_RANGE) == cache_path(coefficients, EMF_RANGE)
+    assert cache_path(coefficients, EMF_RANGE) != cache_path(changed, EMF_RANGE)
+
+
+def test_tables_cover_monotonic_range(monkeypatch, tmp_path):
+    # T(E) = 25·E - 0.5·E²: максимум при 25 мВ, внутри EMF_RANGE
+    coefficients = [0.0, 25.0, -0.5]
+    monkeypatch.setattr(config, "thermocouple_coefficients", coefficients)
+    monkeypatch.setattr(config, "thermocouple_approximation", True)
+    monkeypatch.setattr(thermocouple_approximation, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(thermocouple, "_thermocouple", None)
+    instance = get_thermocouple()
+    assert instance.emf_range == (EMF_RANGE[0], 25.0)
+    assert instance.approximation is not None
+    table = instance.approximation.temperature
+    assert table.start == EMF_RANGE[0]
+    assert table.start + table.width * len(table.rows) == pytest.approx(25.0)
+    assert cache_path(coefficients, instance.emf_range).exists()
@@ -1,48 +1,15 @@
+import multiprocessing
 import sys
 
-# from loguru import logger as log
-from PySide6 import QtWidgets
-
-from vta_collection.heater.controller import get_heater
-from vta_collection.helpers import set_excepthook
-from vta_collection.main_window import MainWindow
-from vta_collection.measurement import Measurement
-from vta_collection.new_measurement_window import NewMeasurementWindow
-from vta_collection.ui import resources_rc  # noqa: F401
-
-
-def close_splash():
-    if getattr(sys, "frozen", False) and hasattr(sys, "_MEIPASS"):
-        import pyi_splash  # type: ignore
-
-        pyi_splash.close()
-
-
 if __name__ == "__main__":
-    app = QtWidgets.QApplication(sys.argv)
-    set_excepthook()
-
-    w = MainWindow()
-    h = get_heater(parent=app)
-
-    def set_meas(meas: Measurement):
-        w.new_meas()
-        w.set_meas(meas=meas)
-        h.set_meas(meas=meas)
-        h.start_loop()
+    # Процесс опроса (config.acquisition_process) в собранном приложении
+    multiprocessing.freeze_support()
+    if sys.argv[1:2] == ["record"]:
+        # Запись без GUI: Qt не импортируется
+        from vta_collection.record import main
 
-    def new_meas():
-        nmw = NewMeasurementWindow(parent=w)
-        nmw.accepted.connect(set_meas)
-        nmw.show()
+        sys.exit(main(sys.argv[2:]))
 
-    w.action_new.triggered.connect(new_meas)
-    w.btn_start.clicked.connect(h.start_heating)
-    w.btn_stop.clicked.connect(h.stop_heating)
-    w.btn_stop_heat.clicked.connect(h.reset_heating)
-    w.sb_speed.valueChanged.connect(h.set_speed)
+    from vta_collection.app import main as gui_main
 
-    w.show()
-    close_splash()
-    app.aboutToQuit.connect(h.stop_loop)
-    sys.exit(app.exec())
+    sys.exit(gui_main())
@@ -1,12 +1,18 @@
-from typing import TYPE_CHECKING
+import re
+from types import MappingProxyType
+from typing import TYPE_CHECKING, ClassVar, Mapping
 
-from vta_collection.adam_4011_config import Adam4011Config
+from vta_collection.adam_4011_config import CC, Adam4011Config
 from vta_collection.adam_base import AdamBase, AdamBaseCommands
 
 if TYPE_CHECKING:
     from vta_collection.adam_4520 import Adam4520API
 
 
+# Ответ на #AA: >+dd.ddd в инженерных единицах и % диапазона, >HHHH в hex
+DATA_ANSWER = re.compile(rb">(?:[+-][0-9.]+|[0-9A-F]{4})")
+
+
 class Adam4011Commands(AdamBaseCommands):
     def __init__(self, address: bytes):
         super().__init__(address=address)
@@ -24,23 +30,28 @@ class Adam4011(AdamBase):
     model = "4011"
     name: str
     config: Adam4011Config
+    answer_lengths: ClassVar[Mapping[bytes, int]] = MappingProxyType(
+        {**AdamBase.answer_lengths, b"#": 8, b"$3": 8, b"$4": 11}
+    )
 
     def __init__(self, converter: "Adam4520API", address: int = 1):
         super().__init__(converter=converter, address=address)
         self.CMD = Adam4011Commands(self.address)
 
     def get_sync_data(self):
-        return self.converter.get_bytes_answer(self.CMD.GET_SYNC_DATA)
+        return self.query(self.CMD.GET_SYNC_DATA)
 
     def get_sync_data_f(self):
         return self.parse_sync_data(self.get_sync_data())
 
     def get_cjc_status(self):
-        return self.converter.send_command(cmd=self.CMD.CJC_STATUS)
+        return self.query_str(cmd=self.CMD.CJC_STATUS)
 
     def get_cjc_temperature(self) -> float:
         """Получение температуры холодного спая, парсинг >+0023.5 в float"""
-        response = self.get_cjc_status()
+        return self.parse_cjc_temperature(response=self.get_cjc_status())
+
+    def parse_cjc_temperature(self, response: str) -> float:
         # Парсинг ответа в формате >+0023.5
         if response.startswith(">") and len(response) >= 8:
             temp_str = response[1:8].strip()
@@ -51,14 +62,37 @@ class Adam4011(AdamBase):
         return self.parse_data(data=self.get_data_bytes())
 
     def get_data_bytes(self):
-        return self.converter.get_bytes_answer(cmd=self.CMD.GET_DATA)
+        return self.query(cmd=self.CMD.GET_DATA)
+
+    def is_valid_answer(self, cmd: bytes, answer: bytes) -> bool:
+        if self.command_kind(cmd) == b"#" and answer[:1] == b">":
+            return DATA_ANSWER.fullmatch(answer) is not None
+        return super().is_valid_answer(cmd=cmd, answer=answer)
 
     def parse_data(self, data: bytes):
-        return float(data.decode("ascii").strip()[2:])
+        # >+01.234 -> 1.234, знак сохраняется
+        return float(data.decode("ascii").strip()[1:])
 
     def parse_sync_data(self, data: bytes):
         return float(data.decode("ascii").strip()[5:])
 
     def setup(self):
         super().setup()
-        self.config = Adam4011Config.from_str(string=self.get_conf_status())
+        self.restore(name=self.name, conf_status=self.get_conf_status())
+
+    def restore(self, name: str, conf_status: str):
+        super().restore(name=name, conf_status=conf_status)
+        self.config = Adam4011Config.from_str(string=conf_status)
+        self.checksum = self.config.checksum == CC.C1
+
+    async def get_cjc_temperature_async(self) -> float:
+        response = await self.query_str_async(cmd=self.CMD.CJC_STATUS)
+        return self.parse_cjc_temperature(response=response)
+
+    async def get_data_async(self):
+        data = await self.query_async(cmd=self.CMD.GET_DATA)
+        return self.parse_data(data=data)
+
+    async def setup_async(self):
+        await super().setup_async()
+        self.restore(name=self.name, conf_status=await self.get_conf_status_async())
@@ -1,6 +1,14 @@
-from typing import TYPE_CHECKING
+from types import MappingProxyType
+from typing import TYPE_CHECKING, ClassVar, Mapping, Optional
 
-from vta_collection.adam_4021_config import Adam4021Config
+from vta_collection.adam_4021_config import (
+    CC,
+    ORC,
+    OUTPUT_SPANS,
+    SLEW_RATES,
+    SRC,
+    Adam4021Config,
+)
 from vta_collection.adam_base import AdamBase, AdamBaseCommands
 
 if TYPE_CHECKING:
@@ -15,25 +23,76 @@ class Adam4021Commands(AdamBaseCommands):
         self.CURRENT_OUTPUT = b"$AA8".replace(b"AA", address)
 
 
+# Разрядность ЦАП модуля
+DAC_BITS = 12
+# Шаг значения в команде #AA (формат 00.000)
+CMD_RESOLUTION = 0.001
+
+
 class Adam4021(AdamBase):
     model = "4021"
     name: str
     CMD: Adam4021Commands
+    answer_lengths: ClassVar[Mapping[bytes, int]] = MappingProxyType(
+        {**AdamBase.answer_lengths, b"#": 1, b"$8": 9}
+    )
 
     def __init__(self, converter: "Adam4520API", address: int = 1):
         super().__init__(converter=converter, address=address)
         self.CMD = Adam4021Commands(self.address)
+        self.config: Optional[Adam4021Config] = None
 
     def set_output(self, value: float):
-        value += 0.001
-        cmd = self.CMD.SET_OUTPUT + f"{value:06.3f}".encode()
-        answer = self.converter.get_bytes_answer(cmd=cmd)
+        answer = self.query(cmd=self.output_cmd(value=value))
         return answer
 
+    def output_cmd(self, value: float) -> bytes:
+        value += 0.001
+        return self.CMD.SET_OUTPUT + f"{value:06.3f}".encode()
+
+    def output_step(self) -> float:
+        """Наименьшее изменение выхода, которое меняет код ЦАП"""
+        output_range = ORC.C32 if self.config is None else self.config.output_range
+        return max(OUTPUT_SPANS[output_range] / 2**DAC_BITS, CMD_RESOLUTION)
+
+    def quantize(self, value: float) -> float:
+        """Значение, которое модуль фактически установит на выходе"""
+        step = self.output_step()
+        return round(round(value / step) * step, 3)
+
+    def slew_interval(self) -> float:
+        """Время нарастания выхода на один шаг ЦАП, с (0 - без ограничения)"""
+        if self.config is None or self.config.slewrate == SRC.C0000:
+            return 0.0
+        rate = SLEW_RATES[self.config.slewrate]
+        if self.config.output_range != ORC.C32:
+            rate *= 2  # мА/с
+        return self.output_step() / rate
+
+    @staticmethod
+    def is_output_accepted(answer: bytes) -> bool:
+        return answer.strip() == b">"
+
     def meas_output(self):
-        return self.converter.get_bytes_answer(self.CMD.CURRENT_OUTPUT)
+        return self.query(self.CMD.CURRENT_OUTPUT)
 
     def setup(self):
         super().setup()
-        self.config = Adam4021Config.from_str(string=self.get_conf_status())
+        self.restore(name=self.name, conf_status=self.get_conf_status())
         self.set_output(value=0.0)
+
+    def restore(self, name: str, conf_status: str):
+        super().restore(name=name, conf_status=conf_status)
+        self.config = Adam4021Config.from_str(string=conf_status)
+        self.checksum = self.config.checksum == CC.C1
+
+    async def set_output_async(self, value: float):
+        return await self.query_async(cmd=self.output_cmd(value=value))
+
+    async def meas_output_async(self):
+        return await self.query_async(self.CMD.CURRENT_OUTPUT)
+
+    async def setup_async(self):
+        await super().setup_async()
+        self.restore(name=self.name, conf_status=await self.get_conf_status_async())
+        await self.set_output_async(value=0.0)
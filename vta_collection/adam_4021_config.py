@@ -17,6 +17,13 @@ INPUTRANGE_CODES: dict[ORC, str] = {
     ORC.C32: "0 to 10 V",
 }
 
+# Ширина диапазона выхода в единицах команды #AA (мА или В)
+OUTPUT_SPANS: dict[ORC, float] = {
+    ORC.C30: 20.0,
+    ORC.C31: 16.0,
+    ORC.C32: 10.0,
+}
+
 
 class BC(Enum):
     C03 = "03"
@@ -103,6 +110,13 @@ SLEW_RATE_CODES: dict[SRC, str] = {
     SRC.C1011: "64.00 V/sec 128.0 mA/sec",
 }
 
+# Скорость нарастания выхода по напряжению, В/с (по току вдвое больше, мА/с);
+# 0 - выход меняется сразу
+SLEW_RATES: dict[SRC, float] = {
+    src: 0.0 if src == SRC.C0000 else 0.0625 * 2 ** (int(src.value, 2) - 1)
+    for src in SRC
+}
+
 
 class Codes:
     OutputRange = ORC
@@ -1,9 +1,14 @@
+import asyncio
+from typing import Sequence
+
 import serial
 from loguru import logger as log
 
 from vta_collection.adam_4011 import Adam4011
 from vta_collection.adam_4021 import Adam4021
-from vta_collection.base_instrument import BaseInstrument
+from vta_collection.adam_base import AdamBase
+from vta_collection.adam_checksum import resync
+from vta_collection.base_instrument import BaseInstrument, Reply
 from vta_collection.config import config
 
 
@@ -14,13 +19,17 @@ class ModulesNotFound(Exception):
 class Adam4520API(BaseInstrument):
     modelname = "4520"
     endchar = b"\r"
-    modules: tuple[Adam4011, Adam4021]
+    # Первые два модуля - основной вход и выход, за ними дополнительные входы
+    modules: tuple[Adam4011, Adam4021, *tuple[Adam4011, ...]]
+    resync = staticmethod(resync)
 
-    def __init__(self, timeout: float | None):
+    def __init__(self, timeout: float | None, baudrate: int | None = None):
         if timeout is None:
             timeout = 0.1
+        if baudrate is None:
+            baudrate = config.adam_baudrate
         super().__init__(
-            baudrate=config.adam_baudrate,
+            baudrate=baudrate,
             timeout=timeout,
             bytesize=serial.EIGHTBITS,
             parity=serial.PARITY_NONE,
@@ -28,26 +37,119 @@ class Adam4520API(BaseInstrument):
             rtscts=False,
             dsrdtr=True,
         )
+        # Число повторенных команд, для оценки качества линии
+        self.retried = 0
 
     def find_on_port(self, port: str):
         self.open_serial(port=port)
 
-        original_timeout = self.ser.timeout
-        self.ser.timeout = 5
-        try:
-            self.found = self.modules_check_identity()
-        finally:
-            self.ser.timeout = original_timeout
-        self.modules_setup()
+        # Таймауты опроса модулей рассчитываются по скорости порта
+        # (AdamBase.timeout_for), отсутствующий модуль не задерживает поиск
+        self.found = self.modules_check_identity()
+
+        if not self.found:
+            self.close_serial()
+            raise ModulesNotFound(f"{self.modelname}: not found {self.modules}")
+        else:
+            self.modules_setup()
+            log.info(f"{self.modelname}: found {[mod.name for mod in self.modules]}")
+
+        return self.found
+
+    def restore_on_port(self, port: str, identities: Sequence[tuple[str, str]]):
+        """Быстрый запуск по сохраненным (name, conf_status) модулей.
+
+        Каждому модулю отправляется одна команда $AA2. Если ответ совпал с
+        сохраненным, модуль настраивается без повторного опроса, иначе порт
+        закрывается и возвращается False.
+        """
+        # Конфигурация восстанавливается до проверки: от нее зависит,
+        # передается ли контрольная сумма
+        for mod, (name, conf_status) in zip(self.modules, identities):
+            mod.restore(name=name, conf_status=conf_status)
+
+        self.open_serial(port=port)
+        replies = self.exchange_modules(
+            [(mod, mod.CMD.GET_CONF_STATUS) for mod in self.modules]
+        )
+        for reply, (_, conf_status) in zip(replies, identities):
+            answer = reply.answer.decode(errors="replace").strip()
+            if answer != conf_status:
+                log.warning(
+                    f"{self.modelname}: {reply.cmd!r} answered {answer!r}, "
+                    f"expected {conf_status!r}"
+                )
+                self.close_serial()
+                self.found = False
+                return self.found
+
+        # Как и setup(), запуск начинается с нулевого выхода
+        self.modules[1].set_output(value=0.0)
+        self.found = True
+        log.info(f"{self.modelname}: restored {[mod.name for mod in self.modules]}")
+        return self.found
+
+    async def find_on_port_async(self, port: str):
+        self.open_serial(port=port)
+
+        self.found = await self.modules_check_identity_async()
 
         if not self.found:
+            self.close_async_bus()
             self.close_serial()
             raise ModulesNotFound(f"{self.modelname}: not found {self.modules}")
         else:
+            await self.modules_setup_async()
             log.info(f"{self.modelname}: found {[mod.name for mod in self.modules]}")
 
         return self.found
 
+    async def modules_check_identity_async(self):
+        checks = [mod.check_identity_async() for mod in self.modules]
+        return all(await asyncio.gather(*checks))
+
+    async def modules_setup_async(self):
+        for mod in self.modules:
+            await mod.setup_async()
+
+    def exchange_modules(
+        self, requests: Sequence[tuple[AdamBase, bytes]]
+    ) -> list[Reply]:
+        """exchange() с таймаутами и обучением задержек модулей-адресатов.
+
+        Команды с потерянным или поврежденным ответом повторяются одним
+        пакетом, до mod.retries раз. Команды, не переданные из-за потерянного
+        ответа на предыдущую, передаются следующим пакетом без учета повтора.
+        Ответы возвращаются без контрольной суммы, b"" - если команда так и не
+        получила верного ответа.
+        """
+        replies: dict[int, Reply] = {}
+        attempts = [0] * len(requests)
+        pending = list(enumerate(requests))
+        while pending:
+            raw = self.exchange(
+                cmds=[mod.framed(cmd) for _, (mod, cmd) in pending],
+                timeouts=[mod.timeout_for(cmd) for _, (mod, cmd) in pending],
+            )
+            failed = []
+            for (i, (mod, cmd)), reply in zip(pending, raw):
+                reply = reply._replace(cmd=cmd)
+                accepted = mod.accept(reply)
+                if accepted is not None:
+                    replies[i] = accepted
+                    continue
+                replies[i] = reply._replace(answer=b"")
+                if attempts[i] < mod.retries:
+                    attempts[i] += 1
+                    failed.append((i, (mod, cmd)))
+                else:
+                    log.warning(f"{self.modelname}: No valid answer to {cmd!r}")
+            if failed:
+                self.retried += len(failed)
+                log.debug(f"{self.modelname}: Retrying {[c for _, (_, c) in failed]}")
+            pending = failed + pending[len(raw) :]
+        return [replies[i] for i in range(len(requests))]
+
     def modules_check_identity(self):
         return all(mod.check_identity() for mod in self.modules)
 
@@ -60,14 +162,38 @@ class Adam4520API(BaseInstrument):
 
 
 class Adam4520(Adam4520API):
-    def __init__(self, timeout: float | None = None):
-        super().__init__(timeout=timeout)
+    def __init__(self, timeout: float | None = None, baudrate: int | None = None):
+        super().__init__(timeout=timeout, baudrate=baudrate)
 
     def setup(self):
         self.modules_setup()
         log.info(f"{self.modelname} is set for work")
 
 
+if __name__ == "__main__":
+    # Опрос входа и температуры холодного спая из двух корутин на одной шине
+    from vta_collection.adam_simulator import SIM_PORT
+    from vta_collection.hardware import Hardware
+
+    async def main():
+        hardware = Hardware()
+        await hardware.adam4520.find_on_port_async(port=SIM_PORT)
+
+        async def poll_data():
+            for _ in range(20):
+                print("emf", await hardware.adam4011.get_data_async())
+
+        async def poll_cjc():
+            for _ in range(5):
+                print("cjc", await hardware.adam4011.get_cjc_temperature_async())
+                await asyncio.sleep(0.05)
+
+        await asyncio.gather(poll_data(), poll_cjc())
+        hardware.adam4520.close_async_bus()
+        hardware.adam4520.close_serial()
+
+    asyncio.run(main())
+
 # if __name__ == '__main__':
 #     app = QApplication()
 #     adam = Adam4520()
@@ -1,8 +1,21 @@
-from typing import TYPE_CHECKING
+from types import MappingProxyType
+from typing import TYPE_CHECKING, ClassVar, Mapping, Optional
+
+from loguru import logger as log
+
+from vta_collection.adam_checksum import ANSWER_LEADS, add_checksum, strip_checksum
+from vta_collection.base_instrument import Reply
+from vta_collection.latency import LatencyEstimator
+from vta_collection.serial_base import char_time
 
 if TYPE_CHECKING:
     from vta_collection.adam_4520 import Adam4520API
 
+# Длина ответа для команд, которых нет в AdamBase.answer_lengths
+DEFAULT_ANSWER_LENGTH = 10
+# Число повторов команды, ответ на которую потерян или поврежден
+MAX_RETRIES = 2
+
 
 class AdamBaseCommands:
     def __init__(self, address: bytes):
@@ -21,22 +34,159 @@ class AdamBaseCommands:
 
 class AdamBase:
     model: str
+    name: str
+    conf_status: str  # ответ на $AA2
     CMD: AdamBaseCommands
+    # Ожидаемая длина ответа без завершающего символа по типу команды
+    answer_lengths: ClassVar[Mapping[bytes, int]] = MappingProxyType(
+        {b"$M": 7, b"$2": 9}
+    )
+    retries = MAX_RETRIES
 
     def __init__(self, converter: "Adam4520API", address: int = 1):
         self.converter = converter
         self.address = f"{address:02d}".encode("ascii")
+        self.latency: dict[bytes, LatencyEstimator] = {}
+        # Контрольная сумма в командах и ответах (флаг CC конфигурации модуля)
+        self.checksum = False
+
+    def set_address(self, address: int):
+        self.address = f"{address:02d}".encode("ascii")
+        self.CMD = type(self.CMD)(self.address)
+
+    @staticmethod
+    def command_kind(cmd: bytes) -> bytes:
+        """Тип команды без адреса и числовых данных (#01 -> #, $012 -> $2)"""
+        return cmd[:1] + cmd[3:].rstrip(b"0123456789.+-")
+
+    def timeout_for(self, cmd: bytes) -> float:
+        """Таймаут ответа: передача команды и ответа плюс выученная задержка модуля"""
+        kind = self.command_kind(cmd)
+        answer_length = self.answer_lengths.get(kind, DEFAULT_ANSWER_LENGTH)
+        if self.checksum:
+            answer_length += 2
+        ct = char_time(self.converter.ser)
+        estimator = self.latency.setdefault(kind, LatencyEstimator())
+        return (len(self.framed(cmd)) + answer_length + 2) * ct + estimator.bound()
+
+    def learn(self, reply: Reply):
+        estimator = self.latency.setdefault(
+            self.command_kind(reply.cmd), LatencyEstimator()
+        )
+        if not reply.answer:
+            estimator.miss()
+            return
+        ct = char_time(self.converter.ser)
+        sent_length = len(self.framed(reply.cmd)) + len(reply.answer) + 1
+        estimator.add(max(0.0, reply.elapsed - sent_length * ct))
+
+    def framed(self, cmd: bytes) -> bytes:
+        """Команда в том виде, в котором она передается модулю"""
+        return add_checksum(cmd) if self.checksum else cmd
+
+    def payload(self, cmd: bytes, answer: bytes) -> Optional[bytes]:
+        """Ответ без контрольной суммы и endchar, None - ответ потерян или поврежден"""
+        answer = answer.rstrip(self.converter.endchar)
+        if self.checksum and answer:
+            stripped = strip_checksum(answer)
+            if stripped is None:
+                log.warning(f"{self.converter.modelname}: Bad checksum {answer!r}")
+            answer = stripped or b""
+        if not answer or not self.is_valid_answer(cmd=cmd, answer=answer):
+            return None
+        return answer
+
+    def is_valid_answer(self, cmd: bytes, answer: bytes) -> bool:
+        return answer[:1] in ANSWER_LEADS and all(0x20 <= c < 0x7F for c in answer)
+
+    def accept(self, reply: Reply) -> Optional[Reply]:
+        """Учесть задержку ответа и проверить его, None - команду нужно повторить"""
+        self.learn(reply)
+        answer = self.payload(cmd=reply.cmd, answer=reply.answer)
+        if answer is None:
+            return None
+        return reply._replace(answer=answer)
+
+    def silence_for(self, cmd: bytes) -> Optional[float]:
+        """Время до первого байта ответа, None - ответ ждется весь timeout_for"""
+        return None
+
+    def query(self, cmd: bytes) -> bytes:
+        for _ in range(self.retries + 1):
+            reply = self.converter.request(
+                cmd=self.framed(cmd),
+                timeout=self.timeout_for(cmd),
+                silence=self.silence_for(cmd),
+            )
+            accepted = self.accept(reply._replace(cmd=cmd))
+            if accepted is not None:
+                return accepted.answer
+        return b""
+
+    def query_str(self, cmd: bytes, logging_answer: bool = False) -> str:
+        log.info(f"{self.converter.modelname}: Send command: {cmd!r}")
+        answer = self.query(cmd=cmd).decode().strip()
+        if logging_answer:
+            log.info(f"{self.converter.modelname}: Answer: {answer}")
+        return answer
+
+    async def query_async(self, cmd: bytes) -> bytes:
+        for _ in range(self.retries + 1):
+            reply = await self.converter.request_async(
+                cmd=self.framed(cmd), timeout=self.timeout_for(cmd)
+            )
+            accepted = self.accept(reply._replace(cmd=cmd))
+            if accepted is not None:
+                return accepted.answer
+        return b""
+
+    async def query_str_async(self, cmd: bytes, logging_answer: bool = False) -> str:
+        log.info(f"{self.converter.modelname}: Send command: {cmd!r}")
+        answer = (await self.query_async(cmd=cmd)).decode().strip()
+        if logging_answer:
+            log.info(f"{self.converter.modelname}: Answer: {answer}")
+        return answer
 
     def check_identity(self) -> bool:
-        return self.model in self.get_name()
+        if self.model in self.get_name():
+            return True
+        # Модуль с включенной контрольной суммой молчит на команды без нее
+        self.checksum = not self.checksum
+        if self.model in self.get_name():
+            return True
+        self.checksum = not self.checksum
+        return False
 
     def get_conf_status(self):
-        return self.converter.send_command(
-            cmd=self.CMD.GET_CONF_STATUS, logging_answer=True
-        )
+        return self.query_str(cmd=self.CMD.GET_CONF_STATUS, logging_answer=True)
 
     def get_name(self):
-        return self.converter.send_command(cmd=self.CMD.GET_NAME, logging_answer=True)
+        return self.query_str(cmd=self.CMD.GET_NAME, logging_answer=True)
 
     def setup(self):
         self.name = self.get_name()
+
+    def restore(self, name: str, conf_status: str):
+        """Настройка по сохраненным ответам на $AAM и $AA2 без опроса модуля"""
+        self.name = name
+        self.conf_status = conf_status
+
+    async def check_identity_async(self) -> bool:
+        if self.model in await self.get_name_async():
+            return True
+        self.checksum = not self.checksum
+        if self.model in await self.get_name_async():
+            return True
+        self.checksum = not self.checksum
+        return False
+
+    async def get_conf_status_async(self):
+        return await self.query_str_async(
+            cmd=self.CMD.GET_CONF_STATUS, logging_answer=True
+        )
+
+    async def get_name_async(self):
+        return await self.query_str_async(cmd=self.CMD.GET_NAME, logging_answer=True)
+
+    async def setup_async(self):
+        self.name = await self.get_name_async()
@@ -0,0 +1,35 @@
+"""Контрольная сумма протокола ADAM-4000.
+
+Сумма кодов всех символов команды (ответа) по модулю 256 передается двумя
+шестнадцатеричными символами перед завершающим \\r. Модуль с включенной
+контрольной суммой не отвечает на команду с неверной суммой.
+"""
+
+from typing import Optional
+
+# Символы, с которых начинается любой ответ модуля
+ANSWER_LEADS = b">!?"
+
+
+def checksum(data: bytes) -> bytes:
+    return f"{sum(data) & 0xFF:02X}".encode("ascii")
+
+
+def add_checksum(data: bytes) -> bytes:
+    return data + checksum(data)
+
+
+def strip_checksum(data: bytes) -> Optional[bytes]:
+    """Данные без контрольной суммы, None - сумма не совпала"""
+    body, received = data[:-2], data[-2:]
+    if len(data) < 3 or checksum(body) != received.upper():
+        return None
+    return body
+
+
+def resync(frame: bytes) -> bytes:
+    """Отбросить помехи перед началом ответа, b"" - в кадре нет ответа"""
+    for pos, char in enumerate(frame):
+        if char in ANSWER_LEADS:
+            return frame[pos:]
+    return b""
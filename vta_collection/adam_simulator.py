@@ -0,0 +1,382 @@
+"""Программный симулятор шины RS-485 с модулями ADAM-4011/4021.
+
+Подменяет serial.Serial под SerialWorker, если порт задан как ``sim://``.
+Параметры симуляции передаются в строке порта, например::
+
+    sim://?adam4011=1&adam4021=3&baudrate=9600&latency=0.002&noise=0.001
+
+- adam4011, adam4021 - адреса модулей через запятую (по умолчанию адреса
+  из config, включая config.extra_inputs);
+- baudrate - скорость, на которую настроены модули (по умолчанию
+  config.adam_baudrate); при несовпадении со скоростью порта модули молчат;
+- latency - задержка ответа модуля после приема команды, с;
+- delay - множитель времени передачи одного символа (0 - без задержек);
+- noise - СКО шума входного сигнала 4011, мВ;
+- checksum - 1, если у модулей включена контрольная сумма;
+- error_rate - доля ответов, искаженных помехой на линии (замена байта,
+  мусор перед ответом или потеря ответа);
+- furnace - 1, если основной 4011 измеряет модель печи (config.furnace),
+  нагреваемую выходом 4021, а не синус.
+"""
+
+import math
+import random
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from serial.serialutil import PortNotOpenError, SerialBase, SerialException
+
+from vta_collection.adam_4011_config import BAUDRATE_CODES
+from vta_collection.adam_checksum import add_checksum, strip_checksum
+from vta_collection.config import config
+from vta_collection.furnace_model import FurnaceModel
+from vta_collection.serial_base import char_time
+
+SIM_PORT = "sim://"
+
+BAUDRATE_TO_CODE: dict[int, str] = {
+    baudrate: code.value for code, baudrate in BAUDRATE_CODES.items()
+}
+
+
+def is_simulated_port(port: str) -> bool:
+    return port.startswith(SIM_PORT)
+
+
+def default_emf_source() -> float:
+    return math.sin(time.monotonic())
+
+
+def furnace_emf_source(
+    model: FurnaceModel, output: "SimulatedAdam4021"
+) -> Callable[[], float]:
+    """ЭДС модели печи, которая ведется по часам и нагревается выходом 4021"""
+    start = time.monotonic()
+
+    def source() -> float:
+        model.advance(until=time.monotonic() - start)
+        model.set_output(output.output)
+        return model.emf()
+
+    return source
+
+
+class SimulatedModule:
+    model: str
+    input_range: str
+
+    def __init__(self, address: int, baudrate: int, checksum: bool = False):
+        self.address = f"{address:02d}"
+        self.baudrate = baudrate
+        self.checksum = checksum
+
+    def config_str(self) -> str:
+        return (
+            f"{self.address}{self.input_range}"
+            f"{BAUDRATE_TO_CODE[self.baudrate]}{self.flags():02X}"
+        )
+
+    def flags(self) -> int:
+        return 0x40 if self.checksum else 0
+
+    def handle(self, cmd: str) -> Optional[str]:
+        """Ответ модуля на команду без завершающего символа, None - неверная команда"""
+        prefix, body = cmd[0], cmd[3:]
+        if prefix == "$" and body == "M":
+            return f"!{self.address}{self.model}"
+        if prefix == "$" and body == "2":
+            return f"!{self.config_str()}"
+        return None
+
+
+class SimulatedAdam4011(SimulatedModule):
+    model = "4011"
+    input_range = "01"  # ± 50 mV
+
+    def __init__(
+        self,
+        address: int,
+        baudrate: int,
+        checksum: bool = False,
+        emf_source: Callable[[], float] = default_emf_source,
+        noise: float = 0.0,
+        cjc_temperature: float = 25.0,
+    ):
+        super().__init__(address=address, baudrate=baudrate, checksum=checksum)
+        self.emf_source = emf_source
+        self.noise = noise
+        self.cjc_temperature = cjc_temperature
+
+    def flags(self) -> int:
+        return super().flags() | 0x80  # 60 ms integration time
+
+    def read_emf(self) -> float:
+        emf = self.emf_source()
+        if self.noise:
+            emf += random.gauss(0.0, self.noise)
+        return emf
+
+    def handle(self, cmd: str) -> Optional[str]:
+        prefix, body = cmd[0], cmd[3:]
+        if prefix == "#" and body == "":
+            return f">{self.read_emf():+07.3f}"
+        if prefix == "$" and body == "3":
+            return f">{self.cjc_temperature:+07.1f}"
+        return super().handle(cmd)
+
+
+class SimulatedAdam4021(SimulatedModule):
+    model = "4021"
+    input_range = "32"  # 0 to 10 V
+
+    def __init__(self, address: int, baudrate: int, checksum: bool = False):
+        super().__init__(address=address, baudrate=baudrate, checksum=checksum)
+        self.output = 0.0
+
+    def handle(self, cmd: str) -> Optional[str]:
+        prefix, body = cmd[0], cmd[3:]
+        if prefix == "#" and body:
+            try:
+                value = float(body)
+            except ValueError:
+                return None
+            if not 0.0 <= value <= 10.0:
+                return None
+            self.output = value
+            return ">"
+        if prefix == "$" and body == "8":
+            return f"!{self.address}{self.output:06.3f}"
+        return super().handle(cmd)
+
+
+class SimulatedBus:
+    """Шина RS-485: передает команду модулю с нужным адресом"""
+
+    def __init__(self, modules: list[SimulatedModule], latency: float = 0.0):
+        self.modules = {mod.address: mod for mod in modules}
+        self.latency = latency
+
+    def handle(self, frame: bytes, baudrate: int) -> Optional[bytes]:
+        if len(frame) < 3:
+            return None
+        module = self.modules.get(frame[1:3].decode("ascii", errors="replace"))
+        if module is None or module.baudrate != baudrate:
+            return None
+        if module.checksum:
+            # Команду с неверной контрольной суммой модуль игнорирует
+            stripped = strip_checksum(frame)
+            if stripped is None:
+                return None
+            frame = stripped
+        answer = module.handle(frame.decode("ascii", errors="replace"))
+        if answer is None:
+            answer = f"?{module.address}"
+        data = answer.encode("ascii")
+        return add_checksum(data) if module.checksum else data
+
+
+def _parse_addresses(values: list[str], default: list[int]) -> list[int]:
+    if not values:
+        return default
+    return [int(address) for address in values[0].split(",") if address]
+
+
+class SimulatedSerial(SerialBase):
+    """Последовательный порт, за которым находится SimulatedBus"""
+
+    endchar = b"\r"
+
+    def __init__(self, *args, **kwargs):
+        self.bus: Optional[SimulatedBus] = None
+        self.delay = 1.0
+        self.error_rate = 0.0
+        self._cond = threading.Condition()
+        self._tx = bytearray()
+        self._rx = bytearray()
+        self._pending: deque[tuple[float, bytes]] = deque()
+        self._line_free_at = 0.0
+        super().__init__(*args, **kwargs)
+
+    def open(self):
+        if self.is_open:
+            raise SerialException("Port is already open.")
+        if self._port is None:
+            raise SerialException("Port must be configured before it can be used.")
+        self.from_url(self.port)
+        self._reconfigure_port()
+        self.is_open = True
+        self.reset_input_buffer()
+        self.reset_output_buffer()
+
+    def close(self):
+        with self._cond:
+            self.is_open = False
+            self._pending.clear()
+            self._cond.notify_all()
+        super().close()
+
+    def from_url(self, url: str):
+        parts = urlsplit(url)
+        if parts.scheme != "sim":
+            raise SerialException(f"expected a string in the form 'sim://': {url!r}")
+        options = parse_qs(parts.query)
+        baudrate = int(options.get("baudrate", [config.adam_baudrate])[0])
+        noise = float(options.get("noise", [0.0])[0])
+        checksum = options.get("checksum", ["0"])[0] == "1"
+        modules: list[SimulatedModule] = [
+            SimulatedAdam4011(
+                address=address, baudrate=baudrate, checksum=checksum, noise=noise
+            )
+            for address in _parse_addresses(
+                options.get("adam4011", []),
+                [config.adam4011_address] + [ch.address for ch in config.extra_inputs],
+            )
+        ]
+        modules += [
+            SimulatedAdam4021(address=address, baudrate=baudrate, checksum=checksum)
+            for address in _parse_addresses(
+                options.get("adam4021", []), [config.adam4021_address]
+            )
+        ]
+        if options.get("furnace", ["0"])[0] == "1":
+            inputs = [m for m in modules if isinstance(m, SimulatedAdam4011)]
+            outputs = [m for m in modules if isinstance(m, SimulatedAdam4021)]
+            if not inputs or not outputs:
+                raise SerialException("furnace model needs an ADAM-4011 and 4021")
+            adam4011, adam4021 = inputs[0], outputs[0]
+            adam4011.emf_source = furnace_emf_source(
+                model=FurnaceModel(cjc_temperature=adam4011.cjc_temperature),
+                output=adam4021,
+            )
+        self.delay = float(options.get("delay", [1.0])[0])
+        self.error_rate = float(options.get("error_rate", [0.0])[0])
+        self.bus = SimulatedBus(
+            modules=modules, latency=float(options.get("latency", [0.002])[0])
+        )
+
+    def _reconfigure_port(self, *args, **kwargs):
+        if not isinstance(self.baudrate, int) or not 0 < self.baudrate < 2**32:
+            raise ValueError(f"invalid baudrate: {self.baudrate!r}")
+
+    def _char_time(self) -> float:
+        return char_time(self) * self.delay
+
+    def _collect(self, now: float):
+        while self._pending and self._pending[0][0] <= now:
+            self._rx += self._pending.popleft()[1]
+
+    @property
+    def in_waiting(self) -> int:
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._cond:
+            self._collect(time.monotonic())
+            return len(self._rx)
+
+    def read(self, size: int = 1) -> bytes:
+        if not self.is_open:
+            raise PortNotOpenError()
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._collect(now)
+                if len(self._rx) >= size or not self.is_open:
+                    break
+                if deadline is not None and now >= deadline:
+                    break
+                wait = None if deadline is None else deadline - now
+                if self._pending:
+                    until_next = self._pending[0][0] - now
+                    wait = until_next if wait is None else min(wait, until_next)
+                self._cond.wait(wait)
+            data = bytes(self._rx[:size])
+            del self._rx[:size]
+        return data
+
+    def write(self, data) -> int:
+        if not self.is_open:
+            raise PortNotOpenError()
+        assert self.bus is not None
+        with self._cond:
+            self._tx += data
+            ct = self._char_time()
+            while (end := self._tx.find(self.endchar)) >= 0:
+                frame = bytes(self._tx[:end])
+                del self._tx[: end + 1]
+                tx_end = max(time.monotonic(), self._line_free_at) + (end + 1) * ct
+                answer = self.bus.handle(frame=frame, baudrate=self.baudrate)
+                if answer is not None and random.random() < self.error_rate:
+                    answer = self._corrupt(answer)
+                if answer is None:
+                    self._line_free_at = tx_end
+                    continue
+                answer += self.endchar
+                # Байты ответа приходят по одному со скоростью линии
+                start = tx_end + self.bus.latency
+                for i in range(len(answer)):
+                    self._pending.append((start + (i + 1) * ct, answer[i : i + 1]))
+                self._line_free_at = start + len(answer) * ct
+            self._cond.notify_all()
+        return len(data)
+
+    @staticmethod
+    def _corrupt(answer: bytes) -> Optional[bytes]:
+        kind = random.randrange(3)
+        if kind == 0:
+            return None
+        if kind == 1:
+            return (
+                bytes(random.randrange(256) for _ in range(3)).replace(
+                    SimulatedSerial.endchar, b""
+                )
+                + answer
+            )
+        data = bytearray(answer)
+        data[random.randrange(len(data))] = random.randrange(0x20, 0x7F)
+        return bytes(data)
+
+    def reset_input_buffer(self):
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._cond:
+            self._collect(time.monotonic())
+            self._rx.clear()
+
+    def reset_output_buffer(self):
+        if not self.is_open:
+            raise PortNotOpenError()
+        with self._cond:
+            self._tx.clear()
+
+    def cancel_read(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def _update_break_state(self):
+        pass
+
+    def _update_rts_state(self):
+        pass
+
+    def _update_dtr_state(self):
+        pass
+
+
+if __name__ == "__main__":
+    # Замер числа отсчетов в секунду через полный стек драйверов
+    from vta_collection.hardware import Hardware
+
+    config.comport = SIM_PORT
+    hardware = Hardware()
+    hardware.find()
+    n = 200
+    start = time.monotonic()
+    for _ in range(n):
+        hardware.adam4011.get_data()
+        hardware.adam4021.set_output(value=1.0)
+    elapsed = time.monotonic() - start
+    print(f"{n / elapsed:.1f} samples/s at {config.adam_baudrate} baud")
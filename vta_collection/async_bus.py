@@ -0,0 +1,63 @@
+import asyncio
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+from loguru import logger as log
+
+if TYPE_CHECKING:
+    from vta_collection.serial_base import SerialWorker
+
+
+class AsyncBus:
+    """Асинхронный доступ к шине из корутин одного цикла событий.
+
+    Кадры из потока приема FrameReader передаются в цикл событий через
+    call_soon_threadsafe. Шина полудуплексная, поэтому одновременно выполняется
+    один запрос: корутины встают в очередь на asyncio.Lock, а ответ
+    сопоставляется с запросом по порядку и по адресу.
+    """
+
+    def __init__(self, worker: "SerialWorker"):
+        if worker.reader is None:
+            raise RuntimeError("Serial port must be opened before async use")
+        self.worker = worker
+        self.loop = asyncio.get_running_loop()
+        self._lock = asyncio.Lock()
+        self._frames: asyncio.Queue[bytes] = asyncio.Queue()
+        worker.reader.listener = self._on_frame
+
+    def _on_frame(self, frame: bytes):
+        # Вызывается из потока приема
+        self.loop.call_soon_threadsafe(self._frames.put_nowait, frame)
+
+    def detach(self):
+        if self.worker.reader is not None:
+            self.worker.reader.listener = None
+
+    def _discard_stale(self):
+        while not self._frames.empty():
+            log.debug(f"Late answer discarded: {self._frames.get_nowait()!r}")
+
+    async def request(
+        self,
+        cmd: bytes,
+        timeout: Optional[float],
+        matches: Callable[[bytes, bytes], bool] = lambda cmd, answer: True,
+        resync: Callable[[bytes], bytes] = lambda frame: frame,
+    ) -> bytes:
+        """Отправить команду и дождаться ответа на нее, b"" - при таймауте"""
+        async with self._lock:
+            self._discard_stale()
+            # На Windows запись блокируется до окончания передачи
+            await asyncio.to_thread(self.worker.ser.write, cmd + self.worker.endchar)
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                try:
+                    frame = await asyncio.wait_for(self._frames.get(), remaining)
+                except TimeoutError:
+                    return b""
+                answer = resync(frame)
+                if answer and matches(cmd, answer):
+                    return answer
+                log.warning(f"Stale answer {frame!r} to {cmd!r}")
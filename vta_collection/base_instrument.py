@@ -1,9 +1,20 @@
+import time
+from typing import NamedTuple, Optional, Sequence
+
 from loguru import logger as log
 
+from vta_collection.async_bus import AsyncBus
 from vta_collection.config import config
 from vta_collection.serial_base import SerialWorker
 
 
+class Reply(NamedTuple):
+    cmd: bytes
+    answer: bytes
+    t: float  # time.monotonic() в момент получения ответа
+    elapsed: float  # время от отправки команды до получения ответа, с
+
+
 class BaseInstrument(SerialWorker):
     modelname: str
 
@@ -27,28 +38,180 @@ class BaseInstrument(SerialWorker):
             rtscts=rtscts,
         )
         self.found = False
+        self.async_bus: Optional[AsyncBus] = None
 
-        # В тестовом режиме переопределяем метод send_command
+        # В тестовом режиме переопределяем метод request, через который
+        # проходят все команды
         if config.is_test_mode:
-            self.send_command = self._test_mode_send_command
+            self.request = self._test_mode_request
+            self.request_async = self._test_mode_request_async
 
-    def _test_mode_send_command(self, cmd: bytes, logging_answer: bool = False) -> str:
+    def _test_mode_request(
+        self,
+        cmd: bytes,
+        timeout: Optional[float] = None,
+        silence: Optional[float] = None,
+    ) -> Reply:
         log.debug(f"{self.modelname}: Test mode - would send command: {cmd!r}")
         raise Exception(
             f"Hardware communication disabled in test mode. Would send: {cmd!r}"
         )
 
-    def send_command(self, cmd: bytes, logging_answer: bool = False) -> str:
+    async def _test_mode_request_async(
+        self, cmd: bytes, timeout: Optional[float] = None
+    ) -> Reply:
+        return self._test_mode_request(cmd=cmd, timeout=timeout)
+
+    def send_command(
+        self, cmd: bytes, logging_answer: bool = False, timeout: Optional[float] = None
+    ) -> str:
         log.info(f"{self.modelname}: Send command: {cmd!r}")
-        answer = self.get_str_answer(cmd=cmd)
+        answer = self.get_str_answer(cmd=cmd, timeout=timeout)
         if logging_answer:
             log.info(f"{self.modelname}: Answer: {answer}")
         return answer
 
-    def get_bytes_answer(self, cmd: bytes):
-        self.write_serial(cmd=cmd)
-        return self.read_serial()
+    def request(
+        self,
+        cmd: bytes,
+        timeout: Optional[float] = None,
+        silence: Optional[float] = None,
+    ) -> Reply:
+        """Отправить команду и дождаться ответа (timeout=None - SerialWorker.timeout).
 
-    def get_str_answer(self, cmd: bytes):
+        silence - время до первого байта ответа, см. FrameReader.read_frame.
+        """
         self.write_serial(cmd=cmd)
-        return self.read_serial_str()
+        sent = time.monotonic()
+        answer = self.read_answer(cmd=cmd, timeout=timeout, silence=silence)
+        t = time.monotonic()
+        return Reply(cmd=cmd, answer=answer, t=t, elapsed=t - sent)
+
+    def get_bytes_answer(self, cmd: bytes, timeout: Optional[float] = None):
+        return self.request(cmd=cmd, timeout=timeout).answer
+
+    def get_str_answer(self, cmd: bytes, timeout: Optional[float] = None):
+        return self.get_bytes_answer(cmd=cmd, timeout=timeout).decode().strip()
+
+    def exchange(
+        self,
+        cmds: Sequence[bytes],
+        timeouts: Optional[Sequence[Optional[float]]] = None,
+    ) -> list[Reply]:
+        """Обмен пакетом команд к разным модулям за один вызов.
+
+        Каждая следующая команда уходит сразу после получения ответа на
+        предыдущую, опоздавшие ответы отбрасываются перед каждой командой.
+        Перекрывать команды нельзя: шина RS-485 полудуплексная, и ответ модуля
+        столкнулся бы со следующей командой. Ответ ">" не содержит адреса, и
+        опоздавший ответ на команду без ответа был бы принят за ответ на
+        следующую: после таймаута шина выдерживается еще один таймаут,
+        пришедшее за это время отбрасывается, а остаток пакета не передается.
+        Поэтому ответов может быть меньше, чем команд.
+        """
+        if timeouts is None:
+            timeouts = [None] * len(cmds)
+        replies = []
+        for cmd, timeout in zip(cmds, timeouts):
+            self.write_serial(cmd=cmd)
+            sent = time.monotonic()
+            answer = self.read_answer(cmd=cmd, timeout=timeout)
+            t = time.monotonic()
+            replies.append(Reply(cmd=cmd, answer=answer, t=t, elapsed=t - sent))
+            if not answer:
+                self.drain(timeout=timeout)
+                break
+        return replies
+
+    def drain(self, timeout: Optional[float] = None):
+        """Отбросить ответы, пришедшие за timeout после потерянного ответа"""
+        if timeout is None:
+            timeout = self.timeout
+        if timeout is None:
+            return
+        deadline = time.monotonic() + timeout
+        while frame := self.read_serial(timeout=max(0.0, deadline - time.monotonic())):
+            log.warning(f"{self.modelname}: Late answer discarded: {frame!r}")
+
+    def read_answer(
+        self,
+        cmd: bytes,
+        timeout: Optional[float] = None,
+        silence: Optional[float] = None,
+    ) -> bytes:
+        """Ответ на cmd: кадры-помехи и опоздавшие ответы пропускаются"""
+        if timeout is None:
+            timeout = self.timeout
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            frame = self.read_serial(timeout=remaining, silence=silence)
+            if not frame:
+                return b""
+            silence = None
+            answer = self.resync(frame)
+            if answer and self.answer_matches(cmd=cmd, answer=answer):
+                return answer
+            log.warning(f"{self.modelname}: Stale answer {frame!r} to {cmd!r}")
+
+    @staticmethod
+    def resync(frame: bytes) -> bytes:
+        """Начало ответа в принятом кадре, b"" - кадр целиком помеха"""
+        return frame
+
+    @staticmethod
+    def answer_matches(cmd: bytes, answer: bytes) -> bool:
+        if answer[:1] in (b"!", b"?"):
+            return answer[1:3] == cmd[1:3]
+        return True
+
+    def get_async_bus(self) -> AsyncBus:
+        """Шина для корутин текущего цикла событий (создается при первом вызове)"""
+        if self.async_bus is None or self.async_bus.loop.is_closed():
+            self.async_bus = AsyncBus(worker=self)
+        return self.async_bus
+
+    def close_async_bus(self):
+        """Вернуть прием ответов синхронным методам"""
+        if self.async_bus is not None:
+            self.async_bus.detach()
+            self.async_bus = None
+
+    async def send_command_async(
+        self, cmd: bytes, logging_answer: bool = False, timeout: Optional[float] = None
+    ) -> str:
+        log.info(f"{self.modelname}: Send command: {cmd!r}")
+        answer = await self.get_bytes_answer_async(cmd=cmd, timeout=timeout)
+        if logging_answer:
+            log.info(f"{self.modelname}: Answer: {answer.decode().strip()}")
+        return answer.decode().strip()
+
+    async def request_async(self, cmd: bytes, timeout: Optional[float] = None) -> Reply:
+        sent = time.monotonic()
+        answer = await self.get_async_bus().request(
+            cmd=cmd,
+            timeout=self.timeout if timeout is None else timeout,
+            matches=self.answer_matches,
+            resync=self.resync,
+        )
+        t = time.monotonic()
+        return Reply(cmd=cmd, answer=answer, t=t, elapsed=t - sent)
+
+    async def get_bytes_answer_async(
+        self, cmd: bytes, timeout: Optional[float] = None
+    ) -> bytes:
+        return (await self.request_async(cmd=cmd, timeout=timeout)).answer
+
+    async def exchange_async(
+        self,
+        cmds: Sequence[bytes],
+        timeouts: Optional[Sequence[Optional[float]]] = None,
+    ) -> list[Reply]:
+        if timeouts is None:
+            timeouts = [None] * len(cmds)
+        return [
+            await self.request_async(cmd=cmd, timeout=timeout)
+            for cmd, timeout in zip(cmds, timeouts)
+        ]
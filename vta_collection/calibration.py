@@ -7,9 +7,13 @@ from numpy.polynomial.polynomial import polyval
 from pydantic import BaseModel, field_validator
 
 from vta_collection.calibration_utils import calculate_coefficients
+from vta_collection.path_utils import get_appdata_path
 from vta_collection.serializable import SerializableMixin
 from vta_collection.standard import Standard
 
+# Сохраненные калибровки (CalibrationManager), файл <name>.json
+CALIBRATIONS_DIR = get_appdata_path() / "calibrations"
+
 
 class Calibration(BaseModel, SerializableMixin):
     calibration_type: str = "linear"  # "linear" или "quadratic"
@@ -41,37 +45,42 @@ class Calibration(BaseModel, SerializableMixin):
 
         return v
 
-    def get_value(self, t_exp: float) -> float:
-        """Получить скорректированную температуру
-
-        Args:
-            t_exp: Экспериментальная температура в °C
-
-        Returns:
-            Скорректированная температура в °C
-        """
-        # Используем polyval для вычисления полинома
-        # Коэффициенты в polyval идут в порядке: [c0, c1, c2, ...] для полинома c0 + c1*x + c2*x^2 + ...
+    def correction_coefficients(self) -> list[float]:
+        """Коэффициенты поправки Tскор - Tэксп в порядке [c0, c1, c2, ...]
+        для полинома c0 + c1*x + c2*x^2 + ... (порядок numpy.polynomial)"""
         if self.calibration_type == "linear":
             if len(self.coefficients) < 2:
                 raise ValueError(
                     "Недостаточно коэффициентов для линейной калибровки (требуется минимум 2)"
                 )
             # Разворачиваем коэффициенты для линейного случая: [b, a] для ax + b
-            poly_coeffs = self.coefficients[1::-1]  # [coefficients[1], coefficients[0]]
+            return self.coefficients[1::-1]  # [coefficients[1], coefficients[0]]
         else:  # quadratic
             if len(self.coefficients) < 3:
                 raise ValueError(
                     "Недостаточно коэффициентов для квадратичной калибровки (требуется минимум 3)"
                 )
             # Разворачиваем коэфициенты для квадратичного случая: [c, b, a] для ax^2 + bx + c
-            poly_coeffs = self.coefficients[
+            return self.coefficients[
                 2::-1
             ]  # [coefficients[2], coefficients[1], coefficients[0]]
 
-        delta_t = float(polyval(t_exp, poly_coeffs))
+    def get_value(self, t_exp: float) -> float:
+        """Получить скорректированную температуру
+
+        Args:
+            t_exp: Экспериментальная температура в °C
+
+        Returns:
+            Скорректированная температура в °C
+        """
+        delta_t = float(polyval(t_exp, self.correction_coefficients()))
         return t_exp + delta_t
 
+    def get_values(self, t_exp: np.ndarray) -> np.ndarray:
+        """Скорректированные температуры для массива экспериментальных, °C"""
+        return t_exp + polyval(t_exp, self.correction_coefficients())
+
     def to_formule_str(self) -> str:
         """Получить строковое представление формулы калибровки"""
         if self.calibration_type == "linear":
@@ -181,6 +190,10 @@ class ZeroCalibration(Calibration):
         """Возвращает неизмененную температуру (без коррекции)"""
         return t_exp
 
+    def get_values(self, t_exp: np.ndarray) -> np.ndarray:
+        """Возвращает неизмененные температуры (без коррекции)"""
+        return t_exp
+
     def to_formule_str(self) -> str:
         """Получить строковое представление формулы калибровки"""
         return "Tскор = Tэксп (без калибровки)"
@@ -4,9 +4,8 @@ from typing import Dict, List, Optional
 from loguru import logger as log
 from PySide6 import QtCore
 
-from vta_collection.calibration import Calibration
+from vta_collection.calibration import CALIBRATIONS_DIR, Calibration
 from vta_collection.file_manager import FileManager
-from vta_collection.path_utils import get_appdata_path
 
 
 class CalibrationManager(QtCore.QObject):
@@ -24,7 +23,7 @@ class CalibrationManager(QtCore.QObject):
 
     def _get_calibrations_dir(self) -> Path:
         """Получить директорию для хранения калибровок"""
-        return get_appdata_path() / "calibrations"
+        return CALIBRATIONS_DIR
 
     def _ensure_calibrations_dir(self) -> None:
         """Создать директорию для калибровок, если она не существует"""
@@ -1,7 +1,11 @@
-from typing import NamedTuple
+import math
+from typing import NamedTuple, Optional
+
+import numpy as np
 
 from vta_collection.calibration import Calibration
 from vta_collection.config import config
+from vta_collection.data_block import CJC_COLUMNS
 from vta_collection.hardware import get_hardware
 from vta_collection.thermocouple import get_thermocouple
 
@@ -11,41 +15,109 @@ class CjcData(NamedTuple):
     e_cold: float
 
 
+def read_cjc_data(rig: str = "") -> CjcData:
+    """Измерить температуру холодного спая (шина печи rig должна быть свободна)"""
+    # Получаем температуру холодного спая
+    cjc_temp = (
+        get_hardware(auto_find=True, rig=rig).adam4011.get_cjc_temperature()
+        if not (config.is_test_mode or config.replay_file)
+        else 25.0
+    )
+
+    # Вычисляем ЭДС холодного спая методом Ньютона с защитой бисекцией
+    cjc_emf = get_thermocouple().temperature_to_emf(target_temp=cjc_temp)
+
+    return CjcData(temperature=cjc_temp, e_cold=cjc_emf)
+
+
+def e_cold_shifts(cjc_data: dict, times: np.ndarray) -> np.ndarray:
+    """Добавки к ЭДС точек записи со временами times относительно начальных
+    cjc_data (export_cjc_data): до первого чтения холодного спая - 0, далее -
+    по сглаженной оценке последнего чтения перед точкой, как при опросе"""
+    series = cjc_data.get("series")
+    if not series or not series["t"]:
+        return np.zeros(len(times))
+    index = np.searchsorted(series["t"], times, side="right") - 1
+    e_cold = np.asarray(series["e_cold"]) - cjc_data["e_cold"]
+    return np.where(index >= 0, e_cold[np.maximum(index, 0)], 0.0)
+
+
+class CjcTracker:
+    """Сглаженная температура холодного спая по периодическим чтениям $AA3.
+
+    Экспоненциальное сглаживание с постоянной времени smoothing, с (вес
+    чтения зависит от времени после предыдущего), чтобы шаг 0.1 °C датчика
+    не давал скачков температуры печи. Начальная оценка - cjc_data,
+    измеренные при создании измерения.
+    """
+
+    def __init__(self, cjc_data: CjcData, smoothing: float, interval: float):
+        self.initial = cjc_data
+        self.estimate = cjc_data
+        self.smoothing = smoothing
+        # Интервал чтений: вес первого чтения
+        self.interval = interval
+        self.last_t: Optional[float] = None
+
+    @property
+    def e_cold_shift(self) -> float:
+        """Добавка к ЭДС точки при компенсации по начальным cjc_data"""
+        return self.estimate.e_cold - self.initial.e_cold
+
+    def update(self, t: float, temperature: float) -> CjcData:
+        dt = self.interval if self.last_t is None else t - self.last_t
+        self.last_t = t
+        weight = -math.expm1(-dt / self.smoothing) if self.smoothing > 0 else 1.0
+        smoothed = self.estimate.temperature + weight * (
+            temperature - self.estimate.temperature
+        )
+        self.estimate = CjcData(
+            temperature=smoothed,
+            e_cold=get_thermocouple().temperature_to_emf(target_temp=smoothed),
+        )
+        return self.estimate
+
+
 class ColdJunctionCompensator:
     """Компенсатор холодного спая"""
 
-    def __init__(self, calibration: Calibration):
+    def __init__(self, calibration: Calibration, rig: str = ""):
         self.calibration = calibration
+        self.rig = rig
         self.cjc_data: CjcData
+        # Чтения холодного спая во время опроса (столбцы CJC_COLUMNS)
+        self.readings: list[np.ndarray] = []
 
         # Инициализируем данные компенсации
         self._initialize_compensation()
 
+    @classmethod
+    def from_cjc_data(
+        cls, calibration: Calibration, cjc_data: CjcData, rig: str = ""
+    ) -> "ColdJunctionCompensator":
+        """Компенсатор с уже измеренными данными, без обращения к оборудованию"""
+        compensator = cls.__new__(cls)
+        compensator.calibration = calibration
+        compensator.rig = rig
+        compensator.cjc_data = cjc_data
+        compensator.readings = []
+        return compensator
+
     def _initialize_compensation(self):
         """Инициализация данных компенсации холодного спая"""
-        # Остановливаем основной цикл перед запросом cjc
         from vta_collection.heater.controller import get_heater
 
-        get_heater().stop_loop()
-
-        # Получаем температуру холодного спая
-        cjc_temp = (
-            get_hardware(auto_find=True).adam4011.get_cjc_temperature()
-            if not config.is_test_mode
-            else 25.0
-        )
-
-        # Вычисляем ЭДС холодного спая методом бисекции
-        cjc_emf = self._calculate_emf_by_temperature(cjc_temp)
-
-        self.cjc_data = CjcData(temperature=cjc_temp, e_cold=cjc_emf)
-
-    def _calculate_emf_by_temperature(self, target_temp: float) -> float:
-        """Вычисление ЭДС по температуре методом бисекции"""
-        # Получаем глобальный экземпляр термопары
-        thermocouple = get_thermocouple()
+        heater = get_heater(rig=self.rig)
+        # Во время опроса холодный спай читается между точками: опрос не
+        # останавливается, берется последняя сглаженная оценка
+        latest = heater.latest_cjc() if config.cjc_interval > 0 else None
+        if latest is not None:
+            self.cjc_data = latest
+            return
+        # Остановливаем основной цикл перед запросом cjc
+        heater.stop_loop()
 
-        return thermocouple.temperature_to_emf(target_temp=target_temp)
+        self.cjc_data = read_cjc_data(rig=self.rig)
 
     def compensate(self, emf: float) -> float:
         """Компенсация холодного спая"""
@@ -53,13 +125,41 @@ class ColdJunctionCompensator:
         e_hot = emf + self.cjc_data.e_cold
         return e_hot
 
+    def compensate_values(self, emf: np.ndarray) -> np.ndarray:
+        """Компенсация холодного спая для массива ЭДС"""
+        return emf + self.cjc_data.e_cold
+
     def get_cjc_data(self) -> CjcData:
         """Получение данных компенсации холодного спая"""
         return self.cjc_data
 
+    def add_readings(self, readings: np.ndarray):
+        """Добавить чтения холодного спая (столбцы CJC_COLUMNS)"""
+        if readings.size:
+            self.readings.append(readings.copy())
+
+    def clear_readings(self):
+        """Удалить чтения перед новыми данными: последняя оценка остается
+        действующей с их начала (t = 0)"""
+        if self.readings:
+            last = self.readings[-1][:, -1:].copy()
+            last[0] = 0.0
+            self.readings = [last]
+
     def export_cjc_data(self) -> dict:
-        """Экспорт данных холодного спая в формате JSON"""
-        return {
+        """Экспорт данных холодного спая в формате JSON.
+
+        temperature и e_cold - начальные данные компенсации, series - чтения
+        во время опроса, если они были.
+        """
+        data: dict = {
             "temperature": self.cjc_data.temperature,
             "e_cold": self.cjc_data.e_cold,
         }
+        if self.readings:
+            columns = np.concatenate(self.readings, axis=1)
+            data["series"] = {
+                "smoothing": config.cjc_smoothing,
+                **{name: column.tolist() for name, column in zip(CJC_COLUMNS, columns)},
+            }
+        return data
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Final
+from typing import Final, Optional
 
 from loguru import logger as log
 from pydantic import BaseModel, Field, field_serializer
@@ -8,6 +8,52 @@ from vta_collection.path_utils import get_appdata_path
 from vta_collection.serializable import SerializableMixin
 
 
+class InputChannel(BaseModel):
+    """Дополнительный модуль ADAM-4011 на той же шине"""
+
+    address: int
+    every: int = 1  # опрос каждые every циклов
+
+
+class RigConfig(BaseModel):
+    """Печь со своим преобразователем ADAM-4520 на отдельном порту"""
+
+    name: str = ""
+    comport: str = "COM1"
+    adam_baudrate: int = 9600
+    adam4011_address: int = 1
+    adam4021_address: int = 3
+    extra_inputs: list[InputChannel] = []
+
+
+class Plateau(BaseModel):
+    """Плавление образца в модели печи: температура образца не растет, пока
+    не поглощена теплота плавления"""
+
+    temperature: float  # °C
+    heat: float = 20.0  # теплота плавления в °C нагрева образца
+
+
+class FurnaceConfig(BaseModel):
+    """Модель печи тестового режима и sim:// (см. furnace_model)"""
+
+    ambient: float = 25.0  # °C
+    gain: float = 150.0  # установившийся перегрев печи на 1 В выхода 4021, °C
+    time_constant: float = 60.0  # постоянная времени печи, с
+    sample_lag: float = 5.0  # постоянная времени образца в печи, с
+    plateaus: list[Plateau] = []
+    noise: float = 0.0  # СКО шума ЭДС, мВ
+    seed: Optional[int] = None  # зерно генератора шума (None - случайное)
+    step: float = 0.01  # шаг интегрирования модели, с
+    # Тестовый режим без ожидания: время модели идет на период опроса за
+    # итерацию, опрос выполняется с максимальной скоростью
+    virtual_time: bool = False
+
+
+# Поля Config, которые описывают основную печь (RigConfig с пустым именем)
+RIG_FIELDS: Final = [field for field in RigConfig.model_fields if field != "name"]
+
+
 class Config(BaseModel, SerializableMixin):
     operator: str = "Operator"
     thermocouple_coefficients: list[float] = [
@@ -21,16 +67,40 @@ class Config(BaseModel, SerializableMixin):
         8.2433725e-07,
         -4.5928480e-09,
     ]
+    # Таблицы Чебышева вместо полинома термопары и его обращения (строятся
+    # один раз для набора коэффициентов и хранятся в кеше)
+    thermocouple_approximation: bool = False
     calibration_enabled: bool = False
     is_test_mode: bool = False
     default_speed: int = 5
+    sampling_rate: float = 0.0  # Гц, 0 - с максимальной скоростью шины
+    # Наименьший интервал между записями выхода 4021, с (0 - при каждом
+    # изменении кода ЦАП)
+    output_interval: float = 0.0
+    # Период чтения температуры холодного спая ($AA3) между точками опроса, с
+    # (0 - только при создании измерения), и постоянная времени ее
+    # сглаживания, с
+    cjc_interval: float = 10.0
+    cjc_smoothing: float = 60.0
+    # Период чтения новых точек из буфера потока опроса в GUI, с
+    refresh_interval: float = 0.1
+    # Опрос и управление нагревом в отдельном процессе, независимо от GUI
+    acquisition_process: bool = False
+    # Воспроизведение записанного .vtaz вместо опроса оборудования (пусто -
+    # выключено) и его ускорение (0 - без пауз между точками)
+    replay_file: str = ""
+    replay_speed: float = 1.0
+    furnace: FurnaceConfig = FurnaceConfig()
     adam4011_address: int = 1
     adam4021_address: int = 3
+    extra_inputs: list[InputChannel] = []
     adam_baudrate: int = 9600
     last_save_measurement_index: int = 1
     last_save_dir: Path = Field(default_factory=lambda: Path(".").resolve())
     comport: str = "COM1"
     last_selected_calibration: str = ""
+    # Дополнительные печи, каждая в своем окне и потоке опроса
+    rigs: list[RigConfig] = []
 
     @field_serializer("last_save_dir")
     def serialize_path(self, value: Path) -> str:
@@ -52,6 +122,27 @@ class Config(BaseModel, SerializableMixin):
         self.to_json_file(CONFIG_PATH)
         log.debug("Config file updated")
 
+    def main_rig(self) -> RigConfig:
+        return RigConfig(**{field: getattr(self, field) for field in RIG_FIELDS})
+
+    def all_rigs(self) -> list[RigConfig]:
+        return [self.main_rig(), *self.rigs]
+
+    def get_rig(self, name: str = "") -> RigConfig:
+        for rig in self.all_rigs():
+            if rig.name == name:
+                return rig
+        raise KeyError(f"Rig '{name}' is not configured")
+
+    def store_rig(self, rig: RigConfig):
+        """Сохранить измененные настройки печи (например, после автопоиска)"""
+        if rig.name == "":
+            for field in RIG_FIELDS:
+                setattr(self, field, getattr(rig, field))
+        else:
+            self.rigs = [rig if r.name == rig.name else r for r in self.rigs]
+        self.update()
+
 
 appdata_path = get_appdata_path()
 CONFIG_PATH = appdata_path / "config.json"
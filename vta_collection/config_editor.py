@@ -20,6 +20,8 @@ from PySide6.QtWidgets import (
 )
 from serial.tools.list_ports import comports
 
+from vta_collection.adam_simulator import SIM_PORT, is_simulated_port
+
 # Типы для значений по умолчанию
 StringValueType = Union[str, Path]
 NumberValueType = Union[int, float]
@@ -265,7 +267,7 @@ class ComPortPicker(QWidget):
         current = self.combo.currentText()
         self.combo.clear()
 
-        ports = [port.device for port in comports()]
+        ports = [port.device for port in comports()] + [SIM_PORT]
         self.combo.addItems(ports)
 
         # Восстанавливаем предыдущий выбор, если он доступен
@@ -274,6 +276,8 @@ class ComPortPicker(QWidget):
 
     def set_current_port(self, port: str):
         """Устанавливает текущий порт, если он доступен"""
+        if is_simulated_port(port) and self.combo.findText(port) < 0:
+            self.combo.addItem(port)
         if port and port in [self.combo.itemText(i) for i in range(self.combo.count())]:
             self.combo.setCurrentText(port)
 
@@ -0,0 +1,57 @@
+"""Точки опроса: строки кольцевых буферов и пакеты для получателей"""
+
+from typing import Final, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from vta_collection.ring_buffer import RingView
+
+
+class DataPoint(NamedTuple):
+    t1: float
+    emf: float
+    t2: float
+    output: float
+    temperature: float
+
+
+# Столбцы кольцевых буферов потока опроса (RingBuffer)
+DATA_COLUMNS: Final = DataPoint._fields
+CHANNEL_COLUMNS: Final = ("t", "emf")
+# Чтения холодного спая: время, измеренная и сглаженная температура, °C,
+# ЭДС холодного спая для сглаженной температуры, мВ
+CJC_COLUMNS: Final = ("t", "temperature", "smoothed", "e_cold")
+
+
+class DataBlock(NamedTuple):
+    """Новые точки опроса по столбцам (view кольцевого буфера)"""
+
+    t1: np.ndarray
+    emf: np.ndarray
+    t2: np.ndarray
+    output: np.ndarray
+    temperature: np.ndarray
+    # Столбцы CHANNEL_COLUMNS дополнительных входов, по каналам
+    channels: tuple[np.ndarray, ...] = ()
+    # Столбцы CJC_COLUMNS новых чтений холодного спая (обычно пусто)
+    cjc: np.ndarray = np.empty((len(CJC_COLUMNS), 0))
+
+    @staticmethod
+    def from_view(
+        view: RingView,
+        channels: Sequence[RingView] = (),
+        cjc: Optional[RingView] = None,
+    ) -> "DataBlock":
+        t1, emf, t2, output, temperature = view.columns
+        return DataBlock(
+            t1=t1,
+            emf=emf,
+            t2=t2,
+            output=output,
+            temperature=temperature,
+            channels=tuple(channel.columns for channel in channels),
+            cjc=np.empty((len(CJC_COLUMNS), 0)) if cjc is None else cjc.columns,
+        )
+
+    def last(self) -> DataPoint:
+        return DataPoint(*(float(column[-1]) for column in self[:5]))
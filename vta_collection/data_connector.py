@@ -1,7 +1,4 @@
-import csv
-from io import TextIOWrapper
 from math import inf
-from typing import List, NamedTuple
 
 # from pglive.kwargs import LeadingLine, Orientation
 from pglive.sources.data_connector import DataConnector
@@ -11,17 +8,7 @@ from pglive.sources.live_plot_widget import LivePlotWidget
 # from pyqtgraph import mkPen
 from PySide6 import QtCore
 
-
-class DataPack(NamedTuple):
-    x_label: str
-    y_label: str
-    x: List
-    y: List
-
-    def to_csv(self, f: TextIOWrapper):
-        writer = csv.writer(f, lineterminator=";\n")
-        writer.writerow((self.x_label, self.y_label))
-        writer.writerows(zip(self.x, self.y))
+from vta_collection.vtaz import DataPack
 
 
 class DataCon(QtCore.QObject):
@@ -0,0 +1,219 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Iterable, Optional, Sequence
+
+import serial
+from loguru import logger as log
+from pydantic import BaseModel, Field
+
+from vta_collection.adam_4011_config import BAUDRATE_CODES, Adam4011Config
+from vta_collection.adam_4021_config import Adam4021Config
+from vta_collection.adam_4520 import Adam4520API
+from vta_collection.adam_base import AdamBase, AdamBaseCommands
+from vta_collection.config import RigConfig, appdata_path, config
+from vta_collection.latency import LatencyEstimator
+from vta_collection.serial_base import char_time, get_serial_ports
+from vta_collection.serializable import SerializableMixin
+
+DISCOVERY_CACHE_PATH = appdata_path / "discovery.json"
+# Граница задержки ответа на пробный запрос, пока ни один модуль не ответил, с
+PROBE_LATENCY = 0.02
+DEFAULT_ADDRESSES = range(100)
+
+
+class FoundModule(BaseModel):
+    port: str
+    baudrate: int
+    address: int
+    name: str  # модель из ответа на $AAM, например "4011"
+    config: str  # ответ на $AA2
+
+    def parse_config(self) -> Adam4011Config | Adam4021Config | None:
+        try:
+            if self.name.startswith("4011"):
+                return Adam4011Config.from_str(self.config)
+            if self.name.startswith("4021"):
+                return Adam4021Config.from_str(self.config)
+        except ValueError as e:
+            log.warning(f"Cannot parse config {self.config!r} of {self.name}: {e}")
+        return None
+
+
+class DiscoveryResult(BaseModel, SerializableMixin):
+    modules: list[FoundModule] = []
+    created_at: str = Field(default_factory=lambda: datetime.now().isoformat())
+
+    def by_port(self) -> dict[str, list[FoundModule]]:
+        ports: dict[str, list[FoundModule]] = {}
+        for mod in self.modules:
+            ports.setdefault(mod.port, []).append(mod)
+        return ports
+
+    def find_rig(
+        self, rig: RigConfig, exclude_ports: Sequence[str] = ()
+    ) -> Optional[tuple[FoundModule, FoundModule]]:
+        """Пара 4011 + 4021 на одном порту и скорости, с приоритетом настроек rig"""
+        candidates = []
+        for mod_in in self.modules:
+            if not mod_in.name.startswith("4011") or mod_in.port in exclude_ports:
+                continue
+            for mod_out in self.modules:
+                if (
+                    mod_out.name.startswith("4021")
+                    and mod_out.port == mod_in.port
+                    and mod_out.baudrate == mod_in.baudrate
+                ):
+                    candidates.append((mod_in, mod_out))
+        candidates.sort(
+            key=lambda pair: (
+                pair[0].port != rig.comport,
+                pair[0].address != rig.adam4011_address,
+                pair[1].address != rig.adam4021_address,
+            )
+        )
+        return candidates[0] if candidates else None
+
+
+class AdamProbe(AdamBase):
+    """Модуль неизвестной модели по адресу, для пробных запросов"""
+
+    model = ""
+    retries = 0
+
+    def __init__(self, converter: Adam4520API, address: int, latency: LatencyEstimator):
+        super().__init__(converter=converter, address=address)
+        self.CMD = AdamBaseCommands(self.address)
+        # Задержка общая для всех адресов порта и учится только на ответах
+        self.probe_latency = latency
+
+    def timeout_for(self, cmd: bytes) -> float:
+        self.latency[self.command_kind(cmd)] = self.probe_latency
+        return super().timeout_for(cmd)
+
+    def silence_for(self, cmd: bytes) -> float:
+        """Передача команды и первого символа ответа плюс граница задержки.
+
+        На пустых адресах ответ не ждется на всю его длину: при низкой
+        скорости это основное время перебора.
+        """
+        ct = char_time(self.converter.ser)
+        return (len(self.framed(cmd)) + 2) * ct + self.probe_latency.bound()
+
+    def learn(self, reply):
+        if reply.answer:
+            super().learn(reply)
+
+
+def scan_port(
+    port: str,
+    baudrates: Sequence[int],
+    addresses: Iterable[int],
+    all_baudrates: bool = False,
+    checksum: bool = False,
+) -> list[FoundModule]:
+    """Опрос $AAM всех адресов на скоростях одного порта.
+
+    Модули одной шины обычно настроены на одну скорость, поэтому без
+    all_baudrates перебор останавливается на первой скорости с ответами.
+    Модуль с включенной контрольной суммой молчит на команды без нее, а
+    модуль без нее - на команды с ней: checksum выбирает, каких модулей
+    искать.
+    """
+    converter = Adam4520API(timeout=None)
+    found: list[FoundModule] = []
+    try:
+        converter.open_serial(port=port)
+    except (serial.SerialException, OSError) as e:
+        log.warning(f"Discovery: cannot open {port}: {e}")
+        return found
+    try:
+        for baudrate in baudrates:
+            converter.ser.baudrate = baudrate
+            latency = LatencyEstimator(startup=PROBE_LATENCY)
+            for address in addresses:
+                probe = AdamProbe(converter=converter, address=address, latency=latency)
+                probe.checksum = checksum
+                text = probe.query(probe.CMD.GET_NAME).decode(errors="replace")
+                if not text.startswith("!") or len(text) <= 4:
+                    continue
+                module = FoundModule(
+                    port=port,
+                    baudrate=baudrate,
+                    address=address,
+                    name=text.strip()[3:],
+                    config=probe.query_str(probe.CMD.GET_CONF_STATUS),
+                )
+                log.info(f"Discovery: found {module}")
+                found.append(module)
+            if found and not all_baudrates:
+                break
+    finally:
+        converter.close_serial()
+    return found
+
+
+def discover(
+    ports: Optional[Sequence[str]] = None,
+    baudrates: Optional[Sequence[int]] = None,
+    addresses: Iterable[int] = DEFAULT_ADDRESSES,
+    all_baudrates: bool = False,
+    checksum: bool = False,
+    save: bool = True,
+) -> DiscoveryResult:
+    """Поиск модулей ADAM на всех портах одновременно (поток на порт).
+
+    Скорости перебираются начиная с config.adam_baudrate. С checksum
+    ищутся модули с включенной контрольной суммой (см. scan_port). Результат
+    сохраняется в DISCOVERY_CACHE_PATH для следующего запуска.
+    """
+    if ports is None:
+        ports = get_serial_ports()
+    if baudrates is None:
+        # Быстрые скорости опрашиваются раньше медленных: их перебор дешевле
+        baudrates = sorted(
+            BAUDRATE_CODES.values(), key=lambda b: (b != config.adam_baudrate, -b)
+        )
+    addresses = list(addresses)
+    start = time.monotonic()
+    result = DiscoveryResult()
+    if ports:
+        with ThreadPoolExecutor(max_workers=len(ports)) as executor:
+            scans = executor.map(
+                lambda port: scan_port(
+                    port, baudrates, addresses, all_baudrates, checksum
+                ),
+                ports,
+            )
+            for modules in scans:
+                result.modules.extend(modules)
+    log.info(
+        f"Discovery: {len(result.modules)} modules on {len(ports)} ports "
+        f"in {time.monotonic() - start:.1f} s"
+    )
+    if save:
+        result.to_json_file(DISCOVERY_CACHE_PATH)
+    return result
+
+
+def load_cached_discovery() -> Optional[DiscoveryResult]:
+    if not DISCOVERY_CACHE_PATH.exists():
+        return None
+    try:
+        return DiscoveryResult.model_validate_json(
+            DISCOVERY_CACHE_PATH.read_text(encoding="utf-8")
+        )
+    except (OSError, ValueError) as e:
+        log.warning(f"Discovery cache ignored: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    from vta_collection.adam_simulator import SIM_PORT
+
+    result = discover(
+        ports=[SIM_PORT + "?adam4011=1,7&adam4021=3&baudrate=19200"], save=False
+    )
+    for port, modules in result.by_port().items():
+        for mod in modules:
+            print(port, mod.baudrate, mod.address, mod.name, mod.parse_config())
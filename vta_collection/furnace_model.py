@@ -0,0 +1,103 @@
+"""Модель печи с образцом для тестового режима и симулятора sim://.
+
+Печь - звено первого порядка: ее температура стремится к ambient +
+gain·выход 4021 с постоянной времени time_constant. Образец нагревается от
+печи с постоянной времени sample_lag и задерживается на плато плавления,
+пока не поглотит теплоту плавления. ЭДС термопары образца получается
+обращением полинома Thermocouple за вычетом ЭДС холодного спая.
+
+Модель считается с постоянным шагом по своему времени (advance), поэтому
+ее можно вести как по часам, так и быстрее реального времени.
+"""
+
+import random
+from typing import Optional
+
+from vta_collection.config import FurnaceConfig, config
+from vta_collection.thermocouple import Thermocouple, get_thermocouple
+
+# Диапазон выхода 4021 (ORC.C32), В
+OUTPUT_RANGE = (0.0, 10.0)
+
+
+class FurnaceModel:
+    def __init__(
+        self,
+        settings: Optional[FurnaceConfig] = None,
+        thermocouple: Optional[Thermocouple] = None,
+        cjc_temperature: float = 25.0,
+    ):
+        self.settings = settings if settings is not None else config.furnace
+        self.thermocouple = thermocouple or get_thermocouple()
+        self.e_cold = self.thermocouple.temperature_to_emf(target_temp=cjc_temperature)
+        self.random = random.Random(self.settings.seed)
+        self.plateaus = sorted(self.settings.plateaus, key=lambda p: p.temperature)
+        # Поглощенная на каждом плато теплота, °C
+        self.melted = [0.0] * len(self.plateaus)
+        self.output = 0.0
+        self.furnace = self.settings.ambient
+        self.sample = self.settings.ambient
+        self.steps = 0
+
+    @property
+    def time(self) -> float:
+        """Время модели, с"""
+        return self.steps * self.settings.step
+
+    def set_output(self, value: float):
+        self.output = min(max(value, OUTPUT_RANGE[0]), OUTPUT_RANGE[1])
+
+    def advance(self, until: float):
+        """Досчитать модель до времени until (с от создания) шагами step"""
+        step = self.settings.step
+        # Допуск на ошибку округления until, кратного шагу
+        while (self.steps + 1) * step <= until + step * 1e-6:
+            self.step(dt=step)
+            self.steps += 1
+
+    def step(self, dt: float):
+        s = self.settings
+        target = s.ambient + s.gain * self.output
+        self.furnace += (target - self.furnace) * dt / s.time_constant
+        heat = (self.furnace - self.sample) * dt / s.sample_lag
+        sample = self.sample + heat
+        for index, plateau in enumerate(self.plateaus):
+            melted = self.melted[index]
+            if heat > 0 and self.sample <= plateau.temperature <= sample:
+                # Плавление: избыток нагрева над плато уходит в теплоту
+                absorbed = min(sample - plateau.temperature, plateau.heat - melted)
+                self.melted[index] += absorbed
+                sample -= absorbed
+            elif heat < 0 and sample <= plateau.temperature <= self.sample:
+                # Кристаллизация при остывании возвращает теплоту
+                released = min(plateau.temperature - sample, melted)
+                self.melted[index] -= released
+                sample += released
+        self.sample = sample
+
+    def emf(self) -> float:
+        """ЭДС термопары образца с компенсацией холодного спая, мВ"""
+        emf = self.thermocouple.temperature_to_emf(target_temp=self.sample)
+        emf -= self.e_cold
+        if self.settings.noise:
+            emf += self.random.gauss(0.0, self.settings.noise)
+        return emf
+
+
+if __name__ == "__main__":
+    from vta_collection.config import Plateau
+
+    model = FurnaceModel(
+        settings=FurnaceConfig(plateaus=[Plateau(temperature=231.9, heat=30.0)])
+    )
+    # Нагрев 5 мВ/с, как в программе по умолчанию
+    for second in range(1201):
+        model.set_output(0.005 * second)
+        model.advance(until=second)
+        if second % 60 == 0:
+            t = model.thermocouple.emf_to_temperature(model.emf() + model.e_cold)
+            print(
+                f"{second:5d} s  output {model.output:5.2f} V  "
+                f"furnace {model.furnace:7.1f}  sample {t:7.1f} °C  "
+                f"melted {model.melted[0]:5.1f}"
+            )
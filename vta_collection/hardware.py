@@ -1,48 +1,215 @@
 from typing import Optional
 
+import serial
+from loguru import logger as log
+from pydantic import BaseModel
+
 from vta_collection.adam_4011 import Adam4011
 from vta_collection.adam_4021 import Adam4021
-from vta_collection.adam_4520 import Adam4520
-from vta_collection.config import config
+from vta_collection.adam_4520 import Adam4520, ModulesNotFound
+from vta_collection.adam_base import AdamBase
+from vta_collection.adam_simulator import is_simulated_port
+from vta_collection.config import RigConfig, appdata_path, config
+from vta_collection.discovery import (
+    DiscoveryResult,
+    FoundModule,
+    discover,
+    load_cached_discovery,
+)
 from vta_collection.serial_base import get_serial_ports
+from vta_collection.serializable import SerializableMixin
+
+KNOWN_HARDWARE_PATH = appdata_path / "hardware.json"
+
+
+def known_hardware_path(rig: RigConfig):
+    if rig.name == "":
+        return KNOWN_HARDWARE_PATH
+    return appdata_path / f"hardware_{rig.name}.json"
+
+
+class PortNotAvailable(Exception):
+    pass
+
+
+class ModuleIdentity(BaseModel):
+    address: int
+    name: str  # ответ на $AAM
+    conf_status: str  # ответ на $AA2
+
+
+class KnownHardware(BaseModel, SerializableMixin):
+    """Последняя рабочая конфигурация оборудования для быстрого запуска"""
+
+    port: str
+    baudrate: int
+    adam4011: ModuleIdentity
+    adam4021: ModuleIdentity
+    extra_inputs: list[ModuleIdentity] = []
+
+    def matches_config(self, rig: RigConfig) -> bool:
+        return (
+            self.port == rig.comport
+            and self.baudrate == rig.adam_baudrate
+            and self.adam4011.address == rig.adam4011_address
+            and self.adam4021.address == rig.adam4021_address
+            and [mod.address for mod in self.extra_inputs]
+            == [ch.address for ch in rig.extra_inputs]
+        )
+
+    def identities(self) -> list[tuple[str, str]]:
+        """(name, conf_status) в порядке Adam4520API.modules"""
+        modules = [self.adam4011, self.adam4021, *self.extra_inputs]
+        return [(mod.name, mod.conf_status) for mod in modules]
 
 
-def validate_com_port():
+def load_known_hardware(rig: RigConfig) -> Optional[KnownHardware]:
+    path = known_hardware_path(rig)
+    if not path.exists():
+        return None
+    try:
+        return KnownHardware.model_validate_json(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        log.warning(f"Known hardware ignored: {e}")
+        return None
+
+
+def validate_com_port(port: str):
+    if is_simulated_port(port):
+        return
     ports = get_serial_ports()
-    if config.comport not in ports:
-        raise Exception(
-            f"COM port '{config.comport}' is not available. Available ports: {ports}"
+    if port not in ports:
+        raise PortNotAvailable(
+            f"COM port '{port}' is not available. Available ports: {ports}"
         )
 
 
+def discovery_ports(rig: RigConfig) -> list[str]:
+    """Порты для автопоиска, кроме портов других печей"""
+    other_ports = [r.comport for r in config.all_rigs() if r.name != rig.name]
+    ports = [port for port in get_serial_ports() if port not in other_ports]
+    if is_simulated_port(rig.comport):
+        ports.append(rig.comport)
+    return ports
+
+
 class Hardware:
-    def __init__(self) -> None:
+    def __init__(self, rig: Optional[RigConfig] = None) -> None:
+        # Без rig - основная печь из полей config
+        self.rig = config.main_rig() if rig is None else rig
         self.found = False
-        self.adam4520 = Adam4520()
+        self.adam4520 = Adam4520(baudrate=self.rig.adam_baudrate)
         self.adam4011 = Adam4011(
-            converter=self.adam4520, address=config.adam4011_address
+            converter=self.adam4520, address=self.rig.adam4011_address
         )
         self.adam4021 = Adam4021(
-            converter=self.adam4520, address=config.adam4021_address
+            converter=self.adam4520, address=self.rig.adam4021_address
         )
-        self.adam4520.modules = (self.adam4011, self.adam4021)
+        # Дополнительные входы на той же шине (rig.extra_inputs)
+        self.extra_inputs = [
+            Adam4011(converter=self.adam4520, address=channel.address)
+            for channel in self.rig.extra_inputs
+        ]
+        self.adam4520.modules = (self.adam4011, self.adam4021, *self.extra_inputs)
 
     def find(self):
-        if not config.is_test_mode:
-            if not self.adam4520.found:
-                validate_com_port()
-                self.adam4520.find_on_port(port=config.comport)
-                self.found = True
+        if not config.is_test_mode and not self.adam4520.found:
+            if not self.restore():
+                try:
+                    validate_com_port(port=self.rig.comport)
+                    self.adam4520.find_on_port(port=self.rig.comport)
+                except (PortNotAvailable, ModulesNotFound) as e:
+                    log.warning(f"{e}. Searching modules on all ports...")
+                    self.find_discovered()
+                self.save_known()
+            self.found = True
+
+    def release(self):
+        """Закрыть порт, чтобы с модулями мог работать другой процесс"""
+        self.adam4520.close_serial()
+        self.adam4520.found = False
+        self.found = False
+
+    def restore(self) -> bool:
+        """Проверка сохраненной конфигурации одной командой на модуль"""
+        known = load_known_hardware(rig=self.rig)
+        if known is None or not known.matches_config(rig=self.rig):
+            return False
+        try:
+            return self.adam4520.restore_on_port(
+                port=known.port,
+                identities=known.identities(),
+            )
+        except (serial.SerialException, OSError, ValueError) as e:
+            # Порт недоступен или сохраненная конфигурация не разбирается
+            log.warning(f"Known hardware not restored: {e}")
+            self.adam4520.close_serial()
+            return False
+
+    def save_known(self):
+        def identity(mod: AdamBase) -> ModuleIdentity:
+            return ModuleIdentity(
+                address=int(mod.address), name=mod.name, conf_status=mod.conf_status
+            )
+
+        known = KnownHardware(
+            port=self.rig.comport,
+            baudrate=self.adam4520.ser.baudrate,
+            adam4011=identity(self.adam4011),
+            adam4021=identity(self.adam4021),
+            extra_inputs=[identity(mod) for mod in self.extra_inputs],
+        )
+        known.to_json_file(known_hardware_path(rig=self.rig))
+
+    def find_discovered(self):
+        """Поиск по сохраненным результатам автопоиска, затем новым автопоиском"""
+        cached = load_cached_discovery()
+        if cached is not None and self._try_discovered(cached):
+            return
+        ports = discovery_ports(rig=self.rig)
+        if self._try_discovered(discover(ports=ports)):
+            return
+        # Модули с включенной контрольной суммой молчат на пробы без нее;
+        # второй перебор нужен, только если первый не нашел пары модулей
+        if not self._try_discovered(discover(ports=ports, checksum=True)):
+            raise ModulesNotFound("Adam modules not found on any port")
+
+    def _try_discovered(self, result: DiscoveryResult) -> bool:
+        other_ports = [r.comport for r in config.all_rigs() if r.name != self.rig.name]
+        pair = result.find_rig(rig=self.rig, exclude_ports=other_ports)
+        if pair is None:
+            return False
+        self.apply_discovered(*pair)
+        try:
+            self.adam4520.find_on_port(port=self.rig.comport)
+        except ModulesNotFound as e:
+            log.warning(e)
+            return False
+        return True
+
+    def apply_discovered(self, mod_in: FoundModule, mod_out: FoundModule):
+        self.adam4011.set_address(mod_in.address)
+        self.adam4021.set_address(mod_out.address)
+        self.adam4520.ser.baudrate = mod_in.baudrate
+        self.rig.comport = mod_in.port
+        self.rig.adam_baudrate = mod_in.baudrate
+        self.rig.adam4011_address = mod_in.address
+        self.rig.adam4021_address = mod_out.address
+        config.store_rig(self.rig)
+        log.info(
+            f"{self.rig.name or 'Main rig'}: using {mod_in.port} at {mod_in.baudrate} baud, "
+            f"4011 at {mod_in.address}, 4021 at {mod_out.address}"
+        )
 
 
-_hardware: Optional[Hardware] = None
+_hardware: dict[str, Hardware] = {}
 
 
-def get_hardware(auto_find: bool = False) -> Hardware:
-    """Получить экземпляр Hardware (singleton)"""
-    global _hardware
-    if _hardware is None:
-        _hardware = Hardware()
-    if auto_find and not _hardware.found:
-        _hardware.find()
-    return _hardware
+def get_hardware(auto_find: bool = False, rig: str = "") -> Hardware:
+    """Получить экземпляр Hardware печи rig (один на печь)"""
+    if rig not in _hardware:
+        _hardware[rig] = Hardware(rig=config.get_rig(rig))
+    hardware = _hardware[rig]
+    if auto_find and not hardware.found:
+        hardware.find()
+    return hardware
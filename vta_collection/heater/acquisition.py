@@ -0,0 +1,96 @@
+"""Процесс опроса (см. ProcessLoop): без Qt, команды и ошибки через Pipe"""
+
+import threading
+from multiprocessing.connection import Connection
+from typing import Optional
+
+from loguru import logger as log
+
+from vta_collection.adam_4520 import ModulesNotFound
+from vta_collection.config import Config, config
+from vta_collection.data_block import CHANNEL_COLUMNS, CJC_COLUMNS, DATA_COLUMNS
+from vta_collection.hardware import Hardware, get_hardware
+from vta_collection.heater.sampler import (
+    CJC_RING_CAPACITY,
+    DEVICE_ERRORS,
+    RING_CAPACITY,
+    AbstractSampler,
+    RealSampler,
+    TestSampler,
+)
+from vta_collection.ring_buffer import RingBuffer
+
+
+def acquisition_main(
+    rig: str,
+    settings: dict,
+    ring: str,
+    channel_rings: list[str],
+    cjc_ring: str,
+    conn: Connection,
+):
+    """Точка входа процесса опроса"""
+    lock = threading.Lock()
+
+    def report(e: Exception):
+        with lock:
+            conn.send(("error", str(e)))
+
+    # Настройки GUI, включая еще не сохраненные в файл
+    for field, value in Config.model_validate(settings):
+        setattr(config, field, value)
+
+    hardware: Optional[Hardware] = None
+    sampler: AbstractSampler
+    try:
+        if config.is_test_mode:
+            sampler = TestSampler()
+        else:
+            hardware = get_hardware(auto_find=True, rig=rig)
+            sampler = RealSampler(hardware=hardware)
+    except (ModulesNotFound, *DEVICE_ERRORS) as e:
+        report(e)
+        return
+    sampler.ring = RingBuffer.attach(
+        name=ring, columns=DATA_COLUMNS, capacity=RING_CAPACITY
+    )
+    sampler.channel_rings = [
+        RingBuffer.attach(name=name, columns=CHANNEL_COLUMNS, capacity=RING_CAPACITY)
+        for name in channel_rings
+    ]
+    sampler.cjc_ring = RingBuffer.attach(
+        name=cjc_ring, columns=CJC_COLUMNS, capacity=CJC_RING_CAPACITY
+    )
+    sampler.on_error = report
+
+    def listen():
+        try:
+            while True:
+                command, *args = conn.recv()
+                if command == "stop":
+                    break
+                try:
+                    if command == "enabled":
+                        sampler.set_enabled(*args)
+                    elif command == "output":
+                        sampler.set_output(*args)
+                    elif command == "heater":
+                        method, *values = args
+                        getattr(sampler.heater, method)(*values)
+                    elif command == "temperature":
+                        sampler.set_temperature(*args)
+                except DEVICE_ERRORS as e:
+                    report(e)
+        except EOFError:
+            log.warning("GUI process closed the connection")
+        finally:
+            sampler.stop()
+
+    sampler.prepare()
+    threading.Thread(target=listen, name="commands", daemon=True).start()
+    sampler.run()
+
+    if hardware is not None:
+        hardware.release()
+    for shared in (sampler.ring, *sampler.channel_rings, sampler.cjc_ring):
+        shared.close()
@@ -1,51 +1,115 @@
-import warnings
-from typing import Optional
+from pathlib import Path
+from typing import Callable, Optional
 
 from loguru import logger as log
 from PySide6 import QtCore
 
+from vta_collection.cold_junction_compensator import CjcData
 from vta_collection.config import config
-from vta_collection.heater.loop import RealLoop, TestLoop
-from vta_collection.measurement import DataPoint, Measurement
+from vta_collection.data_block import DataBlock
+from vta_collection.hardware import get_hardware
+from vta_collection.heater.loop import AbstractLoop, RealLoop, ReplayLoop, TestLoop
+from vta_collection.heater.process import ProcessLoop
+from vta_collection.measurement import Measurement
 
 
 class HeaterController(QtCore.QObject):
-    data_ready = QtCore.Signal(DataPoint)
+    data_ready = QtCore.Signal(DataBlock)
     meas: Optional[Measurement] = None
+    # Получатель пакетов измерения meas, подключенный к data_ready
+    meas_slot: Optional[Callable[[DataBlock], None]] = None
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, rig: str = ""):
         super().__init__(parent)
-        if config.is_test_mode:
+        self.rig = rig
+        self.loop: AbstractLoop | ProcessLoop
+        if config.replay_file:
+            self.loop = ReplayLoop(
+                path=Path(config.replay_file), speed=config.replay_speed
+            )
+        elif config.acquisition_process:
+            self.loop = ProcessLoop(rig=rig)
+        elif config.is_test_mode:
             self.loop = TestLoop()
         else:
-            self.loop = RealLoop()
-        self.loop.data_ready.connect(self.data_ready.emit)
+            self.loop = RealLoop(hardware=get_hardware(auto_find=False, rig=rig))
         self.loop.error_occurred.connect(log.error)
+        # Номера следующих непрочитанных строк буферов потока опроса
+        self.read_seq = 0
+        self.channel_seqs = [0] * len(self.loop.channel_rings)
+        self.cjc_seq = 0
+        self.reader = QtCore.QTimer(self)
+        self.reader.setInterval(round(config.refresh_interval * 1000))
+        self.reader.timeout.connect(self.read_ring)
 
     def set_meas(self, meas: Measurement):
         if self.meas:
+            # Опрос может продолжаться (холодный спай без остановки опроса):
+            # прежнее измерение получает свои точки и отключается
+            if self.loop.enabled:
+                self.read_ring()
+            self.set_meas_connection(False)
             del self.meas
         self.meas = meas
+        self.loop.set_temperature(
+            cal=meas.cal, cjc_data=meas.compensator.get_cjc_data(), rig=self.rig
+        )
+
+    def read_ring(self):
+        """Передать получателям новые точки из буферов потока опроса"""
+        view = self.loop.ring.read(since=self.read_seq)
+        if view.start == view.stop:
+            return
+        if view.lost:
+            log.warning(f"{view.lost} data points overwritten before display")
+        channels = [
+            ring.read(since=since)
+            for ring, since in zip(self.loop.channel_rings, self.channel_seqs)
+        ]
+        cjc = self.loop.cjc_ring.read(since=self.cjc_seq)
+        self.read_seq = view.stop
+        self.channel_seqs = [channel.stop for channel in channels]
+        self.cjc_seq = cjc.stop
+        self.data_ready.emit(DataBlock.from_view(view=view, channels=channels, cjc=cjc))
+        if self.loop.ring.overwritten(view):
+            log.warning("Data points overwritten while being displayed")
+
+    def latest_cjc(self) -> Optional[CjcData]:
+        """Последняя сглаженная оценка холодного спая работающего опроса"""
+        ring = self.loop.cjc_ring
+        if not self.loop.thread_is_running or ring.seq == 0:
+            return None
+        _, _, smoothed, e_cold = ring.read(since=ring.seq - 1).columns[:, -1]
+        return CjcData(temperature=float(smoothed), e_cold=float(e_cold))
 
     def set_meas_connection(self, enabled):
         if self.meas is None:
             return
         if enabled:
-            self.data_ready.connect(self.meas.make_data_connection())
+            if self.meas_slot is None:
+                self.meas_slot = self.meas.make_data_connection()
+                self.data_ready.connect(self.meas_slot)
             self.meas.recording_enabled = True
         else:
             self.meas.recording_enabled = False
-            with warnings.catch_warnings(action="ignore"):
-                self.data_ready.disconnect()
+            if self.meas_slot is not None:
+                self.data_ready.disconnect(self.meas_slot)
+                self.meas_slot = None
 
     def start_loop(self):
         log.debug("Starting loop thread")
+        self.read_seq = self.loop.ring.seq
+        self.channel_seqs = [ring.seq for ring in self.loop.channel_rings]
+        self.cjc_seq = self.loop.cjc_ring.seq
         self.loop.start_thread()
         self.loop.set_enabled(True)
         self.set_meas_connection(True)
+        self.reader.start()
 
     def stop_loop(self):
         log.debug("Stopping loop thread")
+        self.reader.stop()
+        self.read_ring()
         self.set_meas_connection(False)
         self.loop.set_enabled(False)
         self.loop.set_output(0.0)
@@ -74,12 +138,11 @@ class HeaterController(QtCore.QObject):
         log.debug(f"Heat speed changed to {value}")
 
 
-_heater: Optional[HeaterController] = None
+_heater: dict[str, HeaterController] = {}
 
 
-def get_heater(parent=None) -> HeaterController:
-    """Получить экземпляр HeaterController (singleton)"""
-    global _heater
-    if _heater is None:
-        _heater = HeaterController(parent)
-    return _heater
+def get_heater(parent=None, rig: str = "") -> HeaterController:
+    """Получить экземпляр HeaterController печи rig (один на печь)"""
+    if rig not in _heater:
+        _heater[rig] = HeaterController(parent, rig=rig)
+    return _heater[rig]
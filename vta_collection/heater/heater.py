@@ -3,11 +3,11 @@ from typing import TYPE_CHECKING, Optional
 from vta_collection.config import config
 
 if TYPE_CHECKING:
-    from vta_collection.heater.loop import AbstractLoop
+    from vta_collection.heater.sampler import AbstractSampler
 
 
 class Heater:
-    def __init__(self, loop: "AbstractLoop"):
+    def __init__(self, loop: "AbstractSampler"):
         self.loop = loop
         self.output = 0.0
         self.t0: Optional[float] = None
@@ -20,16 +20,22 @@ class Heater:
     def set_speed(self, value: int):
         self.heat_speed = value / 1000
 
-    def heatup(self, last_t: float):
-        if self.enabled:
-            if self.t0 is None:
-                self.t0 = last_t
-                return
-            self.output += self.heat_speed * (last_t - self.t0)
-            # Add protection against negative values
-            if self.output < 0:
-                self.output = 0.0
+    def update(self, last_t: float) -> bool:
+        """Пересчитать выход на момент last_t, True - если выход нужно обновить"""
+        if not self.enabled:
+            return False
+        if self.t0 is None:
             self.t0 = last_t
+            return False
+        self.output += self.heat_speed * (last_t - self.t0)
+        # Add protection against negative values
+        if self.output < 0:
+            self.output = 0.0
+        self.t0 = last_t
+        return True
+
+    def heatup(self, last_t: float):
+        if self.update(last_t=last_t):
             self.loop.set_output(value=self.output)
 
     def reset(self):
@@ -1,102 +1,74 @@
-import math
-import time
-from abc import abstractmethod
+from pathlib import Path
+from typing import Optional
 
 from PySide6 import QtCore
 
-from vta_collection.hardware import get_hardware
-from vta_collection.heater.heater import Heater
-from vta_collection.measurement import DataPoint
-
-TEST_INTERVAL = 0.1
-
-
-class LoopException(Exception):
-    pass
-
-
-class OutputException(Exception):
-    pass
+from vta_collection.calibration import Calibration
+from vta_collection.cold_junction_compensator import CjcData
+from vta_collection.hardware import Hardware
+from vta_collection.heater.sampler import (
+    AbstractSampler,
+    RealSampler,
+    ReplaySampler,
+    TestSampler,
+)
 
 
 class AbstractLoop(QtCore.QThread):
+    """Поток Qt, в котором выполняется опрос AbstractSampler"""
+
     error_occurred = QtCore.Signal(Exception)
-    data_ready = QtCore.Signal(DataPoint)
 
-    def __init__(self):
+    def __init__(self, sampler: AbstractSampler):
         super().__init__()
-        self.heater = Heater(self)
-        self.thread_is_running = False
-        self.enabled = False
+        self.sampler = sampler
+        self.sampler.on_error = self.error_occurred.emit
+        self.heater = sampler.heater
+        self.ring = sampler.ring
+        self.channel_rings = sampler.channel_rings
+        self.cjc_ring = sampler.cjc_ring
+
+    @property
+    def enabled(self) -> bool:
+        return self.sampler.enabled
+
+    @property
+    def thread_is_running(self) -> bool:
+        return self.sampler.thread_is_running
 
     def start_thread(self):
         if not self.isRunning():
+            self.sampler.prepare()
             super().start()
 
     def run(self):
-        self.thread_is_running = True
-        while self.thread_is_running:
-            if self.enabled:
-                try:
-                    self.loop_body()
-                except Exception as e:
-                    self.error_occurred.emit(LoopException(e))
+        self.sampler.run()
 
     def stop_thread(self):
-        self.set_enabled(False)
-        self.thread_is_running = False
+        self.sampler.stop()
         self.exit()
         self.wait()
 
     def set_enabled(self, enabled: bool):
-        self.enabled = enabled
-
-    def loop_body(self):
-        emf = self.get_data()
-        t1 = time.monotonic()
-        self.heater.heatup(last_t=t1)
-        t2 = time.monotonic()
-        data = DataPoint(
-            t1=round(t1, 3),
-            emf=emf,
-            t2=round(t2, 3),
-            output=round(self.heater.output, 3),
-        )
-        self.data_ready.emit(data)
-
-    @abstractmethod
-    def get_data(self):
-        raise NotImplementedError
-
-    @abstractmethod
-    def set_output(self, value: float):
-        raise NotImplementedError
+        self.sampler.set_enabled(enabled)
 
+    def set_output(self, value: float):
+        self.sampler.set_output(value)
 
-class RealLoop(AbstractLoop):
-    def __init__(self):
-        super().__init__()
-        hardware = get_hardware(auto_find=False)
-        self.adam4011 = hardware.adam4011
-        self.adam4021 = hardware.adam4021
+    def set_temperature(self, cal: Calibration, cjc_data: CjcData, rig: str = ""):
+        self.sampler.set_temperature(cal=cal, cjc_data=cjc_data, rig=rig)
 
-    def get_data(self):
-        return self.adam4011.get_data()
 
-    def set_output(self, value: float):
-        try:
-            self.adam4021.set_output(value=value)
-        except Exception as e:
-            self.error_occurred.emit(OutputException(e))
+class RealLoop(AbstractLoop):
+    def __init__(self, hardware: Optional[Hardware] = None):
+        super().__init__(sampler=RealSampler(hardware=hardware))
 
 
 class TestLoop(AbstractLoop):
-    def get_data(self):
-        return math.sin(time.monotonic())
+    def __init__(self, sampling_rate: Optional[float] = None):
+        super().__init__(sampler=TestSampler(sampling_rate=sampling_rate))
 
-    def set_output(self, value: float):
-        pass
 
-    def loop_body(self):
-        time.sleep(TEST_INTERVAL)
-        super().loop_body()
+class ReplayLoop(AbstractLoop):
+    def __init__(self, path: Path, speed: float = 1.0):
+        super().__init__(sampler=ReplaySampler(path=path, speed=speed))
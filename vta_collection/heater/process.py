@@ -0,0 +1,168 @@
+"""Опрос оборудования в отдельном процессе.
+
+Дочерний процесс владеет портом: выполняет RealSampler (TestSampler в
+тестовом режиме) в своем главном потоке и пишет точки в кольцевые буферы в
+разделяемой памяти. GUI читает эти буферы так же, как буферы потока опроса,
+а команды (пауза, выход, нагрев, скорость) передает через Pipe. Отрисовка
+графиков не конкурирует с опросом за GIL.
+"""
+
+import atexit
+import multiprocessing
+from multiprocessing.connection import Connection
+from typing import Any, Optional
+
+from loguru import logger as log
+from PySide6 import QtCore
+
+from vta_collection.calibration import Calibration
+from vta_collection.cold_junction_compensator import CjcData
+from vta_collection.config import config
+from vta_collection.data_block import CHANNEL_COLUMNS, CJC_COLUMNS, DATA_COLUMNS
+from vta_collection.hardware import get_hardware
+from vta_collection.heater.acquisition import acquisition_main
+from vta_collection.heater.sampler import (
+    CJC_RING_CAPACITY,
+    RING_CAPACITY,
+    LoopException,
+)
+from vta_collection.ring_buffer import RingBuffer
+
+# Ожидание завершения процесса опроса до принудительной остановки, с
+STOP_TIMEOUT = 5.0
+# Период проверки сообщений от процесса опроса, мс
+POLL_INTERVAL = 100
+
+# fork после запуска Qt небезопасен, процесс всегда запускается заново
+_context = multiprocessing.get_context("spawn")
+
+
+class HeaterProxy:
+    """Команды Heater процесса опроса"""
+
+    def __init__(self, loop: "ProcessLoop"):
+        self.loop = loop
+
+    def set_enabled(self, enabled: bool):
+        self.loop.send("heater", "set_enabled", enabled)
+
+    def set_speed(self, value: int):
+        # Скорость повторяется при каждом запуске процесса
+        self.loop.remember("speed", ("heater", "set_speed", value))
+
+    def reset(self):
+        self.loop.send("heater", "reset")
+
+
+class ProcessLoop(QtCore.QObject):
+    """Замена AbstractLoop в HeaterController: опрос в дочернем процессе.
+
+    Процесс запускается start_thread и завершается stop_thread, поэтому
+    между запусками порт свободен (например, для чтения CJC).
+    """
+
+    error_occurred = QtCore.Signal(Exception)
+
+    def __init__(self, rig: str = ""):
+        super().__init__()
+        self.rig = rig
+        self.heater = HeaterProxy(self)
+        self.ring = RingBuffer.create_shared(
+            columns=DATA_COLUMNS, capacity=RING_CAPACITY
+        )
+        self.channel_rings = [
+            RingBuffer.create_shared(columns=CHANNEL_COLUMNS, capacity=RING_CAPACITY)
+            for _ in config.get_rig(rig).extra_inputs
+        ]
+        self.cjc_ring = RingBuffer.create_shared(
+            columns=CJC_COLUMNS, capacity=CJC_RING_CAPACITY
+        )
+        self.enabled = False
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.conn: Optional[Connection] = None
+        # Команды, которые повторяются при каждом запуске процесса
+        self.remembered: dict[str, tuple] = {}
+        self.poller = QtCore.QTimer(self)
+        self.poller.setInterval(POLL_INTERVAL)
+        self.poller.timeout.connect(self.poll)
+        atexit.register(self.release_shared)
+
+    @property
+    def thread_is_running(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def send(self, *message: Any):
+        if self.conn is not None:
+            self.conn.send(message)
+
+    def remember(self, key: str, message: tuple):
+        self.remembered[key] = message
+        self.send(*message)
+
+    def start_thread(self):
+        if self.thread_is_running:
+            return
+        # Порт мог остаться открытым в этом процессе после чтения CJC
+        get_hardware(rig=self.rig).release()
+        self.conn, child_conn = _context.Pipe()
+        self.process = _context.Process(
+            target=acquisition_main,
+            kwargs={
+                "rig": self.rig,
+                "settings": config.model_dump(),
+                "ring": self.ring.name,
+                "channel_rings": [ring.name for ring in self.channel_rings],
+                "cjc_ring": self.cjc_ring.name,
+                "conn": child_conn,
+            },
+            name=f"acquisition {self.rig}".strip(),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        for message in self.remembered.values():
+            self.send(*message)
+        self.poller.start()
+
+    def set_enabled(self, enabled: bool):
+        self.enabled = enabled
+        self.send("enabled", enabled)
+
+    def set_output(self, value: float):
+        self.send("output", value)
+
+    def set_temperature(self, cal: Calibration, cjc_data: CjcData, rig: str = ""):
+        self.remember("temperature", ("temperature", cal, cjc_data, rig))
+
+    def stop_thread(self):
+        self.enabled = False
+        if self.process is None:
+            return
+        self.send("stop")
+        self.process.join(STOP_TIMEOUT)
+        if self.process.is_alive():
+            log.warning("Acquisition process did not stop, terminating")
+            self.process.terminate()
+            self.process.join()
+        self.poller.stop()
+        self.poll(stopping=True)
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = None
+        self.process = None
+
+    def poll(self, stopping: bool = False):
+        """Передать в GUI ошибки процесса опроса"""
+        try:
+            while self.conn is not None and self.conn.poll():
+                kind, text = self.conn.recv()
+                if kind == "error":
+                    self.error_occurred.emit(LoopException(text))
+        except (EOFError, OSError):
+            if not stopping:
+                log.error("Acquisition process exited")
+                self.poller.stop()
+
+    def release_shared(self):
+        for ring in (self.ring, *self.channel_rings, self.cjc_ring):
+            ring.unlink()
@@ -0,0 +1,534 @@
+import math
+import threading
+import time
+from abc import abstractmethod
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Optional
+
+import numpy as np
+import serial
+from loguru import logger as log
+
+from vta_collection.adam_base import AdamBase
+from vta_collection.calibration import Calibration
+from vta_collection.cold_junction_compensator import (
+    CjcData,
+    CjcTracker,
+    ColdJunctionCompensator,
+    e_cold_shifts,
+)
+from vta_collection.config import config
+from vta_collection.data_block import CHANNEL_COLUMNS, CJC_COLUMNS, DATA_COLUMNS
+from vta_collection.furnace_model import FurnaceModel
+from vta_collection.hardware import Hardware, get_hardware
+from vta_collection.heater.heater import Heater
+from vta_collection.heater.scheduler import ChannelScheduler, DeadlineScheduler
+from vta_collection.ring_buffer import RingBuffer
+from vta_collection.temperature_chain import TemperatureChain
+from vta_collection.vtaz import read_vtaz
+
+TEST_INTERVAL = 0.1
+# Строк в кольцевом буфере (~20 мин при 50 Гц)
+RING_CAPACITY = 2**16
+# Строк в буфере чтений холодного спая (~11 ч при чтении раз в 10 с)
+CJC_RING_CAPACITY = 2**12
+# Пауза после ошибки в loop_body, чтобы неисправная шина не загружала ядро
+ERROR_BACKOFF = 0.1
+# Ошибки обмена с модулями и разбора их ответов: о них сообщает on_error,
+# остальные исключения - ошибки программы и не перехватываются
+DEVICE_ERRORS = (serial.SerialException, OSError, ValueError)
+
+
+class LoopException(Exception):
+    pass
+
+
+class OutputException(Exception):
+    pass
+
+
+class LoopState(Enum):
+    IDLE = "idle"  # поток не запущен
+    RUNNING = "running"
+    PAUSED = "paused"  # поток ждет set_enabled(True), не занимая процессор
+    STOPPING = "stopping"
+
+
+class AbstractSampler:
+    """Опрос оборудования и управление нагревом без Qt.
+
+    run() выполняется в своем потоке (QThread в AbstractLoop, главный поток
+    процесса опроса, поток записи без GUI), остальные методы вызываются из
+    других потоков.
+    """
+
+    def __init__(self, sampling_rate: Optional[float] = None):
+        self.heater = Heater(self)
+        # Ошибки итераций (AbstractLoop передает их сигналом error_occurred)
+        self.on_error: Callable[[Exception], None] = log.error
+        # Частота опроса, Гц (0 - с максимальной скоростью шины)
+        if sampling_rate is None:
+            sampling_rate = config.sampling_rate
+        self.ticker = DeadlineScheduler(rate=sampling_rate)
+        # Точки пишутся в кольцевые буферы, GUI читает их со своей частотой
+        self.ring = RingBuffer(columns=DATA_COLUMNS, capacity=RING_CAPACITY)
+        self.channel_rings: list[RingBuffer] = []
+        self.cjc_ring = RingBuffer(columns=CJC_COLUMNS, capacity=CJC_RING_CAPACITY)
+        # Пересчет ЭДС в температуру (задается для измерения, set_temperature)
+        self.temperature: Optional[Callable[[float], float]] = None
+        # Сглаженный холодный спай: добавка к ЭДС точек относительно
+        # компенсации в self.temperature
+        self.cjc: Optional[CjcTracker] = None
+        self.e_cold_shift = 0.0
+        # Чтения холодного спая с запуска опроса и время шины на них, с
+        self.cjc_reads = 0
+        self.cjc_busy = 0.0
+        self.state = LoopState.IDLE
+        self._cond = threading.Condition()
+        # Поток выполняет loop_body и обращается к шине
+        self._in_body = False
+        self._thread_id: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.state == LoopState.RUNNING
+
+    @property
+    def thread_is_running(self) -> bool:
+        return self.state in (LoopState.RUNNING, LoopState.PAUSED)
+
+    def prepare(self):
+        """Перевести в паузу перед запуском run() в новом потоке"""
+        with self._cond:
+            self.state = LoopState.PAUSED
+
+    def run(self):
+        self._thread_id = threading.get_ident()
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self.state != LoopState.PAUSED)
+                if self.state != LoopState.RUNNING:
+                    break
+            if not self.ticker.wait(sleep=self.wait_interval):
+                continue
+            with self._cond:
+                if self.state != LoopState.RUNNING:
+                    continue
+                self._in_body = True
+            try:
+                self.loop_body()
+            except DEVICE_ERRORS as e:
+                self.on_error(LoopException(e))
+                self.wait_interval(ERROR_BACKOFF)
+            finally:
+                with self._cond:
+                    self._in_body = False
+                    self._cond.notify_all()
+        with self._cond:
+            self.state = LoopState.IDLE
+            self._cond.notify_all()
+
+    def stop(self):
+        """Завершить run() (не дожидаясь выхода из него)"""
+        with self._cond:
+            if self.state != LoopState.IDLE:
+                self.state = LoopState.STOPPING
+                self._cond.notify_all()
+
+    def set_enabled(self, enabled: bool):
+        """Запустить или приостановить опрос.
+
+        При остановке ждет завершения текущей итерации, чтобы после возврата
+        шиной можно было пользоваться из другого потока.
+        """
+        with self._cond:
+            if self.state in (LoopState.IDLE, LoopState.STOPPING):
+                return
+            was_running = self.state == LoopState.RUNNING
+            if enabled and not was_running:
+                self.ticker.reset()
+                self.cjc_reads = 0
+                self.cjc_busy = 0.0
+            self.state = LoopState.RUNNING if enabled else LoopState.PAUSED
+            self._cond.notify_all()
+            if not enabled and threading.get_ident() != self._thread_id:
+                self._cond.wait_for(lambda: not self._in_body)
+        if was_running and not enabled:
+            log.info(f"Loop paused, timing: {self.ticker.stats()}")
+            if self.cjc_reads:
+                log.info(self.cjc_report())
+
+    def set_temperature(self, cal: Calibration, cjc_data: CjcData, rig: str = ""):
+        compensator = ColdJunctionCompensator.from_cjc_data(
+            calibration=cal, cjc_data=cjc_data, rig=rig
+        )
+        self.temperature = TemperatureChain(cal=cal, compensator=compensator).get_value
+        self.cjc = CjcTracker(
+            cjc_data=cjc_data,
+            smoothing=config.cjc_smoothing,
+            interval=config.cjc_interval,
+        )
+        self.e_cold_shift = 0.0
+
+    def update_cjc(self, t: float, temperature: float, elapsed: float):
+        """Учесть чтение холодного спая в момент t (elapsed - время обмена на
+        шине, с): следующие точки пересчитываются по новой сглаженной оценке"""
+        self.cjc_reads += 1
+        self.cjc_busy += elapsed
+        if self.cjc is None:
+            return
+        estimate = self.cjc.update(t=t, temperature=temperature)
+        self.e_cold_shift = self.cjc.e_cold_shift
+        self.cjc_ring.append(
+            round(t, 3), temperature, estimate.temperature, estimate.e_cold
+        )
+
+    def cjc_report(self) -> str:
+        """Потеря частоты опроса на чтения холодного спая с запуска опроса.
+
+        Доля времени шины - оценка сверху: при заданной частоте опроса чтение
+        отнимает точки, только если цикл с ним не укладывается в период
+        (missed в статистике ticker).
+        """
+        ticker = self.ticker
+        elapsed = 0 if ticker.start_ns is None else ticker.last_ns - ticker.start_ns
+        share = self.cjc_busy / (elapsed / 1e9) if elapsed > 0 else 0.0
+        return (
+            f"CJC: {self.cjc_reads} reads, "
+            f"{self.cjc_busy / self.cjc_reads * 1000:.1f} ms each, "
+            f"{share:.2%} of bus time (~{self.cjc_busy * ticker.stats().rate:.0f} "
+            "points)"
+        )
+
+    def record(
+        self,
+        t1: float,
+        emf: float,
+        t2: float,
+        output: float,
+        temperature: Optional[float] = None,
+    ):
+        """Записать точку опроса в кольцевой буфер (temperature - уже
+        рассчитанная температура, None - рассчитать по self.temperature)"""
+        if temperature is None:
+            temperature = self.calculate_temperature(emf)
+        self.ring.append(round(t1, 3), emf, round(t2, 3), round(output, 3), temperature)
+
+    def calculate_temperature(self, emf: float) -> float:
+        temperature = math.nan
+        if self.temperature is not None:
+            try:
+                temperature = self.temperature(emf + self.e_cold_shift)
+            except ValueError as e:
+                log.warning(e)
+        return temperature
+
+    def wait_interval(self, seconds: float) -> bool:
+        """Пауза внутри итерации, прерываемая остановкой; False - опрос остановлен"""
+        with self._cond:
+            return not self._cond.wait_for(
+                lambda: self.state != LoopState.RUNNING, seconds
+            )
+
+    def loop_body(self):
+        emf = self.get_data()
+        t1 = time.monotonic()
+        self.heater.heatup(last_t=t1)
+        t2 = time.monotonic()
+        self.record(t1=t1, emf=emf, t2=t2, output=self.heater.output)
+
+    @abstractmethod
+    def get_data(self):
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_output(self, value: float):
+        raise NotImplementedError
+
+
+class RealSampler(AbstractSampler):
+    def __init__(self, hardware: Optional[Hardware] = None):
+        super().__init__()
+        if hardware is None:
+            hardware = get_hardware(auto_find=False)
+        self.adam4520 = hardware.adam4520
+        self.adam4011 = hardware.adam4011
+        self.adam4021 = hardware.adam4021
+        self.extra_inputs = hardware.extra_inputs
+        self.channel_rings = [
+            RingBuffer(columns=CHANNEL_COLUMNS, capacity=RING_CAPACITY)
+            for _ in self.extra_inputs
+        ]
+        self.scheduler = ChannelScheduler(
+            periods=[channel.every for channel in hardware.rig.extra_inputs]
+        )
+        # Значение, установленное на выходе 4021
+        self.output = 0.0
+        self.output_written = -math.inf
+        self.output_interval = config.output_interval
+        # Время последнего чтения холодного спая ($AA3) во время опроса
+        self.cjc_read = -math.inf
+        self.cjc_interval = config.cjc_interval
+
+    def get_data(self):
+        return self.adam4011.get_data()
+
+    def set_output(self, value: float):
+        try:
+            answer = self.adam4021.set_output(value=value)
+        except DEVICE_ERRORS as e:
+            self.on_error(OutputException(e))
+            return
+        # Без подтверждения модуля выход считается прежним: next_output
+        # повторит запись в следующем цикле
+        if not self.adam4021.is_output_accepted(answer):
+            self.on_error(OutputException(f"Output rejected: {answer!r}"))
+            return
+        self.output = self.adam4021.quantize(value)
+        self.output_written = time.monotonic()
+
+    def next_output(self) -> Optional[float]:
+        """Значение для записи в 4021 в этом цикле, None - выход не менять.
+
+        Выход пишется, только когда меняется код ЦАП, и не чаще, чем
+        output_interval и время нарастания на один шаг (SRC), поэтому
+        опрос входов не ждет записи выхода в каждом цикле.
+        """
+        value = self.adam4021.quantize(self.heater.output)
+        if value == self.output:
+            return None
+        interval = max(self.output_interval, self.adam4021.slew_interval())
+        if time.monotonic() - self.output_written < interval:
+            return None
+        return value
+
+    def next_cjc(self) -> bool:
+        """Прочитать ли в этом цикле температуру холодного спая.
+
+        Чтение добавляется к пакету обмена раз в cjc_interval; опрос не
+        останавливается, цикл с чтением длиннее на одну команду.
+        """
+        if self.cjc is None or self.cjc_interval <= 0:
+            return False
+        now = time.monotonic()
+        if now - self.cjc_read < self.cjc_interval:
+            return False
+        self.cjc_read = now
+        return True
+
+    def loop_body(self):
+        # Чтение 4011 и запись 4021 выполняются одним пакетом обмена
+        requests: list[tuple[AdamBase, bytes]] = [
+            (self.adam4011, self.adam4011.CMD.GET_DATA)
+        ]
+        # Дополнительные входы по расписанию, между чтением и записью
+        channels = self.scheduler.next_cycle()
+        for channel in channels:
+            mod = self.extra_inputs[channel]
+            requests.append((mod, mod.CMD.GET_DATA))
+        read_cjc = self.next_cjc()
+        if read_cjc:
+            requests.append((self.adam4011, self.adam4011.CMD.CJC_STATUS))
+        output = self.next_output()
+        if output is not None:
+            requests.append((self.adam4021, self.adam4021.output_cmd(value=output)))
+        replies = self.adam4520.exchange_modules(requests)
+
+        for channel, reply in zip(channels, replies[1:]):
+            try:
+                emf = self.extra_inputs[channel].parse_data(data=reply.answer)
+            except ValueError:
+                log.warning(f"No data from input ch{channel + 1}: {reply.answer!r}")
+                continue
+            self.channel_rings[channel].append(round(reply.t, 3), emf)
+
+        t1 = replies[0].t
+        t2 = t1
+        if output is not None:
+            t2 = replies[-1].t
+            self.output_written = t2
+            if self.adam4021.is_output_accepted(replies[-1].answer):
+                self.output = output
+            else:
+                self.on_error(
+                    OutputException(f"Output rejected: {replies[-1].answer!r}")
+                )
+        emf = self.adam4011.parse_data(data=replies[0].answer)
+
+        self.heater.update(last_t=t1)
+        self.record(t1=t1, emf=emf, t2=t2, output=self.output)
+        # Новая оценка холодного спая - для точек после чтения
+        if read_cjc:
+            reply = replies[1 + len(channels)]
+            try:
+                temperature = self.adam4011.parse_cjc_temperature(
+                    response=reply.answer.decode("ascii")
+                )
+            except ValueError:
+                log.warning(f"No CJC temperature: {reply.answer!r}")
+            else:
+                self.update_cjc(
+                    t=reply.t, temperature=temperature, elapsed=reply.elapsed
+                )
+
+
+class TestSampler(AbstractSampler):
+    """Опрос модели печи (FurnaceModel) вместо оборудования.
+
+    С virtual_time время модели идет на период опроса за итерацию без
+    ожидания, и время точек - время модели, а не часов.
+    """
+
+    def __init__(
+        self, sampling_rate: Optional[float] = None, virtual_time: Optional[bool] = None
+    ):
+        if sampling_rate is None:
+            sampling_rate = config.sampling_rate or 1 / TEST_INTERVAL
+        if virtual_time is None:
+            virtual_time = config.furnace.virtual_time
+        super().__init__(sampling_rate=0 if virtual_time else sampling_rate)
+        self.period = 1 / sampling_rate
+        self.virtual_time = virtual_time
+        self.model = FurnaceModel()
+        # time.monotonic() для времени модели 0 и время модели текущей точки
+        self.base: Optional[float] = None
+        self.elapsed = 0.0
+
+    def loop_body(self):
+        now = time.monotonic()
+        if self.base is None:
+            self.base = now
+        if self.virtual_time:
+            self.elapsed += self.period
+        else:
+            self.elapsed = now - self.base
+        self.model.advance(until=self.elapsed)
+        emf = self.model.emf()
+        t1 = self.base + self.elapsed
+        self.heater.heatup(last_t=t1)
+        self.record(t1=t1, emf=emf, t2=t1, output=self.heater.output)
+
+    def get_data(self):
+        return self.model.emf()
+
+    def set_output(self, value: float):
+        self.model.set_output(value)
+
+
+class ReplaySampler(AbstractSampler):
+    """Воспроизведение записанного .vtaz вместо опроса оборудования.
+
+    Точки выдаются в темпе записи, ускоренном в speed раз (speed <= 0 - без
+    пауз), по одной за итерацию. Время точек - время записи от первого
+    запуска, температура пересчитывается по калибровке из set_temperature
+    и холодному спаю записи (с его чтениями во время записи, если они
+    сохранены). В конце файла опрос встает на паузу.
+    """
+
+    def __init__(self, path: Path, speed: float = 1.0):
+        # Темп задает время точек файла, а не частота опроса
+        super().__init__(sampling_rate=0)
+        data = read_vtaz(path)
+        self.path = path
+        self.speed = speed
+        self.times = data.emf.x
+        self.values = data.emf.y
+        self.channels = [
+            ([], []) if pack is None else (pack.x, pack.y) for pack in data.channels
+        ]
+        # Температуры всех точек файла (пересчитываются в set_temperature)
+        self.temperatures = np.full(len(self.values), np.nan)
+        self.channel_rings = [
+            RingBuffer(columns=CHANNEL_COLUMNS, capacity=RING_CAPACITY)
+            for _ in self.channels
+        ]
+        self.rig = data.metadata.rig
+        self.cjc_data = CjcData(
+            temperature=data.cjc_data["temperature"], e_cold=data.cjc_data["e_cold"]
+        )
+        # Чтения холодного спая во время записи (столбцы CJC_COLUMNS) и
+        # поправки ЭДС точек по ним
+        series = data.cjc_data.get("series", {})
+        self.cjc_series = [series.get(name, []) for name in CJC_COLUMNS]
+        self.cjc_position = 0
+        self.shifts = e_cold_shifts(data.cjc_data, np.asarray(self.times))
+        self.set_temperature(cal=data.cal, cjc_data=self.cjc_data, rig=self.rig)
+        self.position = 0
+        self.channel_positions = [0] * len(self.channels)
+        # time.monotonic() для времени записи 0 (время точек) и для начала
+        # отсчета пауз после запуска
+        self.base: Optional[float] = None
+        self.origin: Optional[float] = None
+        log.info(f"Replaying {len(self.times)} points from {path} at {speed}x")
+
+    def set_enabled(self, enabled: bool):
+        if enabled:
+            self.origin = None
+        super().set_enabled(enabled)
+
+    def set_temperature(self, cal: Calibration, cjc_data: CjcData, rig: str = ""):
+        # Холодный спай - условие записи, а не текущего стенда
+        compensator = ColdJunctionCompensator.from_cjc_data(
+            calibration=cal, cjc_data=self.cjc_data, rig=rig
+        )
+        # Весь файл пересчитывается одной операцией над массивом
+        self.temperatures = TemperatureChain(
+            cal=cal, compensator=compensator
+        ).get_values(np.asarray(self.values) + self.shifts)
+
+    def replay_channels(self, until: float):
+        """Записать в буферы точки дополнительных входов и чтения холодного
+        спая до времени until"""
+        assert self.base is not None
+        for channel, (times, values) in enumerate(self.channels):
+            position = self.channel_positions[channel]
+            while position < len(times) and times[position] <= until:
+                self.channel_rings[channel].append(
+                    round(self.base + times[position], 3), values[position]
+                )
+                position += 1
+            self.channel_positions[channel] = position
+        t, *values = self.cjc_series
+        while self.cjc_position < len(t) and t[self.cjc_position] <= until:
+            self.cjc_ring.append(
+                round(self.base + t[self.cjc_position], 3),
+                *(column[self.cjc_position] for column in values),
+            )
+            self.cjc_position += 1
+
+    def loop_body(self):
+        if self.position >= len(self.times):
+            if self.base is not None:
+                self.replay_channels(until=math.inf)
+            log.info(f"Replay of {self.path} finished")
+            self.set_enabled(False)
+            return
+        t = self.times[self.position]
+        now = time.monotonic()
+        if self.base is None:
+            self.base = now - t
+        if self.speed > 0:
+            if self.origin is None:
+                self.origin = now - t / self.speed
+            remaining = self.origin + t / self.speed - now
+            if remaining > 0 and not self.wait_interval(remaining):
+                return
+        self.replay_channels(until=t)
+
+        t1 = self.base + t
+        self.heater.update(last_t=t1)
+        self.record(
+            t1=t1,
+            emf=self.values[self.position],
+            t2=t1,
+            output=self.heater.output,
+            temperature=float(self.temperatures[self.position]),
+        )
+        self.position += 1
+
+    def get_data(self):
+        return self.values[min(self.position, len(self.values) - 1)]
+
+    def set_output(self, value: float):
+        pass
@@ -0,0 +1,138 @@
+import time
+from collections import deque
+from typing import Callable, NamedTuple, Optional, Sequence
+
+# Последний отрезок ожидания выполняется time.sleep: на Windows таймаут
+# ожидания условия округляется до такта системного таймера (~15.6 мс)
+FINE_SLEEP = 0.02
+
+
+class ChannelScheduler:
+    """Выбор дополнительных входов для опроса в очередном цикле.
+
+    Канал с периодом every опрашивается раз в every циклов. Каналы с
+    одинаковым периодом сдвинуты друг относительно друга (round-robin),
+    чтобы каждый цикл добавлял к обмену примерно одинаковое число команд.
+    """
+
+    def __init__(self, periods: Sequence[int]):
+        self.periods = [max(1, every) for every in periods]
+        self.offsets: list[int] = []
+        used: dict[int, int] = {}
+        for every in self.periods:
+            self.offsets.append(used.get(every, 0) % every)
+            used[every] = used.get(every, 0) + 1
+        self.cycle = 0
+
+    def next_cycle(self) -> list[int]:
+        """Индексы каналов, которые нужно опросить в этом цикле"""
+        due = [
+            index
+            for index, (every, offset) in enumerate(zip(self.periods, self.offsets))
+            if self.cycle % every == offset
+        ]
+        self.cycle += 1
+        return due
+
+
+class TickStats(NamedTuple):
+    rate: float  # достигнутая частота циклов, Гц
+    ticks: int
+    missed: int  # пропущенные сроки
+    # Запаздывание начала цикла относительно срока, с
+    jitter_p50: float
+    jitter_p95: float
+    jitter_p99: float
+
+
+class DeadlineScheduler:
+    """Запуск циклов с постоянной частотой по абсолютным срокам.
+
+    Срок k-го цикла - start + k·period (time.monotonic_ns), поэтому ошибки
+    ожидания не накапливаются. Если цикл опоздал больше чем на период,
+    пропущенные сроки не догоняются, а учитываются в missed.
+    rate <= 0 - без ограничения частоты.
+    """
+
+    def __init__(self, rate: float, window: int = 1000):
+        self.period_ns = round(1e9 / rate) if rate > 0 else 0
+        self.lateness: deque[int] = deque(maxlen=window)
+        self.reset()
+
+    def reset(self):
+        """Начать отсчет сроков заново (после паузы)"""
+        self.start_ns: Optional[int] = None
+        self.last_ns = 0
+        self.tick = 0
+        self.ticks = 0
+        self.missed = 0
+        self.lateness.clear()
+
+    def wait(self, sleep: Callable[[float], bool]) -> bool:
+        """Дождаться срока следующего цикла, False - ожидание прервано.
+
+        sleep(seconds) - прерываемое ожидание, возвращает False при остановке.
+        """
+        now = time.monotonic_ns()
+        if self.start_ns is None:
+            self.start_ns = now
+        if not self.period_ns:
+            self._record(now, now)
+            return True
+
+        deadline = self.start_ns + self.tick * self.period_ns
+        if now - deadline >= self.period_ns:
+            skipped = (now - deadline) // self.period_ns
+            self.missed += skipped
+            self.tick += skipped
+            deadline += skipped * self.period_ns
+        remaining = (deadline - now) / 1e9
+        if remaining > FINE_SLEEP and not sleep(remaining - FINE_SLEEP):
+            return False
+        remaining = (deadline - time.monotonic_ns()) / 1e9
+        if remaining > 0:
+            time.sleep(remaining)
+        self.tick += 1
+        self._record(time.monotonic_ns(), deadline)
+        return True
+
+    def _record(self, now: int, deadline: int):
+        self.ticks += 1
+        self.last_ns = now
+        self.lateness.append(now - deadline)
+
+    def percentile(self, q: float) -> float:
+        if not self.lateness:
+            return 0.0
+        ordered = sorted(self.lateness)
+        index = min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))
+        return ordered[index] / 1e9
+
+    def stats(self) -> TickStats:
+        elapsed = 0 if self.start_ns is None else self.last_ns - self.start_ns
+        return TickStats(
+            rate=(self.ticks - 1) / (elapsed / 1e9) if elapsed > 0 else 0.0,
+            ticks=self.ticks,
+            missed=self.missed,
+            jitter_p50=self.percentile(50),
+            jitter_p95=self.percentile(95),
+            jitter_p99=self.percentile(99),
+        )
+
+
+if __name__ == "__main__":
+    scheduler = ChannelScheduler(periods=[1, 2, 2, 3])
+    for _ in range(6):
+        print(scheduler.next_cycle())
+
+    # 50 Гц, каждый десятый цикл длится дольше трех периодов
+    def sleep(seconds: float) -> bool:
+        time.sleep(seconds)
+        return True
+
+    ticker = DeadlineScheduler(rate=50)
+    for i in range(100):
+        ticker.wait(sleep=sleep)
+        if i % 10 == 9:
+            time.sleep(0.07)
+    print(ticker.stats())
@@ -0,0 +1,77 @@
+import math
+from collections import deque
+
+# Граница задержки ответа, пока по команде не накоплена статистика, с
+STARTUP_LATENCY = 0.1
+# Число ответов, после которого используется выученная граница
+MIN_SAMPLES = 10
+# Запас к выученной границе: множитель и добавка на джиттер ОС и USB-адаптера
+LATENCY_MARGIN = 1.5
+LATENCY_SLACK = 0.01
+# Верхний предел границы задержки, с
+MAX_LATENCY = 1.0
+
+
+class LatencyEstimator:
+    """Оценка задержки ответа модуля на команду одного типа.
+
+    Хранит экспоненциальное среднее и дисперсию (EWMA) и окно последних
+    значений для 99-го процентиля. Граница задержки - большее из процентиля
+    и mean + 4·σ с запасом, до накопления MIN_SAMPLES - startup.
+    """
+
+    def __init__(
+        self, alpha: float = 0.1, window: int = 200, startup: float = STARTUP_LATENCY
+    ):
+        self.alpha = alpha
+        self.samples: deque[float] = deque(maxlen=window)
+        self.mean = 0.0
+        self.var = 0.0
+        self.count = 0
+        self.misses = 0
+        self.consecutive_misses = 0
+        self._bound = startup
+
+    def add(self, latency: float):
+        if self.count == 0:
+            self.mean = latency
+        else:
+            delta = latency - self.mean
+            self.mean += self.alpha * delta
+            self.var = (1 - self.alpha) * (self.var + self.alpha * delta * delta)
+        self.count += 1
+        self.consecutive_misses = 0
+        self.samples.append(latency)
+        if self.count >= MIN_SAMPLES and self.count % MIN_SAMPLES == 0:
+            self._update_bound()
+
+    def miss(self):
+        """Ответ не пришел вовремя: расширяем границу, чтобы не терять медленные модули.
+
+        Одиночная потеря ответа на линии с помехами границу не меняет,
+        расширение начинается со второго таймаута подряд.
+        """
+        self.misses += 1
+        self.consecutive_misses += 1
+        if self.consecutive_misses < 2:
+            return
+        misses = self.consecutive_misses
+        self.add(min(self._bound * 2, MAX_LATENCY))
+        self.consecutive_misses = misses
+        self._update_bound()
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, math.ceil(q / 100 * len(ordered)) - 1)
+        return ordered[max(index, 0)]
+
+    def bound(self) -> float:
+        return self._bound
+
+    def _update_bound(self):
+        if self.count < MIN_SAMPLES:
+            return
+        learned = max(self.percentile(99), self.mean + 4 * math.sqrt(self.var))
+        self._bound = min(learned * LATENCY_MARGIN + LATENCY_SLACK, MAX_LATENCY)
@@ -2,6 +2,7 @@
 import warnings
 from collections import deque
 
+import numpy as np
 from loguru import logger as log
 from pglive.sources.live_plot_widget import LivePlotWidget
 from PySide6 import QtCore, QtWidgets
@@ -10,7 +11,8 @@ from vta_collection.about_window import AboutWindow
 from vta_collection.calibration_manager_window import CalibrationManagerWindow
 from vta_collection.config import CONFIG_EDITOR_IGNORE_FIELDS, config
 from vta_collection.config_editor import ConfigEditor
-from vta_collection.measurement import DataPoint, Measurement
+from vta_collection.data_block import DataBlock
+from vta_collection.measurement import Measurement
 from vta_collection.ui.main_window import Ui_MainWindow
 
 
@@ -74,6 +76,9 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
 
     def set_live_plot(self, meas: Measurement):
         self.plot_layout.addWidget(self.w_temp)
+        # Дополнительные входы - под основным графиком
+        for dc in meas.dc_channels:
+            self.plot_layout.addWidget(dc.widget)
         self.label_temp.setVisible(True)
         self.label_temp_value.setVisible(True)
         self.label_calibration.setVisible(True)
@@ -93,14 +98,14 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
         intervals: deque = deque(maxlen=window_size)
         last_time_closure = 0.0
 
-        def sampling_rate(data: DataPoint):
+        def sampling_rate(block: DataBlock):
             nonlocal last_time_closure
             try:
                 # Skip the first interval because last_time_closure is 0.0 initially
                 if last_time_closure != 0.0:
-                    current_interval = data.t1 - last_time_closure
-                    intervals.append(current_interval)
-                last_time_closure = data.t1
+                    intervals.append(float(block.t1[0]) - last_time_closure)
+                intervals.extend(np.diff(block.t1).tolist())
+                last_time_closure = float(block.t1[-1])
 
                 # If we have intervals, compute the average
                 if intervals:
@@ -110,16 +115,22 @@ class MainWindow(QtWidgets.QMainWindow, Ui_MainWindow):
             except ZeroDivisionError:
                 pass
 
-        def update_display_cal(data: DataPoint):
+        def update_display_cal(block: DataBlock):
+            # Подписи показывают последнюю точку пакета
+            data = block.last()
             self.label_input.setText(f"{data.emf:.3f}")
             self.label_output_value.setText(
                 f"{data.output:.3f}"
             )  # Updated to use the new label name
-            # Используем TemperatureChain для расчета температуры
-            temp = meas.temp_chain.get_value(data.emf)
-            self.label_temp_value.setText(f"{temp:.1f}")
-
-            sampling_rate(data=data)
+            # Температура рассчитана TemperatureChain в потоке опроса
+            self.label_temp_value.setText(f"{data.temperature:.1f}")
+            # Сглаженный холодный спай, если он читался во время опроса
+            if block.cjc.size:
+                _, _, smoothed, e_cold = block.cjc[:, -1]
+                self.label_cjc_temp_value.setText(f"{smoothed:.1f}")
+                self.label_cjc_emf_value.setText(f"{e_cold:.3f}")
+
+            sampling_rate(block=block)
 
         self.clear_plot_widgets()
 
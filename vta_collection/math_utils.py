@@ -1,4 +1,7 @@
-from typing import Callable
+import math
+from typing import Callable, Optional, Sequence
+
+import numpy as np
 
 
 def bisection_method(
@@ -25,3 +28,131 @@ def bisection_method(
     raise ValueError(
         f"Метод бисекции не сошелся за {max_iterations} итераций для целевого значения {target_value}"
     )
+
+
+def safeguarded_newton(
+    func: Callable[[float], float],
+    derivative: Callable[[float], float],
+    target_value: float,
+    left: float,
+    right: float,
+    tolerance: float = 1e-12,
+    max_iterations: int = 100,
+    initial: Optional[float] = None,
+) -> float:
+    """Решение func(x) = target_value на [left, right] методом Ньютона с
+    защитой бисекцией: шаг, выходящий за текущую вилку (или при нулевой
+    производной), заменяется делением вилки пополам, поэтому метод сходится
+    всегда, когда корень в вилке есть, а вблизи корня - квадратично.
+    initial - начальное приближение (по умолчанию - середина вилки)"""
+    f_left = func(left) - target_value
+    f_right = func(right) - target_value
+    if f_left == 0:
+        return left
+    if f_right == 0:
+        return right
+    if (f_left > 0) == (f_right > 0):
+        raise ValueError(
+            f"Значение {target_value} вне диапазона функции на [{left}, {right}]"
+        )
+    # low - конец вилки, где func < target_value
+    low, high = (left, right) if f_left < 0 else (right, left)
+    x = (low + high) / 2
+    if initial is not None and min(low, high) < initial < max(low, high):
+        x = initial
+    for _ in range(max_iterations):
+        f = func(x) - target_value
+        if f == 0:
+            return x
+        if f < 0:
+            low = x
+        else:
+            high = x
+        slope = derivative(x)
+        step_x = x - f / slope if slope != 0 else math.nan
+        # Малый шаг Ньютона может попасть точно на конец вилки (x)
+        if abs(step_x - x) <= tolerance:
+            return step_x
+        if not min(low, high) < step_x < max(low, high):
+            step_x = (low + high) / 2
+        x = step_x
+    raise ValueError(
+        f"Метод Ньютона не сошелся за {max_iterations} итераций для целевого значения {target_value}"
+    )
+
+
+def safeguarded_newton_array(
+    func: Callable[[np.ndarray], np.ndarray],
+    derivative: Callable[[np.ndarray], np.ndarray],
+    target_values: np.ndarray,
+    left: float,
+    right: float,
+    tolerance: float = 1e-12,
+    max_iterations: int = 100,
+    initial: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """safeguarded_newton для массива значений возрастающей на [left, right]
+    функции; для значений вне ее диапазона - NaN"""
+    target = np.asarray(target_values, dtype=np.float64)
+    f_left, f_right = func(np.array([left, right]))
+    valid = (target >= f_left) & (target <= f_right)
+    low = np.full_like(target, left)
+    high = np.full_like(target, right)
+    x = (low + high) / 2
+    if initial is not None:
+        x = np.where((initial > left) & (initial < right), initial, x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(max_iterations):
+            f = func(x) - target
+            low = np.where(f <= 0, x, low)
+            high = np.where(f >= 0, x, high)
+            step_x = x - f / derivative(x)
+            # Малый шаг Ньютона может попасть точно на конец вилки (x)
+            converged = (np.abs(step_x - x) <= tolerance) | (f == 0)
+            inside = (step_x > low) & (step_x < high)
+            step_x = np.where(converged | inside, step_x, (low + high) / 2)
+            x = np.where(f == 0, x, step_x)
+            if converged[valid].all():
+                break
+    return np.where(valid, x, np.nan)
+
+
+def monotonic_range(
+    poly_coeffs: Sequence[float], left: float, right: float, around: float = 0.0
+) -> tuple[float, float]:
+    """Наибольший отрезок внутри [left, right] около around, на котором
+    полином (коэффициенты от старшей степени) монотонен: между ближайшими
+    вещественными корнями производной"""
+    roots = np.roots(np.polyder(poly_coeffs))
+    real = roots[np.abs(roots.imag) < 1e-9].real
+    low = max([r for r in real if r < around], default=left)
+    high = min([r for r in real if r > around], default=right)
+    return float(max(low, left)), float(min(high, right))
+
+
+def taylor_shift(coefficients: Sequence[float], shift: float) -> list[float]:
+    """Коэффициенты P(x + shift) по коэффициентам P(x) (оба - от c0 к старшей
+    степени)"""
+    shifted = list(coefficients)
+    n = len(shifted)
+    # Схема Горнера с повторным делением на (x - shift)
+    for i in range(n - 1):
+        for j in range(n - 2, i - 1, -1):
+            shifted[j] += shift * shifted[j + 1]
+    return shifted
+
+
+def horner_function(coefficients: Sequence[float]) -> Callable[[float], float]:
+    """Полином c0 + c1*x + ... как функция на float по схеме Горнера:
+    коэффициенты переводятся в кортеж float один раз, при вызове нет
+    обращений к numpy"""
+    leading, *rest = (float(c) for c in reversed(coefficients))
+    rest_coeffs = tuple(rest)
+
+    def polynomial(x: float) -> float:
+        result = leading
+        for c in rest_coeffs:
+            result = result * x + c
+        return result
+
+    return polynomial
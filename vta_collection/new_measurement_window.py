@@ -12,9 +12,10 @@ class NewMeasurementWindow(QtWidgets.QDialog, Ui_Dialog):
     cal: Calibration
     accepted = QtCore.Signal(Measurement)
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, rig: str = ""):
         super().__init__(parent=parent)
         self.setupUi(self)
+        self.rig = rig
 
         self.le_operator.setText(config.operator)
         self.cb_cal_enabled.setChecked(config.calibration_enabled)
@@ -61,6 +62,10 @@ class NewMeasurementWindow(QtWidgets.QDialog, Ui_Dialog):
             metadata=Metadata(
                 sample=self.le_sample.text(),
                 operator=self.le_operator.text(),
+                rig=self.rig,
+                extra_inputs=[
+                    ch.address for ch in config.get_rig(self.rig).extra_inputs
+                ],
             ),
             cal=cal,
         )
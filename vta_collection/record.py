@@ -0,0 +1,233 @@
+"""Запись нагрева без GUI: python -m vta_collection record <файл.vtaz> ...
+
+Используются те же Hardware, Heater, TemperatureChain и формат .vtaz, что и
+в программе, но без PySide6 и pglive.
+"""
+
+import argparse
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+from loguru import logger as log
+
+from vta_collection.calibration import CALIBRATIONS_DIR, Calibration, ZeroCalibration
+from vta_collection.cold_junction_compensator import (
+    ColdJunctionCompensator,
+    read_cjc_data,
+)
+from vta_collection.config import config
+from vta_collection.file_manager import FileManager
+from vta_collection.hardware import Hardware, get_hardware
+from vta_collection.heater.sampler import AbstractSampler, RealSampler, TestSampler
+from vta_collection.ring_buffer import RingBuffer
+from vta_collection.vtaz import DataPack, Metadata, channel_label, write_vtaz
+
+# Период чтения кольцевых буферов, с
+POLL_INTERVAL = 0.5
+# Период вывода хода записи в лог, с
+REPORT_INTERVAL = 10.0
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m vta_collection record",
+        description="Record a heating ramp without the GUI",
+    )
+    parser.add_argument("path", type=Path, help="output .vtaz file")
+    parser.add_argument("--sample", default="", help="sample name")
+    parser.add_argument("--operator", default=config.operator)
+    parser.add_argument("--rig", default="", help="rig name (main rig if empty)")
+    parser.add_argument(
+        "--speed",
+        type=int,
+        default=config.default_speed,
+        help="heating speed, same units as in the main window",
+    )
+    parser.add_argument(
+        "--duration",
+        type=float,
+        help="stop after this many s (furnace model time with furnace.virtual_time)",
+    )
+    parser.add_argument("--until", type=float, help="stop at this temperature, °C")
+    parser.add_argument(
+        "--calibration", help="saved calibration name (no calibration if omitted)"
+    )
+    parser.add_argument("--rate", type=float, help="sampling rate, Hz")
+    args = parser.parse_args(argv)
+    if args.duration is None and args.until is None:
+        parser.error("either --duration or --until is required")
+    return args
+
+
+def load_calibration(name: Optional[str]) -> Calibration:
+    if name is None:
+        return ZeroCalibration()
+    return Calibration.from_dict(
+        FileManager.load_json(CALIBRATIONS_DIR / f"{name}.json")
+    )
+
+
+def collect(ring: RingBuffer, since: int, parts: list[np.ndarray]) -> int:
+    """Скопировать новые строки буфера в parts, вернуть номер следующей"""
+    view = ring.read(since=since)
+    if view.lost:
+        log.warning(f"{view.lost} data points overwritten before saving")
+    if view.stop > view.start:
+        parts.append(view.columns.copy())
+    return view.stop
+
+
+def stop_index(
+    data: np.ndarray,
+    start_time: float,
+    duration: Optional[float],
+    until: Optional[float],
+) -> int:
+    """Число точек data до условия остановки записи включительно"""
+    stop = data.shape[1]
+    if duration is not None:
+        stop = min(stop, int(np.searchsorted(data[0] - start_time, duration, "right")))
+    if until is not None:
+        reached = np.flatnonzero(data[4] >= until)
+        if reached.size:
+            stop = min(stop, int(reached[0]) + 1)
+    return stop
+
+
+def record(args: argparse.Namespace) -> int:
+    if args.rate is not None:
+        config.sampling_rate = args.rate
+    rig = config.get_rig(args.rig)
+    cal = load_calibration(args.calibration)
+    cjc_data = read_cjc_data(rig=args.rig)
+    log.info(f"CJC: {cjc_data.temperature:.1f} °C, {cjc_data.e_cold:.3f} mV")
+
+    hardware: Optional[Hardware] = None
+    sampler: AbstractSampler
+    if config.is_test_mode:
+        sampler = TestSampler()
+    else:
+        hardware = get_hardware(auto_find=True, rig=args.rig)
+        sampler = RealSampler(hardware=hardware)
+    sampler.set_temperature(cal=cal, cjc_data=cjc_data, rig=args.rig)
+    sampler.prepare()
+    thread = threading.Thread(target=sampler.run, name="sampler")
+    thread.start()
+    # С furnace.virtual_time модель идет быстрее часов: длительность
+    # отсчитывается по времени точек, лишние точки отбрасываются
+    virtual_time = isinstance(sampler, TestSampler) and sampler.virtual_time
+
+    parts: list[np.ndarray] = []
+    channel_parts: list[list[np.ndarray]] = [[] for _ in sampler.channel_rings]
+    cjc_parts: list[np.ndarray] = []
+    seq = sampler.ring.seq
+    channel_seqs = [ring.seq for ring in sampler.channel_rings]
+    cjc_seq = sampler.cjc_ring.seq
+
+    def collect_all():
+        nonlocal seq, cjc_seq
+        seq = collect(sampler.ring, seq, parts)
+        cjc_seq = collect(sampler.cjc_ring, cjc_seq, cjc_parts)
+        for channel, ring in enumerate(sampler.channel_rings):
+            channel_seqs[channel] = collect(
+                ring, channel_seqs[channel], channel_parts[channel]
+            )
+
+    sampler.set_enabled(True)
+    sampler.heater.set_speed(args.speed)
+    sampler.heater.set_enabled(True)
+    start = last_report = time.monotonic()
+    try:
+        while True:
+            time.sleep(POLL_INTERVAL)
+            collect_all()
+            now = time.monotonic()
+            temperature = float(parts[-1][4, -1]) if parts else math.nan
+            elapsed = now - start
+            if virtual_time:
+                elapsed = float(parts[-1][0, -1] - parts[0][0, 0]) if parts else 0.0
+            if now - last_report >= REPORT_INTERVAL:
+                last_report = now
+                log.info(
+                    f"{elapsed:.0f} s: {temperature:.1f} °C, "
+                    f"output {sampler.heater.output:.3f}"
+                )
+            if args.duration is not None and elapsed >= args.duration:
+                break
+            if args.until is not None and temperature >= args.until:
+                break
+    except KeyboardInterrupt:
+        log.warning("Recording interrupted")
+    finally:
+        sampler.set_enabled(False)
+        sampler.set_output(0.0)
+        sampler.heater.set_enabled(False)
+        sampler.heater.reset()
+        sampler.stop()
+        thread.join()
+        if hardware is not None:
+            hardware.release()
+    collect_all()
+
+    if not parts:
+        log.error("No data recorded")
+        return 1
+    data = np.concatenate(parts, axis=1)
+    start_time = data[0, 0]
+    if virtual_time:
+        data = data[:, : stop_index(data, start_time, args.duration, args.until)]
+    channels: list[Optional[DataPack]] = []
+    for channel, (input_channel, chunks) in enumerate(
+        zip(rig.extra_inputs, channel_parts)
+    ):
+        if not chunks:
+            channels.append(None)
+            continue
+        channel_data = np.concatenate(chunks, axis=1)
+        channels.append(
+            DataPack(
+                x_label="time, s",
+                y_label=channel_label(channel=channel, address=input_channel.address),
+                x=(channel_data[0] - start_time).tolist(),
+                y=channel_data[1].tolist(),
+            )
+        )
+    compensator = ColdJunctionCompensator.from_cjc_data(
+        calibration=cal, cjc_data=cjc_data, rig=args.rig
+    )
+    for readings in cjc_parts:
+        t, *values = readings
+        compensator.add_readings(np.vstack((t - start_time, *values)))
+    write_vtaz(
+        path=args.path,
+        metadata=Metadata(
+            sample=args.sample,
+            operator=args.operator,
+            rig=args.rig,
+            sampling_rate=config.sampling_rate,
+            extra_inputs=[channel.address for channel in rig.extra_inputs],
+        ),
+        cal=cal,
+        emf=DataPack(
+            x_label="time, s",
+            y_label="EMF, mV",
+            x=(data[0] - start_time).tolist(),
+            y=data[1].tolist(),
+        ),
+        channels=channels,
+        cjc_data=compensator.export_cjc_data(),
+    )
+    log.info(f"{data.shape[1]} points saved to {args.path}")
+    return 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    return record(parse_args(argv))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
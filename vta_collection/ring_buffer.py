@@ -0,0 +1,133 @@
+"""Кольцевой буфер точек опроса между потоком опроса и GUI.
+
+Поток опроса - единственный писатель: строка записывается в предвыделенный
+массив, после чего увеличивается счетчик seq (номер следующей строки).
+Читатели помнят номер последней прочитанной строки и получают новые строки
+как представления (view) массива без копирования. Писатель не ждет
+читателей: строки, которые читатель не успел забрать за capacity записей,
+перезаписываются, и читатель узнает об этом по seq.
+"""
+
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Счетчик seq (int64) перед массивом в разделяемой памяти
+HEADER_SIZE = 8
+
+
+class RingView(NamedTuple):
+    start: int  # номер первой строки
+    stop: int  # номер строки после последней
+    columns: np.ndarray  # shape (число столбцов, stop - start)
+    lost: int  # строки, перезаписанные до чтения
+
+
+class RingBuffer:
+    """Кольцевой буфер по столбцам.
+
+    С shm массив и счетчик seq размещаются в разделяемой памяти, и буфер
+    можно читать из другого процесса (см. create_shared, attach).
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        capacity: int,
+        shm: Optional[shared_memory.SharedMemory] = None,
+    ):
+        self.columns = tuple(columns)
+        self.capacity = capacity
+        self.shm = shm
+        shape = (len(self.columns), capacity)
+        if shm is None:
+            self.header = np.zeros(1, dtype=np.int64)
+            self.data = np.full(shape, np.nan)
+        else:
+            self.header = np.ndarray((1,), dtype=np.int64, buffer=shm.buf)
+            self.data = np.ndarray(
+                shape, dtype=np.float64, buffer=shm.buf, offset=HEADER_SIZE
+            )
+
+    @staticmethod
+    def shared_size(columns: Sequence[str], capacity: int) -> int:
+        return HEADER_SIZE + len(columns) * capacity * np.dtype(np.float64).itemsize
+
+    @classmethod
+    def create_shared(cls, columns: Sequence[str], capacity: int) -> "RingBuffer":
+        shm = shared_memory.SharedMemory(
+            create=True, size=cls.shared_size(columns, capacity)
+        )
+        ring = cls(columns=columns, capacity=capacity, shm=shm)
+        ring.header[0] = 0
+        ring.data.fill(np.nan)
+        return ring
+
+    @classmethod
+    def attach(cls, name: str, columns: Sequence[str], capacity: int) -> "RingBuffer":
+        """Подключиться к буферу, созданному create_shared в другом процессе"""
+        return cls(
+            columns=columns,
+            capacity=capacity,
+            shm=shared_memory.SharedMemory(name=name),
+        )
+
+    @property
+    def name(self) -> str:
+        """Имя разделяемой памяти для attach"""
+        if self.shm is None:
+            raise ValueError("Ring buffer is not shared")
+        return self.shm.name
+
+    def close(self):
+        if self.shm is not None:
+            # Представления должны быть освобождены до закрытия памяти
+            del self.header, self.data
+            self.shm.close()
+            self.shm = None
+
+    def unlink(self):
+        """Удалить разделяемую память (вызывает создатель буфера)"""
+        shm = self.shm
+        self.close()
+        if shm is not None:
+            shm.unlink()
+
+    @property
+    def seq(self) -> int:
+        """Номер следующей строки, растет монотонно"""
+        return int(self.header[0])
+
+    def append(self, *values: float):
+        seq = int(self.header[0])
+        self.data[:, seq % self.capacity] = values
+        # Строка становится видна читателям только после записи
+        self.header[0] = seq + 1
+
+    def read(self, since: int) -> RingView:
+        """Строки, записанные начиная с номера since.
+
+        Непрерывный участок возвращается как view, при переходе через конец
+        массива - копией. View действителен, пока писатель не сделает еще
+        capacity - (stop - start) записей (см. overwritten).
+        """
+        stop = self.seq
+        start = max(since, stop - self.capacity)
+        first, last = start % self.capacity, stop % self.capacity
+        if stop - start == 0:
+            columns = self.data[:, :0]
+        elif first < last or last == 0:
+            columns = self.data[:, first : first + stop - start]
+        else:
+            columns = np.concatenate(
+                (self.data[:, first:], self.data[:, :last]), axis=1
+            )
+        return RingView(start=start, stop=stop, columns=columns, lost=start - since)
+
+    def overwritten(self, view: RingView) -> bool:
+        """Писатель успел перезаписать часть строк view"""
+        return self.seq - self.capacity > view.start
+
+    def column(self, view: RingView, name: str) -> np.ndarray:
+        return view.columns[self.columns.index(name)]
@@ -1,35 +1,201 @@
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Callable, Optional
+
 import serial
 import serial.tools.list_ports
 from loguru import logger as log
 
+if TYPE_CHECKING:
+    from vta_collection.adam_simulator import SimulatedSerial
+
+# Таймаут одного чтения в потоке приема: определяет только скорость реакции
+# на остановку, ответы передаются ожидающим сразу по приходу
+READ_POLL_INTERVAL = 0.05
+
 
 def get_serial_ports():
     return [port.device for port in serial.tools.list_ports.comports()]
 
 
+def char_time(ser: serial.SerialBase) -> float:
+    """Время передачи одного символа с учетом старт-, стоп- и бита четности, с"""
+    parity_bits = 0 if ser.parity == serial.PARITY_NONE else 1
+    bits = 1 + ser.bytesize + parity_bits + ser.stopbits
+    return bits / ser.baudrate
+
+
+class FrameBuffer:
+    """Буфер приема фиксированного размера с выделением кадров по endchar.
+
+    Байты копируются в заранее выделенный bytearray, поиск конца кадра
+    продолжается с места, где остановился на предыдущем фрагменте. Когда
+    место в конце заканчивается, непрочитанный хвост сдвигается в начало.
+    """
+
+    def __init__(self, endchar: bytes, capacity: int = 4096):
+        self.endchar = endchar
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._start = 0  # начало незавершенного кадра
+        self._end = 0  # конец принятых данных
+        self._scan = 0  # позиция, с которой продолжается поиск endchar
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def feed(self, data: bytes) -> list[bytes]:
+        """Добавить принятые байты, вернуть завершенные кадры (вместе с endchar)"""
+        size = len(data)
+        capacity = len(self._buf)
+        if self._end + size > capacity:
+            self._compact()
+        if self._end + size > capacity:
+            log.warning(f"Receive buffer overflow, {len(self)} bytes dropped")
+            self.clear()
+            data = data[-capacity:]
+            size = len(data)
+        self._view[self._end : self._end + size] = data
+        self._end += size
+
+        frames = []
+        while (pos := self._buf.find(self.endchar, self._scan, self._end)) >= 0:
+            frame_end = pos + len(self.endchar)
+            frames.append(bytes(self._view[self._start : frame_end]))
+            self._start = self._scan = frame_end
+        self._scan = max(self._start, self._end - len(self.endchar) + 1)
+        if self._start == self._end:
+            self.clear()
+        return frames
+
+    def clear(self):
+        self._start = self._end = self._scan = 0
+
+    def _compact(self):
+        size = len(self)
+        self._buf[:size] = self._buf[self._start : self._end]
+        self._scan -= self._start
+        self._start, self._end = 0, size
+
+
+class FrameReader(threading.Thread):
+    """Поток приема: читает порт по мере поступления байт и раздает кадры ожидающим"""
+
+    def __init__(self, ser: "serial.Serial | SimulatedSerial", endchar: bytes):
+        super().__init__(name=f"FrameReader({ser.port})", daemon=True)
+        self.ser = ser
+        self.buffer = FrameBuffer(endchar=endchar)
+        self.frames: deque[bytes] = deque()
+        # Число принятых байт, в том числе незавершенных кадров
+        self.received = 0
+        # Получатель кадров вместо очереди frames (используется AsyncBus)
+        self.listener: Optional[Callable[[bytes], None]] = None
+        self._cond = threading.Condition()
+        self._running = True
+
+    def run(self):
+        while self._running:
+            try:
+                # read() ждет первый байт внутри драйвера порта
+                # (select на POSIX, overlapped I/O на Windows)
+                data = self.ser.read(max(1, self.ser.in_waiting))
+            except (serial.SerialException, OSError, TypeError) as e:
+                if self._running:
+                    log.error(f"Serial reader on {self.ser.port} stopped: {e}")
+                break
+            if not data:
+                continue
+            with self._cond:
+                frames = self.buffer.feed(data)
+                self.received += len(data)
+                listener = self.listener
+                if listener is None:
+                    self.frames.extend(frames)
+                    self._cond.notify_all()
+            if listener is not None:
+                for frame in frames:
+                    listener(frame)
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+
+    def read_frame(
+        self, timeout: Optional[float], silence: Optional[float] = None
+    ) -> bytes:
+        """Получить следующий кадр, b"" - если он не пришел за timeout.
+
+        silence - время, за которое должен прийти первый байт ответа: если
+        за него не принято ни одного байта, ожидание прекращается раньше.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if silence is not None and (timeout is None or silence < timeout):
+                received = self.received
+                self._cond.wait_for(
+                    lambda: (
+                        self.frames or self.received != received or not self._running
+                    ),
+                    silence,
+                )
+                if not self.frames and self.received == received:
+                    return b""
+                if deadline is not None:
+                    timeout = max(0.0, deadline - time.monotonic())
+            self._cond.wait_for(lambda: self.frames or not self._running, timeout)
+            if self.frames:
+                return self.frames.popleft()
+            return b""
+
+    def discard_frames(self) -> list[bytes]:
+        """Убрать принятые, но никем не запрошенные кадры (опоздавшие ответы)"""
+        with self._cond:
+            frames = list(self.frames)
+            self.frames.clear()
+        return frames
+
+    def stop(self):
+        self._running = False
+        cancel_read = getattr(self.ser, "cancel_read", None)
+        if cancel_read is not None:
+            cancel_read()
+        self.join()
+
+
 class SerialWorker:
     endchar = b"\n"
 
     def __init__(self, baudrate, bytesize, parity, stopbits, timeout, dsrdtr, rtscts):
         # super().__init__()
-        self.ser = serial.Serial(
+        self.timeout: Optional[float] = timeout
+        self.ser: serial.Serial | SimulatedSerial = serial.Serial(
             baudrate=baudrate,
-            timeout=timeout,
+            timeout=READ_POLL_INTERVAL,
             bytesize=bytesize,
             parity=parity,
             stopbits=stopbits,
             dsrdtr=dsrdtr,
             rtscts=rtscts,
         )
+        self.reader: Optional[FrameReader] = None
         self._is_running = False
 
     def open_serial(self, port: str):
         if not self.ser.is_open:
             log.info(f"Opening serial on {port} port...")
+            from vta_collection.adam_simulator import SimulatedSerial, is_simulated_port
+
+            if is_simulated_port(port):
+                self.ser = SimulatedSerial(**self.ser.get_settings())
             self.ser.port = port
             self.ser.open()
+            self.reader = FrameReader(ser=self.ser, endchar=self.endchar)
+            self.reader.start()
 
     def close_serial(self):
+        if self.reader is not None:
+            self.reader.stop()
+            self.reader = None
         if self.ser.is_open:
             self.ser.close()
             log.info(f"Serial on {self.ser.port} port closed")
@@ -37,17 +203,21 @@ class SerialWorker:
     def read_serial_str(self):
         return self.read_serial().decode().strip()
 
-    def read_serial(self):
-        # while True:
-        #     in_waiting = self.ser.in_waiting
-        #     if in_waiting > 0:
-        #         data = self.ser.read(in_waiting)
-        #         return data
-        #     else:
-        #         break
-        # return self.ser.readline()
-        return self.ser.read_until(expected=self.endchar)
+    def read_serial(
+        self, timeout: Optional[float] = None, silence: Optional[float] = None
+    ) -> bytes:
+        if self.reader is None:
+            raise serial.PortNotOpenError()
+        if timeout is None:
+            timeout = self.timeout
+        return self.reader.read_frame(timeout=timeout, silence=silence)
+
+    def discard_stale(self):
+        if self.reader is None:
+            return
+        for frame in self.reader.discard_frames():
+            log.debug(f"Late answer discarded: {frame!r}")
 
     def write_serial(self, cmd: bytes):
-        self.ser.reset_input_buffer()
+        self.discard_stale()
         self.ser.write(cmd + self.endchar)
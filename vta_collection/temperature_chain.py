@@ -1,6 +1,9 @@
+import numpy as np
+
 from vta_collection.calibration import Calibration
 from vta_collection.cold_junction_compensator import ColdJunctionCompensator
-from vta_collection.thermocouple import get_thermocouple
+from vta_collection.math_utils import horner_function, taylor_shift
+from vta_collection.thermocouple import Thermocouple, get_thermocouple
 
 
 class TemperatureChain:
@@ -9,16 +12,68 @@ class TemperatureChain:
     def __init__(self, cal: Calibration, compensator: ColdJunctionCompensator):
         # Получаем глобальный экземпляр термопары
         thermocouple = get_thermocouple()
-        # Определяем функцию расчета один раз при инициализации
-        self._calculate = lambda x: cal.get_value(thermocouple.emf_to_temperature(
-            compensator.compensate(x))
+        # Вся цепочка для одной точки собирается один раз при
+        # инициализации; калибровка и CJC меняются только с новой цепочкой
+        self._evaluate = self.fuse(
+            thermocouple=thermocouple, cal=cal, e_cold=compensator.cjc_data.e_cold
+        )
+        # Та же цепочка для массивов: каждое звено - одна операция над массивом
+        self._calculate_values = lambda x: cal.get_values(
+            thermocouple.emf_to_temperatures(compensator.compensate_values(x))
         )
 
+    @staticmethod
+    def fuse(thermocouple: Thermocouple, cal: Calibration, e_cold: float):
+        """Функция ЭДС -> температура из двух схем Горнера на float.
+
+        Поправка холодного спая внесена в полином термопары сдвигом Тейлора
+        T(x + e_cold), поправка калибровки T + d(T) - во внешний полином от T.
+        Подстановка внешнего полинома во внутренний (степень до 16) не
+        выполняется: ее коэффициенты хуже обусловлены. С таблицами
+        аппроксимации термопары (config.thermocouple_approximation) внутреннее
+        звено - emf_to_temperature, как и для массивов в get_values.
+        """
+        correction = cal.correction_coefficients()
+        outer = horner_function([correction[0], 1.0 + correction[1], *correction[2:]])
+        if thermocouple.approximation is not None:
+            emf_to_temperature = thermocouple.emf_to_temperature
+            return lambda x: outer(emf_to_temperature(x + e_cold))
+        inner = horner_function(taylor_shift(thermocouple.coefficients, e_cold))
+        return lambda x: outer(inner(x))
+
     def get_value(self, emf: float) -> float:
         """Получить значение (температуру в °C или ЭДС в mV)"""
         try:
-            return self._calculate(emf)
+            return self._evaluate(emf)
         except Exception as e:
             raise ValueError(
                 f"Ошибка при вычислении температуры для ЭДС {emf} мВ: {str(e)}"
             )
+
+    def get_values(self, emf: np.ndarray) -> np.ndarray:
+        """Получить температуры в °C для массива ЭДС в mV"""
+        try:
+            return self._calculate_values(np.asarray(emf, dtype=np.float64))
+        except Exception as e:
+            raise ValueError(
+                f"Ошибка при вычислении температуры для {np.size(emf)} значений ЭДС: {str(e)}"
+            )
+
+
+if __name__ == "__main__":
+    import timeit
+    from functools import partial
+
+    from vta_collection.cold_junction_compensator import CjcData
+
+    cal = Calibration(calibration_type="quadratic", coefficients=[1e-5, 0.01, -2.0])
+    compensator = ColdJunctionCompensator.from_cjc_data(
+        calibration=cal, cjc_data=CjcData(temperature=25.0, e_cold=0.308)
+    )
+    chain = TemperatureChain(cal=cal, compensator=compensator)
+    emf = np.linspace(-0.5, 30.0, 10_000)
+    n = 100_000
+    per_point = timeit.timeit(partial(chain.get_value, 12.345), number=n) / n
+    print(f"fused: {per_point * 1e6:.2f} us/point")
+    vector = timeit.timeit(partial(chain.get_values, emf), number=10) / 10
+    print(f"vector: {vector / emf.size * 1e6:.3f} us/point")
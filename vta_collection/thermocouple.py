@@ -1,15 +1,35 @@
+import math
 from typing import Optional
 
 import numpy as np
+from loguru import logger as log
 
 from vta_collection.config import config
-from vta_collection.math_utils import bisection_method
+from vta_collection.math_utils import (
+    horner_function,
+    monotonic_range,
+    safeguarded_newton,
+    safeguarded_newton_array,
+)
+from vta_collection.thermocouple_approximation import (
+    ThermocoupleApproximation,
+    get_approximation,
+)
+
+# Диапазон ЭДС термопары A-1 (до 2500 °C с запасом), мВ: вне его полином не
+# применяется (обращение и таблицы аппроксимации)
+EMF_RANGE: tuple[float, float] = (-1.0, 40.0)
 
 
 class Thermocouple:
     """Термопара для преобразования ЭДС в температуру по полиномиальной формуле"""
 
-    def __init__(self, coefficients: list[float]):
+    def __init__(
+        self,
+        coefficients: list[float],
+        approximation: Optional[ThermocoupleApproximation] = None,
+        emf_range: tuple[float, float] = EMF_RANGE,
+    ):
         """
         Инициализация термопары с коэффициентами полинома.
 
@@ -17,9 +37,20 @@ class Thermocouple:
             coefficients: Список коэффициентов [c0, c1, c2, ..., c8]
                          для формулы T(E) = c0 + c1*E + c2*E² + ... + c8*E⁸
                          Коэффициенты упорядочены от c0 (константа) до c8 (старшая степень)
+            approximation: Таблицы Чебышева для тех же коэффициентов; вне их
+                         диапазона используется точный полином
+            emf_range: Диапазон ЭДС, на котором задан полином, мВ
         """
         self.coefficients = coefficients
         self.poly_coeffs = self.coefficients[::-1]
+        self.derivative_coeffs = np.polyder(self.poly_coeffs)
+        # Полином и производная на float для обращения в одной точке
+        self._polynomial = horner_function(self.coefficients)
+        self._derivative = horner_function(self.derivative_coeffs[::-1].tolist())
+        # Вилка обращения: участок монотонности полинома около 0 мВ в
+        # пределах его диапазона
+        self.emf_range = monotonic_range(self.poly_coeffs, *emf_range)
+        self.approximation = approximation
 
     def emf_to_temperature(self, emf: float) -> float:
         """
@@ -32,43 +63,83 @@ class Thermocouple:
         Returns:
             Температура в °C
         """
+        if self.approximation is not None:
+            value = self.approximation.temperature.value(emf)
+            if not math.isnan(value):
+                return value
         # numpy.polyval ожидает коэффициенты от старшей степени к константе
         # Поэтому переворачиваем список коэффициентов
 
         return float(np.polyval(self.poly_coeffs, emf))
 
-    def temperature_to_emf(self, target_temp: float) -> float:
+    def emf_to_temperatures(self, emf: np.ndarray) -> np.ndarray:
+        """Преобразование массива ЭДС (мВ) в температуры (°C) за один вызов"""
+        if self.approximation is not None:
+            values = self.approximation.temperature(emf)
+            return np.where(np.isnan(values), np.polyval(self.poly_coeffs, emf), values)
+        return np.polyval(self.poly_coeffs, emf)
+
+    def temperature_to_emf(
+        self,
+        target_temp: float,
+        left: Optional[float] = None,
+        right: Optional[float] = None,
+    ) -> float:
         """
-        Вычисление ЭДС по температуре методом бисекции.
+        Вычисление ЭДС по температуре методом Ньютона с защитой бисекцией
+        (по аналитической производной полинома).
 
         Args:
             target_temp: Целевая температура в °C
+            left, right: Диапазон поиска ЭДС в мВ (по умолчанию - участок
+                         монотонности полинома в диапазоне ЭДС, emf_range)
 
         Returns:
             ЭДС в мВ
 
         Raises:
-            ValueError: Если метод не сошелся за максимальное число итераций
+            ValueError: Если температура вне диапазона полинома на [left, right]
         """
-        # Диапазон поиска для термопары A-1
-        left = -1.0  # -1 мВ
-        right = 5.0  # 5 мВ
-
-        # Точность вычисления
-        tolerance = 1e-4
-
-        # Используем универсальную функцию бисекции
-        def temp_func(emf: float) -> float:
-            return self.emf_to_temperature(emf)
-
-        return bisection_method(
-            func=temp_func,
+        if self.approximation is not None:
+            value = self.approximation.emf.value(target_temp)
+            if not math.isnan(value):
+                return value
+
+        return safeguarded_newton(
+            func=self._polynomial,
+            derivative=self._derivative,
             target_value=target_temp,
-            left=left,
-            right=right,
-            tolerance=tolerance,
-            max_iterations=100,
+            left=self.emf_range[0] if left is None else left,
+            right=self.emf_range[1] if right is None else right,
+            initial=self.initial_emf(target_temp),
+        )
+
+    def temperatures_to_emf(self, temperatures: np.ndarray) -> np.ndarray:
+        """ЭДС (мВ) для массива температур (°C); вне диапазона полинома - NaN"""
+        if self.approximation is not None:
+            values = self.approximation.emf(temperatures)
+            if not np.isnan(values).any():
+                return values
+        values = safeguarded_newton_array(
+            func=lambda emf: np.polyval(self.poly_coeffs, emf),
+            derivative=lambda emf: np.polyval(self.derivative_coeffs, emf),
+            target_values=temperatures,
+            left=self.emf_range[0],
+            right=self.emf_range[1],
+            initial=self.initial_emf(np.asarray(temperatures, dtype=np.float64)),
         )
+        outside = int(np.isnan(values).sum())
+        if outside:
+            left, right = self.emf_range
+            log.warning(
+                f"{outside} temperatures outside the thermocouple range "
+                f"({left:.3f}..{right:.3f} mV), EMF set to NaN"
+            )
+        return values
+
+    def initial_emf(self, temperature):
+        """Начальное приближение ЭДС по линейной части полинома"""
+        return (temperature - self.coefficients[0]) / self.coefficients[1]
 
 
 _thermocouple: Optional[Thermocouple] = None
@@ -78,5 +149,39 @@ def get_thermocouple() -> Thermocouple:
     """Получить экземпляр Thermocouple (singleton)"""
     global _thermocouple
     if _thermocouple is None:
-        _thermocouple = Thermocouple(config.thermocouple_coefficients)
+        thermocouple = Thermocouple(config.thermocouple_coefficients)
+        if config.thermocouple_approximation:
+            # Таблицы строятся там же, где задано обращение: на участке
+            # монотонности полинома, а не на всем EMF_RANGE
+            thermocouple.approximation = get_approximation(
+                coefficients=thermocouple.coefficients,
+                emf_range=thermocouple.emf_range,
+            )
+        _thermocouple = thermocouple
     return _thermocouple
+
+
+if __name__ == "__main__":
+    import timeit
+
+    from vta_collection.math_utils import bisection_method
+
+    thermocouple = Thermocouple(config.thermocouple_coefficients)
+    left, right = thermocouple.emf_range
+    print(f"emf range {left:.1f}..{right:.1f} mV")
+    temperatures = np.linspace(-50.0, 2500.0, 10_000)
+    n = 1000
+    bisection = timeit.timeit(
+        lambda: bisection_method(
+            thermocouple.emf_to_temperature, 25.0, left=-1.0, right=5.0
+        ),
+        number=n,
+    )
+    newton = timeit.timeit(lambda: thermocouple.temperature_to_emf(25.0), number=n)
+    vector = timeit.timeit(
+        lambda: thermocouple.temperatures_to_emf(temperatures), number=1
+    )
+    print(
+        f"bisection {bisection / n * 1e6:.1f} us, newton {newton / n * 1e6:.1f} us, "
+        f"vector {vector / temperatures.size * 1e6:.2f} us/point"
+    )
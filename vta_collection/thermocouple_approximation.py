@@ -0,0 +1,227 @@
+"""Кусочно-чебышевская аппроксимация термопары в обе стороны.
+
+Диапазон ЭДС (и соответствующий ему диапазон температур) делится на
+равные отрезки, на каждом функция интерполируется полиномом Чебышева по
+его узлам. Отрезок находится делением, поэтому вычисление занимает O(1) и
+выполняется над массивами. Обратная функция E(T) строится по точным
+решениям T(E) = T в узлах (safeguarded_newton_array).
+
+Таблицы строятся один раз для набора коэффициентов и сохраняются в
+get_appdata_path()/cache, имя файла содержит хеш коэффициентов и
+диапазона ЭДС.
+"""
+
+import hashlib
+import json
+import math
+import zipfile
+from pathlib import Path
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+from loguru import logger as log
+from numpy.polynomial import chebyshev
+
+from vta_collection.math_utils import safeguarded_newton_array
+from vta_collection.path_utils import get_appdata_path
+
+CACHE_DIR = get_appdata_path() / "cache"
+# Версия формата таблиц: меняется вместе с алгоритмом построения
+APPROXIMATION_VERSION = 2
+SEGMENTS = 64
+DEGREE = 8
+# Точек проверки ошибки на отрезок
+CHECK_POINTS = 32
+
+
+class ChebyshevTable:
+    """Кусочная аппроксимация на [start, start + width·segments]"""
+
+    def __init__(self, start: float, width: float, coefficients: np.ndarray):
+        self.start = start
+        self.width = width
+        self.coefficients = coefficients  # shape (segments, degree + 1)
+        # Те же коэффициенты списками для вычисления в одной точке без numpy
+        self.rows: list[list[float]] = coefficients.tolist()
+
+    @classmethod
+    def fit(
+        cls, function, start: float, stop: float, segments: int, degree: int
+    ) -> "ChebyshevTable":
+        """Интерполяция function (над массивами) в узлах Чебышева"""
+        width = (stop - start) / segments
+        nodes = chebyshev.chebpts1(degree + 1)
+        left = start + width * np.arange(segments)
+        x = left[:, None] + (nodes[None, :] + 1) * width / 2
+        y = function(x.ravel()).reshape(x.shape)
+        coefficients = np.array(
+            [chebyshev.chebfit(nodes, values, degree) for values in y]
+        )
+        return cls(start=start, width=width, coefficients=coefficients)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        """Значения в точках x (NaN вне диапазона), схема Кленшоу"""
+        x = np.asarray(x, dtype=np.float64)
+        position = (x - self.start) / self.width
+        segments = len(self.coefficients)
+        inside = (position >= 0) & (position <= segments)
+        index = np.clip(np.floor(np.where(inside, position, 0)), 0, segments - 1)
+        index = index.astype(np.intp)
+        u = 2 * (position - index) - 1
+        c = self.coefficients[index]
+        b1 = np.zeros_like(u)
+        b2 = np.zeros_like(u)
+        for j in range(self.coefficients.shape[1] - 1, 0, -1):
+            b1, b2 = 2 * u * b1 - b2 + c[..., j], b1
+        return np.where(inside, u * b1 - b2 + c[..., 0], np.nan)
+
+    def value(self, x: float) -> float:
+        """Значение в одной точке (NaN вне диапазона)"""
+        position = (x - self.start) / self.width
+        if not 0 <= position <= len(self.rows):
+            return math.nan
+        index = min(int(position), len(self.rows) - 1)
+        u = 2 * (position - index) - 1
+        row = self.rows[index]
+        b1 = b2 = 0.0
+        for c in row[:0:-1]:
+            b1, b2 = 2 * u * b1 - b2 + c, b1
+        return u * b1 - b2 + row[0]
+
+
+class ThermocoupleApproximation(NamedTuple):
+    temperature: ChebyshevTable  # ЭДС, мВ -> температура, °C
+    emf: ChebyshevTable  # температура, °C -> ЭДС, мВ
+    # Наибольшие отклонения от точного полинома на контрольной сетке
+    temperature_error: float  # °C
+    emf_error: float  # мВ
+
+    def save(self, path: Path):
+        np.savez(
+            path,
+            temperature=self.temperature.coefficients,
+            emf=self.emf.coefficients,
+            ranges=[
+                self.temperature.start,
+                self.temperature.width,
+                self.emf.start,
+                self.emf.width,
+            ],
+            errors=[self.temperature_error, self.emf_error],
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "ThermocoupleApproximation":
+        with np.load(path) as data:
+            t_start, t_width, e_start, e_width = data["ranges"]
+            temperature_error, emf_error = data["errors"]
+            return cls(
+                temperature=ChebyshevTable(
+                    start=float(t_start),
+                    width=float(t_width),
+                    coefficients=data["temperature"],
+                ),
+                emf=ChebyshevTable(
+                    start=float(e_start), width=float(e_width), coefficients=data["emf"]
+                ),
+                temperature_error=float(temperature_error),
+                emf_error=float(emf_error),
+            )
+
+
+def build_approximation(
+    coefficients: Sequence[float],
+    emf_range: tuple[float, float],
+    segments: int = SEGMENTS,
+    degree: int = DEGREE,
+) -> ThermocoupleApproximation:
+    poly_coeffs = list(coefficients)[::-1]
+    derivative_coeffs = np.polyder(poly_coeffs)
+    left, right = emf_range
+
+    def temperature(emf: np.ndarray) -> np.ndarray:
+        return np.polyval(poly_coeffs, emf)
+
+    def emf(t: np.ndarray) -> np.ndarray:
+        return safeguarded_newton_array(
+            func=temperature,
+            derivative=lambda e: np.polyval(derivative_coeffs, e),
+            target_values=t,
+            left=left,
+            right=right,
+        )
+
+    t_left, t_right = temperature(np.array([left, right]))
+    forward = ChebyshevTable.fit(temperature, left, right, segments, degree)
+    inverse = ChebyshevTable.fit(emf, t_left, t_right, segments, degree)
+
+    # Контрольная сетка между узлами интерполяции
+    e_check = np.linspace(left, right, segments * CHECK_POINTS + 1)
+    t_check = np.linspace(t_left, t_right, segments * CHECK_POINTS + 1)
+    return ThermocoupleApproximation(
+        temperature=forward,
+        emf=inverse,
+        temperature_error=float(np.abs(forward(e_check) - temperature(e_check)).max()),
+        emf_error=float(np.abs(inverse(t_check) - emf(t_check)).max()),
+    )
+
+
+def cache_path(
+    coefficients: Sequence[float],
+    emf_range: tuple[float, float],
+    segments: int = SEGMENTS,
+    degree: int = DEGREE,
+) -> Path:
+    key = json.dumps(
+        {
+            "version": APPROXIMATION_VERSION,
+            "coefficients": [float(c) for c in coefficients],
+            "emf_range": list(emf_range),
+            "segments": segments,
+            "degree": degree,
+        }
+    )
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / f"thermocouple-{digest}.npz"
+
+
+def get_approximation(
+    coefficients: Sequence[float], emf_range: tuple[float, float]
+) -> ThermocoupleApproximation:
+    """Аппроксимация из кеша на диске, при отсутствии - построить и сохранить"""
+    path = cache_path(coefficients, emf_range)
+    approximation: Optional[ThermocoupleApproximation] = None
+    if path.exists():
+        try:
+            approximation = ThermocoupleApproximation.load(path)
+            log.debug(f"Thermocouple approximation loaded from {path}")
+        except (OSError, EOFError, ValueError, KeyError, zipfile.BadZipFile) as e:
+            # Поврежденный или неполный файл кеша строится заново
+            log.warning(f"Failed to load thermocouple approximation {path}: {e}")
+    if approximation is None:
+        approximation = build_approximation(coefficients, emf_range)
+        try:
+            CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            approximation.save(path)
+        except OSError as e:
+            log.warning(f"Failed to cache thermocouple approximation: {e}")
+    log.info(
+        "Thermocouple approximation: max error "
+        f"{approximation.temperature_error:.1e} °C (E -> T), "
+        f"{approximation.emf_error:.1e} mV (T -> E)"
+    )
+    return approximation
+
+
+if __name__ == "__main__":
+    import time
+
+    from vta_collection.config import config
+    from vta_collection.thermocouple import EMF_RANGE
+
+    start = time.perf_counter()
+    built = build_approximation(config.thermocouple_coefficients, EMF_RANGE)
+    print(f"built in {(time.perf_counter() - start) * 1e3:.0f} ms")
+    print(f"max error {built.temperature_error:.1e} °C, {built.emf_error:.1e} mV")
+    t = np.linspace(0, 2000, 5)
+    print(dict(zip(t.tolist(), built.emf(t).round(4).tolist())))
@@ -0,0 +1,138 @@
+"""Формат файла измерения .vtaz (zip) без зависимости от Qt"""
+
+import csv
+import json
+from datetime import datetime
+from io import TextIOWrapper
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+from zipfile import ZIP_DEFLATED, ZipFile
+
+from loguru import logger as log
+from pydantic import BaseModel, Field
+
+from vta_collection.calibration import Calibration
+from vta_collection.config import config
+
+
+class DataPack(NamedTuple):
+    x_label: str
+    y_label: str
+    x: List
+    y: List
+
+    def to_csv(self, f: TextIOWrapper):
+        writer = csv.writer(f, lineterminator=";\n")
+        writer.writerow((self.x_label, self.y_label))
+        writer.writerows(zip(self.x, self.y))
+
+    @classmethod
+    def from_csv(cls, f: TextIOWrapper) -> "DataPack":
+        rows = csv.reader(line.rstrip().removesuffix(";") for line in f)
+        x_label, y_label = next(rows)
+        x, y = [], []
+        for row in rows:
+            if row:
+                x.append(float(row[0]))
+                y.append(float(row[1]))
+        return cls(x_label=x_label, y_label=y_label, x=x, y=y)
+
+
+class Metadata(BaseModel):
+    sample: str
+    operator: str
+    vtaz_version: str = "1.1"  # Версия формата .vtaz файла
+    created_at: datetime = Field(default_factory=datetime.now)
+    rig: str = ""  # печь, пустое имя - основная
+    # Заданная частота опроса, Гц (0 - с максимальной скоростью шины)
+    sampling_rate: float = Field(default_factory=lambda: config.sampling_rate)
+    # Адреса дополнительных 4011, данные в data_input_ch<N>.csv
+    extra_inputs: list[int] = Field(
+        default_factory=lambda: [ch.address for ch in config.extra_inputs]
+    )
+
+
+class VtazData(NamedTuple):
+    metadata: Metadata
+    cal: Calibration
+    emf: DataPack
+    channels: list[Optional[DataPack]]  # None - файла входа нет в архиве
+    cjc_data: dict
+
+
+def channel_file_name(channel: int) -> str:
+    return f"data_input_ch{channel + 1}.csv"
+
+
+def channel_label(channel: int, address: int) -> str:
+    return f"EMF ch{channel + 1} (#{address:02d}), mV"
+
+
+def write_vtaz(
+    path: Path,
+    metadata: Metadata,
+    cal: Calibration,
+    emf: DataPack,
+    channels: Sequence[Optional[DataPack]],
+    cjc_data: dict,
+):
+    """Записать измерение: channels - данные дополнительных входов по порядку"""
+    with ZipFile(path, "w", ZIP_DEFLATED) as zipf:
+        metadata.created_at = datetime.now()
+        metadata_json = metadata.model_dump_json(indent=2)
+        zipf.writestr("metadata.json", metadata_json.encode("utf-8"))
+        with zipf.open("data_input.csv", "w") as byte_f:
+            text_f = TextIOWrapper(buffer=byte_f, encoding="utf-8")
+            emf.to_csv(f=text_f)
+            text_f.flush()
+        for channel, pack in enumerate(channels):
+            if pack is None:
+                continue
+            with zipf.open(channel_file_name(channel), "w") as byte_f:
+                text_f = TextIOWrapper(buffer=byte_f, encoding="utf-8")
+                pack.to_csv(f=text_f)
+                text_f.flush()
+        with zipf.open("calibration.json", "w") as byte_f:
+            text_f = TextIOWrapper(buffer=byte_f, encoding="utf-8")
+            cal.to_file(f=text_f)
+            text_f.flush()
+        # Сохраняем коэффициенты термопары в отдельный файл
+        thermocouple_data = {
+            "thermocouple_coefficients": config.thermocouple_coefficients
+        }
+        zipf.writestr(
+            "thermocouple.json",
+            json.dumps(thermocouple_data, indent=2, ensure_ascii=False).encode("utf-8"),
+        )
+        # Сохраняем данные холодного спая
+        zipf.writestr(
+            "cjc.json",
+            json.dumps(cjc_data, indent=2, ensure_ascii=False).encode("utf-8"),
+        )
+    log.debug(f"Measurement saved at {path}")
+
+
+def read_vtaz(path: Path) -> VtazData:
+    """Прочитать измерение, записанное write_vtaz"""
+    with ZipFile(path) as zipf:
+
+        def open_text(name: str) -> TextIOWrapper:
+            return TextIOWrapper(buffer=zipf.open(name), encoding="utf-8")
+
+        metadata = Metadata.model_validate_json(zipf.read("metadata.json"))
+        with open_text("data_input.csv") as f:
+            emf = DataPack.from_csv(f=f)
+        names = zipf.namelist()
+        channels: list[Optional[DataPack]] = []
+        for channel in range(len(metadata.extra_inputs)):
+            if channel_file_name(channel) not in names:
+                channels.append(None)
+                continue
+            with open_text(channel_file_name(channel)) as f:
+                channels.append(DataPack.from_csv(f=f))
+        with open_text("calibration.json") as f:
+            cal = Calibration.from_file(f=f)
+        cjc_data = json.loads(zipf.read("cjc.json"))
+    return VtazData(
+        metadata=metadata, cal=cal, emf=emf, channels=channels, cjc_data=cjc_data
+    )